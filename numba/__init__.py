@@ -1,12 +1,14 @@
 import sys
+import types
 import logging
 
-# NOTE: Be sure to keep the logging level commented out before commiting.  See:
+__version__ = '0.3'
+
+# Logging is configured by applications, not by numba. To see debug output,
+# call logging.basicConfig(level=logging.DEBUG) or make your tests handle a
+# debug flag, per numba.tests.test_support.main(). See:
 #   https://github.com/numba/numba/issues/31
-# A good work around is to make your tests handle a debug flag, per
-# numba.tests.test_support.main().
-logging.basicConfig(level=logging.DEBUG,
-                    format="\n\033[1m%(levelname)s -- %(module)s:%(lineno)d:%(funcName)s\033[0m\n%(message)s")
+logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 try:
     from . import minivect
@@ -17,8 +19,25 @@ except ImportError:
 
 from . import _numba_types
 from ._numba_types import *
-from . import decorators
-from .decorators import *
+from .parallel import prange
+
+# The compiler (numba.decorators, the pipeline, LLVM and minivect's code
+# generators) is only imported when one of these is first called, which
+# keeps "import numba" cheap for programs that rarely compile
+_decorators = ['autojit', 'jit2', 'jit', 'export', 'exportmany',
+               'vectorize', 'guvectorize']
+
+def _lazy_decorator(name):
+    def decorator(*args, **kwargs):
+        from numba import decorators
+        return getattr(decorators, name)(*args, **kwargs)
+
+    decorator.__name__ = name
+    decorator.__doc__ = "See numba.decorators.%s" % name
+    return decorator
+
+for _name in _decorators:
+    globals()[_name] = _lazy_decorator(_name)
 
 def test():
     from subprocess import check_call
@@ -26,4 +45,27 @@ def test():
     check_call([sys.executable, '-m', 'numba.tests.test_all'])
 
 
-__all__ = _numba_types.__all__ + decorators.__all__
+__all__ = _numba_types.__all__ + _decorators + ['prange']
+
+# Submodules that remain attributes of the package, imported on first access
+_lazy_submodules = ['decorators']
+
+class _Package(types.ModuleType):
+    """
+    The numba package, importing the lazy submodules when they are first
+    accessed (numba.decorators, or hasattr() through "from numba import").
+    """
+
+    def __getattr__(self, name):
+        if name not in _lazy_submodules:
+            raise AttributeError(name)
+
+        module_name = '%s.%s' % (self.__name__, name)
+        __import__(module_name)
+        return sys.modules[module_name]
+
+_package = _Package(__name__, __doc__)
+_package.__dict__.update(sys.modules[__name__].__dict__)
+# Functions defined above use the globals of this module object
+_package._module = sys.modules[__name__]
+sys.modules[__name__] = _package
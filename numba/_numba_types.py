@@ -3,12 +3,10 @@ import math
 import copy
 import types
 
-import llvm.core
 import numpy as np
 # from numpy.ctypeslib import _typecodes
 
 import numba
-from numba import llvm_types
 from numba.minivect.minitypes import *
 from numba.minivect.minitypes import map_dtype
 from numba.minivect import minitypes
@@ -186,6 +184,10 @@ class BuiltinType(NumbaType, minitypes.ObjectType):
 class RangeType(NumbaType):
     is_range = True
 
+class PrangeType(RangeType):
+    "Iteration space of a parallel range loop, see numba.parallel"
+    is_prange = True
+
 class NoneType(NumbaType, minitypes.ObjectType):
     is_none = True
 
@@ -256,6 +258,10 @@ class NumbaTypeMapper(minitypes.TypeMapper):
         # self.ctypes_func_type2 = type(libc.printf)
 
     def to_llvm(self, type):
+        # LLVM is only loaded when code is generated
+        import llvm.core
+        from numba import llvm_types
+
         if type.is_array:
             return llvm_types._numpy_array
         elif type.is_complex:
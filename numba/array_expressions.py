@@ -0,0 +1,299 @@
+"""
+Array expressions.
+
+Element-wise arithmetic on arrays, such as
+
+    out[...] = a + b * c
+
+is compiled into a single loop over the broadcast shape of the operands,
+without creating intermediate arrays. Type inference gives array operations
+an array type, and ArrayExpressionRewrite replaces each maximal array
+expression by a nodes.ArrayExpressionNode. Leaves of the expression (array
+and scalar operands) are evaluated as usual, the expression itself is
+turned into a minivect function which is specialized and compiled into the
+module of the numba function.
+
+Results are written to an existing array when the expression is assigned
+to a full slice (a[...] = expr, a[:] = expr), to a view of an array that
+the expression doesn't read (a[i, :] = expr) or in-place (a += expr),
+otherwise a new (C contiguous) array is allocated, which requires the GIL.
+
+Kernels are compiled for several layouts (see `layouts`), and the generated
+code picks the best one for the actual strides of the operands when the
+expression is evaluated.
+"""
+
+import ast
+import copy
+
+import numpy as np
+
+from numba import error, nodes, visitors
+from numba.minivect import minitypes, specializers
+
+# Supported operators, with their minivect equivalent
+array_binops = {
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.Div: '/',
+}
+
+array_unops = {
+    ast.USub: '-',
+    ast.UAdd: '+',
+}
+
+# NumPy array flags
+NPY_C_CONTIGUOUS = 0x1
+NPY_F_CONTIGUOUS = 0x2
+
+# Operand layouts in order of preference, which are also the names of the
+# minivect specializers handling them:
+#
+#   contig:                 all operands C or all operands F contiguous,
+#                           without broadcasting
+#   inner_contig:           all operands contiguous in the last dimension
+#   inner_contig_fortran:   all operands contiguous in the first dimension
+#   tiled:                  operands contiguous in either the first or the
+#                           last dimension (e.g. a + a.T)
+#   strided_fortran:        strided operands, Fortran contiguous result
+#   strided:                anything else
+layouts = [
+    'contig',
+    'inner_contig',
+    'inner_contig_fortran',
+    'tiled',
+    'strided_fortran',
+    'strided',
+]
+
+def candidate_layouts(ndim, operand_ndims):
+    """
+    The layouts to compile kernels for, given the dimensionality of the
+    result and of the array operands. Layouts that can't occur or that are
+    equivalent to a preceding layout are left out.
+    """
+    broadcasting = [n for n in operand_ndims if n != ndim]
+    result = []
+    for layout in layouts:
+        if layout in ('contig', 'inner_contig_fortran') and broadcasting:
+            # Operands with fewer dimensions are never contiguous in the
+            # first dimension
+            continue
+        if ndim == 1 and layout in ('inner_contig_fortran', 'tiled',
+                                    'strided_fortran'):
+            continue
+        result.append(layout)
+
+    return result
+
+def is_array_expression(node):
+    return (isinstance(node, (ast.BinOp, ast.UnaryOp)) and
+            node.variable.type.is_array)
+
+def is_full_slice(subscript):
+    "Whether a subscript covers the entire array: a[...], a[:], a[:, :]"
+    slice_node = subscript.slice
+    if isinstance(slice_node, ast.Index):
+        slice_node = slice_node.value
+
+    if isinstance(slice_node, ast.ExtSlice):
+        dims = slice_node.dims
+    else:
+        dims = [slice_node]
+
+    for dim in dims:
+        if isinstance(dim, ast.Ellipsis):
+            continue
+        if isinstance(dim, nodes.ConstNode) and dim.pyval is Ellipsis:
+            continue
+        if (isinstance(dim, ast.Slice) and dim.lower is None and
+                dim.upper is None and dim.step is None):
+            continue
+        return False
+
+    return True
+
+def is_array_view(node):
+    "Whether a node slices an array, producing a view: a[i, :], a[1:-1]"
+    return (isinstance(node, ast.Subscript) and node.value.type.is_array and
+            node.type.is_array and isinstance(node.slice, ast.ExtSlice))
+
+def refers_to(node, name_node):
+    "Whether `node` refers to the variable of a Name node"
+    if not isinstance(name_node, ast.Name):
+        return True
+
+    return any(isinstance(child, ast.Name) and child.id == name_node.id
+                   for child in ast.walk(node))
+
+def empty_result(dtype, *arrays):
+    "Allocate the result array of an array expression"
+    if len(arrays) == 1:
+        shape = arrays[0].shape
+    else:
+        shape = np.broadcast(*arrays).shape
+    return np.empty(shape, dtype=dtype)
+
+def compile_kernel(context, minifunc, llvm_module, llvm_ee,
+                   specializer=specializers.StridedSpecializer,
+                   fastmath=False):
+    """
+    Specialize a minivect function and compile it into the given LLVM
+    module. Returns the LLVM function:
+
+        int kernel(npy_intp *shape, void **data_pointers,
+                   npy_intp **strides_pointers, scalar arguments...)
+
+    With fastmath=True the kernel has relaxed floating point semantics
+    (see numba.fastmath).
+    """
+    old = context.llvm_module, context.llvm_ee, context.fastmath
+    context.llvm_module, context.llvm_ee = llvm_module, llvm_ee
+    context.fastmath = fastmath
+    try:
+        result = iter(context.run(minifunc, [specializer])).next()
+    finally:
+        context.llvm_module, context.llvm_ee, context.fastmath = old
+
+    _, specialized_ast, _, (lfunc, ctypes_func) = result
+    return lfunc
+
+# (id(llvm_module), expression key, layout, fastmath) -> (llvm_module, lfunc)
+_kernels = {}
+
+def get_kernel(context, node, layout, llvm_module, llvm_ee, fastmath=False):
+    """
+    Get the kernel of an ArrayExpressionNode for a layout. Kernels are
+    compiled once per module for expressions with the same operations and
+    operand types.
+    """
+    key = id(llvm_module), node.key, layout, fastmath
+    cached = _kernels.get(key)
+    if cached is not None and cached[0] is llvm_module:
+        return cached[1]
+
+    lfunc = compile_kernel(context, node.minifunc, llvm_module, llvm_ee,
+                           specializers.specializers[layout], fastmath)
+    _kernels[key] = llvm_module, lfunc
+    return lfunc
+
+def remove_module(llvm_module):
+    "Forget the kernels of a module removed from the execution engine"
+    for key, (module, lfunc) in _kernels.items():
+        if module is llvm_module:
+            del _kernels[key]
+
+
+class ArrayExpressionRewrite(visitors.NumbaTransformer):
+    """
+    Replace array expressions by ArrayExpressionNodes.
+    """
+
+    def visit_Assign(self, node):
+        target = node.targets[0]
+        value = node.value
+        if (isinstance(value, nodes.CoercionNode) and value.type.is_array and
+                is_array_expression(value.node)):
+            value = value.node
+
+        out = None
+        if len(node.targets) == 1 and is_array_expression(value):
+            if (isinstance(target, ast.Subscript) and
+                    target.value.type.is_array and is_full_slice(target)):
+                out = target.value
+            elif is_array_view(target) and not refers_to(value, target.value):
+                # a[i, :] = expr: write to the view, unless the expression
+                # reads the array (it could read elements already written)
+                out = target
+                out.ctx = ast.Load()
+            elif getattr(node, 'inplace', False):
+                out = copy.deepcopy(target)
+                out.ctx = ast.Load()
+
+        if out is None:
+            self.generic_visit(node)
+            return node
+
+        expr = self.build(value, self.visit(out))
+        return ast.copy_location(ast.Expr(value=expr), node)
+
+    def visit_CoercionNode(self, node):
+        if node.type.is_array and is_array_expression(node.node):
+            # Array expressions produce a new (C contiguous) array
+            return self.visit(node.node)
+
+        self.generic_visit(node)
+        return node
+
+    def visit_BinOp(self, node):
+        if is_array_expression(node):
+            return self.build(node)
+
+        self.generic_visit(node)
+        return node
+
+    visit_UnaryOp = visit_BinOp
+
+    def build(self, node, out=None):
+        "Build an ArrayExpressionNode for an array expression"
+        if out is None:
+            if self.nopython:
+                raise error.NumbaError(
+                    node, "Cannot allocate the result of an array expression "
+                          "in nopython context, assign it to an existing "
+                          "array instead (a[...] = expr)")
+            out_type = node.type
+        else:
+            out_type = out.type
+            if out_type.ndim < node.type.ndim:
+                raise error.NumbaError(
+                    node, "Cannot assign %d-dimensional array expression to "
+                          "%d-dimensional array" % (node.type.ndim,
+                                                    out_type.ndim))
+
+        b = self.context.astbuilder
+        operands = []
+        variables = []
+
+        def build_expr(node):
+            """
+            Build the minivect expression, and a key identifying the
+            operations and operand types
+            """
+            if isinstance(node, ast.BinOp) and node.type.is_array:
+                op = array_binops[type(node.op)]
+                lhs, lhs_key = build_expr(node.left)
+                rhs, rhs_key = build_expr(node.right)
+                return (b.binop(node.type, op, lhs, rhs),
+                        (op, str(node.type), lhs_key, rhs_key))
+            elif isinstance(node, ast.UnaryOp) and node.type.is_array:
+                operand, key = build_expr(node.operand)
+                if isinstance(node.op, ast.UAdd):
+                    return operand, key
+                op = array_unops[type(node.op)]
+                return (b.unop(node.type, op, operand),
+                        (op, str(node.type), key))
+
+            # Leaf, evaluated outside of the kernel
+            type = node.type
+            if type.is_array:
+                # Operands may be broadcast, so drop contiguity information
+                type = minitypes.ArrayType(type.dtype, type.ndim)
+
+            variable = b.variable(type, 'op%d' % len(variables))
+            operands.append(self.visit(node))
+            variables.append(variable)
+            return variable, str(type)
+
+        expr, key = build_expr(node)
+        out_variable_type = minitypes.ArrayType(out_type.dtype, out_type.ndim)
+        out_variable = b.variable(out_variable_type, 'out')
+        minifunc = b.build_function([out_variable] + variables,
+                                    b.assign(out_variable, expr),
+                                    name='array_expression')
+
+        result = nodes.ArrayExpressionNode(out_type, minifunc, operands, out)
+        result.key = str(out_variable_type), key
+        return ast.copy_location(result, node)
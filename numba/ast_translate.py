@@ -1,6 +1,9 @@
 import ast
+import sys
 import ctypes
 
+import numpy as np
+
 import llvm
 import llvm.core as lc
 import llvm.passes as lp
@@ -8,7 +11,7 @@ import llvm.ee as le
 
 #from ._ext import make_ufunc
 from .llvm_types import    _int32, _intp, _LLVMCaster
-#from .multiarray_api import MultiarrayAPI # not used
+from .multiarray_api import get_multiarray_api
 from .symtab import Variable
 from . import _numba_types as _types
 from ._numba_types import BuiltinType
@@ -16,7 +19,8 @@ from ._numba_types import BuiltinType
 from numba import *
 from . import visitors, nodes, llvm_types
 from .minivect import minitypes
-from numba import ndarray_helpers, error
+from numba import ndarray_helpers, error, passes, array_expressions
+from numba import instrumentation, refcount, inlining, vectormath, fastmath
 from numba._numba_types import is_obj, promote_closest
 
 import logging
@@ -53,7 +57,41 @@ class DelayedObj(object):
     def get_stop(self):
         return self.args[0 if (len(self.args) == 1) else 1]
 
-def pycfunction_new(py_func, func_pointer):
+METH_VARARGS = 0x0001
+METH_NOARGS = 0x0004
+METH_O = 0x0008
+
+def calling_convention(nargs):
+    "The PyMethodDef flags for a wrapper of a function with nargs arguments"
+    if nargs == 0:
+        return METH_NOARGS
+    elif nargs == 1:
+        return METH_O
+    else:
+        return METH_VARARGS
+
+def accepted_type_nums(type, dtype):
+    """
+    The type numbers of the dtypes of arrays accepted for an array of
+    `type` elements (with NumPy dtype `dtype`): equivalent dtypes (e.g. long
+    and long long) and those mapped to the same type (e.g. bool to int8).
+    """
+    nums = set([dtype.num])
+    for char in np.typecodes['All']:
+        other = np.dtype(char)
+        if other == dtype:
+            nums.add(other.num)
+            continue
+        try:
+            if minitypes.map_dtype(other) == type:
+                nums.add(other.num)
+        except Exception:
+            # Types that can't be mapped
+            pass
+
+    return sorted(nums)
+
+def pycfunction_new(py_func, func_pointer, flags=METH_VARARGS):
     # struct PyMethodDef {
     #     const char  *ml_name;   /* The name of the built-in function/method */
     #     PyCFunction  ml_meth;   /* The C function that implements it */
@@ -77,7 +115,7 @@ def pycfunction_new(py_func, func_pointer):
     methoddef.name = py_func.__name__
     methoddef.doc = py_func.__doc__
     methoddef.method = ctypes.c_void_p(func_pointer)
-    methoddef.flags = 1 # METH_VARARGS
+    methoddef.flags = flags
 
     # Create PyCFunctionObject, pass in the methoddef struct as the m_self
     # attribute
@@ -118,7 +156,7 @@ class LLVMContextManager(object):
     # TODO: make these instance attributes and create a singleton global object
     _ee = None          # execution engine
     _mods = {}          # module's name => module instance
-    _fpass = {}         # module => function passes
+    _fpass = {}         # (module, opt_level) => function passes
     _DEFAULT_MODULE = 'default'
 
     def __init__(self):
@@ -137,27 +175,11 @@ class LLVMContextManager(object):
     @classmethod
     def _init_module(cls, name):
         '''
-        Initialize a module with the given name;
-        Prepare pass managers for it.
+        Initialize a module with the given name. Pass managers are created
+        on demand for each optimization level.
         '''
         mod = lc.Module.new(name)
         cls._mods[name] = mod
-
-        # TODO: We should use a PassManagerBuilder so that we can use O1, O2, O3
-
-        fpm = lp.FunctionPassManager.new(mod)
-        cls._fpass[mod] = fpm
-
-        # NOTE: initialize() link all passes into LLVM.
-        fpm.initialize()
-
-        #fpm.add(lp.PASS_PROMOTE_MEMORY_TO_REGISTER)
-        #fpm.add(lp.PASS_DEAD_CODE_ELIMINATION)
-
-        # NOTE: finalize() unlink all passes from LLVM. I don't see any reason
-        #       for a program to do so.
-        # fpm.finalize()
-
         return mod
 
     def create_module(self, name):
@@ -170,27 +192,119 @@ class LLVMContextManager(object):
         self._ee.add_module(mod)
         return mod
 
+    def add_module(self, mod):
+        "Add a module, e.g. loaded from bitcode, to the execution engine"
+        self._mods[mod.id] = mod
+        self._ee.add_module(mod)
+
+    def remove_module(self, mod):
+        '''
+        Remove a module created with create_module() from the execution
+        engine, and free the machine code of its functions. None of its
+        functions may be called afterwards.
+        '''
+        for lfunc in mod.functions:
+            if not lfunc.is_declaration:
+                self._ee.free_machine_code_for(lfunc)
+
+        self._ee.remove_module(mod)
+        self._mods.pop(mod.id, None)
+        inlining.remove_module(mod)
+        array_expressions.remove_module(mod)
+        for key in self._fpass.keys():
+            if key[0] == mod:
+                del self._fpass[key]
+
+    def is_module_referenced(self, mod):
+        "Whether functions of other modules may call functions of `mod`"
+        defined = set(lfunc.name for lfunc in mod.functions
+                                     if not lfunc.is_declaration)
+        for other in self._mods.values():
+            if other == mod:
+                continue
+            for lfunc in other.functions:
+                if lfunc.is_declaration and lfunc.name in defined:
+                    return True
+
+        return False
+
     def get_default_module(self):
         return self.get_module(self._DEFAULT_MODULE)
 
-    def get_function_pass_manager(self, name_or_mod):
+    def _pass_manager_builder(self, opt_level):
+        pmb = lp.PassManagerBuilder.new()
+        pmb.opt_level = opt_level
+        pmb.vectorize = opt_level >= 3
+        return pmb
+
+    def get_function_pass_manager(self, name_or_mod, opt_level=None):
+        "Get the function pass manager for a module and optimization level"
         if isinstance(name_or_mod, basestring):
-            mod = name_or_mod
+            mod = self.get_module(name_or_mod)
         else:
             mod = name_or_mod
 
-        if mod in self._fpass:
-            fpm = self._fpass[mod]
+        if opt_level is None:
+            opt_level = passes.get_default_opt_level()
+
+        key = mod, opt_level
+        if key in self._fpass:
+            fpm = self._fpass[key]
         else:
             fpm = lp.FunctionPassManager.new(mod)
-            self._fpass[mod] = fpm
+            fpm.add(self._ee.target_data)
+            self._pass_manager_builder(opt_level).populate(fpm)
+            passes.add_passes(fpm, passes.function_passes, opt_level)
+            # NOTE: initialize() link all passes into LLVM.
             fpm.initialize()
+            self._fpass[key] = fpm
 
         return fpm
 
+    def optimize(self, lfunc, opt_level=None):
+        """
+        Optimize a function at the given optimization level (the global
+        default if not given). Calls to alwaysinline functions are inlined
+        first (see numba.inlining). Vectorized math functions are replaced
+        by SIMD implementations afterwards (see numba.vectormath).
+        """
+        if opt_level is None:
+            opt_level = passes.get_default_opt_level()
+
+        if opt_level > 0:
+            inlining.inline_calls(lfunc)
+            self.get_function_pass_manager(lfunc.module, opt_level).run(lfunc)
+        if opt_level >= 3 and vectormath.replace_vector_intrinsics(lfunc):
+            self.get_cleanup_pass_manager(lfunc.module).run(lfunc)
+
+    def get_cleanup_pass_manager(self, mod):
+        "Get the pass manager of passes.cleanup_passes for a module"
+        key = mod, 'cleanup'
+        if key not in self._fpass:
+            fpm = lp.FunctionPassManager.new(mod)
+            fpm.add(self._ee.target_data)
+            passes.add_passes(fpm, passes.cleanup_passes, 1)
+            fpm.initialize()
+            self._fpass[key] = fpm
+
+        return self._fpass[key]
+
     def get_module(self, name):
         return self._mods[name]
 
+    def find_module(self, name):
+        "Get the module with the given name, or None"
+        return self._mods.get(name)
+
+    def defines_function(self, name):
+        "Whether any module of the execution engine defines a function"
+        for mod in self._mods.values():
+            for lfunc in mod.functions:
+                if lfunc.name == name and not lfunc.is_declaration:
+                    return True
+
+        return False
+
     def get_execution_engine(self):
         return self._ee
 
@@ -264,16 +378,21 @@ class ComplexSupportMixin(object):
 
 class RefcountingMixin(object):
 
-    def decref(self, value, func='Py_DecRef'):
-        "Py_DECREF a value"
+    def decref(self, value, func=refcount.DECREF):
+        "Py_XDECREF a value, inlined by the optimizer (see numba.refcount)"
+        if self.nogil:
+            # Functions running without the GIL may not touch reference
+            # counts, the wrapper keeps the arguments alive
+            return None
+
         object_ltype = object_.to_llvm(self.context)
-        sig, py_decref = self.function_cache.function_by_name(func)
+        lfunc = refcount.get_refcount_function(self.mod, func, object_ltype)
         b = self.builder
-        return b.call(py_decref, [b.bitcast(value, object_ltype)])
+        return b.call(lfunc, [b.bitcast(value, object_ltype)])
 
     def incref(self, value):
-        "Py_INCREF a value"
-        return self.decref(value, func='Py_IncRef')
+        "Py_XINCREF a value"
+        return self.decref(value, func=refcount.INCREF)
 
     def xdecref_temp(self, temp, decref=None):
         "Py_XDECREF a temporary"
@@ -310,7 +429,7 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
     """
 
     def __init__(self, context, func, ast, func_signature, symtab,
-                 optimize=True,
+                 optimize=True, opt_level=None,
                  llvm_module=None, llvm_ee=None,
                  refcount_args=True, **kwds):
         super(LLVMCodeGenerator, self).__init__(context, func, ast)
@@ -331,7 +450,15 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
 
         # self.ma_obj = None # What is this?
         self.optimize = optimize
+        self.opt_level = opt_level
         self.flags = kwds
+        self.nogil = kwds.get('nogil', False)
+        # Relaxed floating point semantics, see numba.fastmath
+        self.fastmath = kwds.get('fastmath', False)
+
+        # Whether the generated code may be stored and reloaded in another
+        # process (i.e. it does not embed addresses of live objects)
+        self.is_relocatable = True
 
         # internal states
         self._nodes = []  # for tracking parent nodes
@@ -403,6 +530,47 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
                     stackspace = self.builder.alloca(var.ltype, name=name)
                 var.lvalue = stackspace
 
+    def _hoisted_arrays(self):
+        "The names of the array arguments that are never reassigned"
+        assigned = set()
+        for node in ast.walk(self.ast):
+            if isinstance(node, ast.Name) and not isinstance(node.ctx,
+                                                             ast.Load):
+                assigned.add(node.id)
+            elif (isinstance(node, ast.Attribute) and
+                      isinstance(node.ctx, ast.Store) and
+                      isinstance(node.value, ast.Name)):
+                # a.shape = ..., a.strides = ...
+                assigned.add(node.value.id)
+
+        return [argname for argname, argtype in zip(self.argnames,
+                                                    self.func_signature.args)
+                    if argtype.is_array and argname not in assigned]
+
+    def _init_array_descriptors(self, names):
+        """
+        Load the data pointer, shape and strides of the given arrays (see
+        _hoisted_arrays()) at the current position, which is the entry block
+        of the function, so element accesses (in loops) don't reload them
+        from the array object.
+        """
+        self.array_descriptors = {}
+        for name in names:
+            variable = self.symtab[name]
+            larray = self.builder.load(variable.lvalue)
+            self.array_descriptors[name] = ndarray_helpers.ArrayDescriptor(
+                                self.builder, larray, variable.type.ndim)
+
+    def array_descriptor(self, node, larray):
+        """
+        Get the ArrayDescriptor for an array expression, which is hoisted
+        for array arguments and loaded at the current position otherwise.
+        """
+        if isinstance(node, ast.Name) and node.id in self.array_descriptors:
+            return self.array_descriptors[node.id]
+        return ndarray_helpers.ArrayDescriptor(self.builder, larray,
+                                               node.type.ndim)
+
     def setup_func(self):
         self.lfunc_type = self.to_llvm(self.func_signature)
         self.lfunc = self.mod.add_function(self.lfunc_type, self.func_name)
@@ -415,6 +583,7 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
 
         self._init_args()
         self._allocate_locals()
+        self._init_array_descriptors(self._hoisted_arrays())
 
         # TODO: Put current function into symbol table for recursive call
         self.setup_return()
@@ -436,6 +605,9 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
         return type.to_llvm(self.context)
 
     def translate(self):
+        # Compile inlined callees of other modules into this module first,
+        # see numba.inlining
+        inlining.link_callees(self)
         self.setup_func()
 
         if isinstance(self.ast, ast.FunctionDef):
@@ -464,11 +636,29 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
         del self.builder  # release the builder to make GC happy
 
         logger.debug("ast translated function: %s", self.lfunc)
+        # Only count the instructions of the function itself, not those of
+        # its wrapper
+        instrumented = (instrumentation.current_record() is not None and
+                        not isinstance(self.ast, nodes.FunctionWrapperNode))
+        if instrumented:
+            instrumentation.count(
+                'llvm_instructions',
+                instrumentation.count_llvm_instructions(self.lfunc))
+
         # Verify code generation
-        self.lfunc.verify()
+        with instrumentation.stage('verify'):
+            self.lfunc.verify()
+        if self.fastmath:
+            fastmath.relax(self.lfunc)
         if self.optimize:
-            fp = LLVMContextManager().get_function_pass_manager(self.mod)
-            fp.run(self.lfunc)
+            with instrumentation.stage('refcount'):
+                refcount.eliminate_refcount_pairs(self.lfunc)
+            with instrumentation.stage('optimize'):
+                LLVMContextManager().optimize(self.lfunc, self.opt_level)
+            if instrumented:
+                instrumentation.count(
+                    'llvm_instructions_opt',
+                    instrumentation.count_llvm_instructions(self.lfunc))
 
     def get_ctypes_func(self, llvm=True):
         ee = self.ee
@@ -476,14 +666,14 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
         sig = self.func_signature
         restype = _types.convert_to_ctypes(sig.return_type)
 
-        # FIXME: Switch to PYFUNCTYPE so it does not release the GIL.
-        #
-        #    prototype = ctypes.CFUNCTYPE(restype,
-        #                                 *[_types.convert_to_ctypes(x)
-        #                                       for x in sig.args])
-        prototype = ctypes.PYFUNCTYPE(restype,
-                                     *[_types.convert_to_ctypes(x)
-                                           for x in sig.args])
+        # PYFUNCTYPE holds the GIL during the call, only functions compiled
+        # with nogil=True may run without it
+        if self.nogil:
+            functype = ctypes.CFUNCTYPE
+        else:
+            functype = ctypes.PYFUNCTYPE
+        prototype = functype(restype, *[_types.convert_to_ctypes(x)
+                                            for x in sig.args])
 
 
         if hasattr(restype, 'make_ctypes_prototype_wrapper'):
@@ -500,65 +690,73 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
         else:
             return prototype(self.func)
 
-    def _build_wrapper_function_ast(self, fake_pyfunc):
-        wrapper_call = nodes.FunctionWrapperNode(self.lfunc,
-                                                 self.func_signature,
-                                                 self.func,
-                                                 fake_pyfunc)
-        return wrapper_call
-
     def build_wrapper_function(self):
-        # PyObject *(*)(PyObject *self, PyObject *args)
-        def func(self, args):
-            pass
-        func.live_objects = self.func.live_objects
-
-        # Create wrapper code generator and wrapper AST
-        func.__name__ = '__numba_wrapper_%s' % self.func_name
-        signature = minitypes.FunctionType(return_type=object_,
-                                           args=[void.pointer(), object_])
-        symtab = dict(self=Variable(object_, is_local=True),
-                      args=Variable(object_, is_local=True))
-        wrapper_call = self._build_wrapper_function_ast(func)
-        error_return = ast.Return(nodes.CoercionNode(nodes.NULL_obj,
-                                                     object_))
-        wrapper_call.error_return = error_return
-        t = LLVMCodeGenerator(self.context, func, wrapper_call, signature,
-                              symtab, llvm_module=self.mod, llvm_ee=self.ee,
-                              refcount_args=False)
-        t.translate()
-
-        # Return a PyCFunctionObject holding the wrapper
-        func_pointer = t.ee.get_pointer_to_function(t.lfunc)
-        result = pycfunction_new(self.func, func_pointer)
-        return result
+        return build_wrapper_function(self.context, self.func, self.lfunc,
+                                      self.func_signature, self.func_name,
+                                      llvm_module=self.mod, llvm_ee=self.ee,
+                                      nogil=self.nogil)
 
     def visit_FunctionWrapperNode(self, node):
-        from numba import ast_type_inference, pipeline
-
-        args_tuple = self.lfunc.args[1]
-        arg_types = [object_] * len(node.signature.args)
-
-        if arg_types:
-            # Unpack tuple into arguments
-            types, lstr = self.object_coercer.lstr(arg_types)
-            largs = self.object_coercer.parse_tuple(lstr, args_tuple, arg_types)
-        else:
-            largs = []
+        """
+        Unbox the arguments directly from the argument object(s), check
+        array arguments inline, call the wrapped function and box the
+        result. See build_wrapper_function() for the calling conventions.
+        """
+        from numba import pipeline
+
+        arg_types = node.signature.args
+        largs = self.unpack_arguments(len(arg_types),
+                                      node.orig_py_func.__name__)
+
+        node.unbox = []
+        args = []
+        for i, (arg_type, larg) in enumerate(zip(arg_types, largs)):
+            if arg_type.is_array:
+                self.check_array_argument(larg, arg_type, i)
+                larg = self.builder.bitcast(larg, arg_type.to_llvm(self.context))
+                args.append(nodes.LLVMValueRefNode(arg_type, larg))
+            elif is_obj(arg_type):
+                args.append(nodes.LLVMValueRefNode(object_, larg))
+            else:
+                # Unbox into a temporary before the call
+                temp = nodes.TempNode(arg_type)
+                value = nodes.CoercionNode(nodes.LLVMValueRefNode(object_, larg),
+                                           arg_type)
+                node.unbox.append(ast.Assign(targets=[temp.store()],
+                                             value=value))
+                args.append(temp.load())
 
         # Call wrapped function
-        args = [nodes.LLVMValueRefNode(arg_type, larg)
-                    for arg_type, larg in zip(arg_types, largs)]
         func_call = nodes.NativeCallNode(node.signature, args,
                                          node.wrapped_function)
-
-        # Coerce and return result
-        if node.signature.return_type.is_void:
+        return_type = node.signature.return_type
+
+        if node.nogil:
+            # Release the GIL around the call, the result is boxed after
+            # reacquiring it
+            thread_state = nodes.TempNode(void.pointer())
+            save_thread = self.function_cache.call('PyEval_SaveThread')
+            restore_thread = self.function_cache.call('PyEval_RestoreThread',
+                                                      thread_state.load())
+            node.body = [ast.Assign(targets=[thread_state.store()],
+                                    value=save_thread)]
+            if return_type.is_void:
+                node.body.append(ast.Expr(value=func_call))
+                result_node = nodes.ObjectInjectNode(None)
+            else:
+                result = nodes.TempNode(return_type)
+                node.body.append(ast.Assign(targets=[result.store()],
+                                            value=func_call))
+                result_node = result.load()
+            node.body.append(ast.Expr(value=restore_thread))
+        elif return_type.is_void:
             node.body = func_call
             result_node = nodes.ObjectInjectNode(None)
         else:
-            node.body = None
-            result_node = func_call
+            # Call before checking for errors, box the result afterwards
+            result = nodes.TempNode(return_type)
+            node.body = ast.Assign(targets=[result.store()], value=func_call)
+            result_node = result.load()
 
         node.return_result = ast.Return(
                     value=nodes.CoercionNode(result_node, object_))
@@ -570,7 +768,191 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
                                       node, self.func_signature,
                                       order=['late_specializer'])
         sig, symtab, return_stmt_ast = pipeline_.run_pipeline()
+
+        return_result = return_stmt_ast.return_result
+        return_stmt_ast.return_result = None
         self.generic_visit(return_stmt_ast)
+        self.check_pending_error()
+        self.visit(return_result)
+
+    def check_pending_error(self):
+        """
+        Jump to the error label if an exception is set. Native functions
+        raise by setting an exception (see raise_if) and returning a dummy
+        value, which must not be boxed and returned to Python.
+        """
+        b = self.builder
+        _, occurred = self.function_cache.function_by_name('PyErr_Occurred')
+        exc = b.ptrtoint(b.call(occurred, []), llvm_types._intp)
+        is_set = b.icmp(lc.ICMP_NE, exc, lc.Constant.int(exc.type, 0))
+        bb_ok = self.append_basic_block('no_error')
+        b.cbranch(is_set, self.error_label, bb_ok)
+        b.position_at_end(bb_ok)
+
+    def unpack_arguments(self, nargs, func_name):
+        """
+        Return the (borrowed) argument objects of a wrapper function. For
+        METH_O the second argument is the argument itself, for METH_VARARGS
+        the items are loaded from the tuple after checking its size.
+        """
+        largs = []
+        if nargs == 1:
+            largs.append(self.lfunc.args[1])
+        elif nargs > 1:
+            b = self.builder
+            args_tuple = b.bitcast(self.lfunc.args[1], llvm_types._pytuple)
+            size_p = b.gep(args_tuple, [llvm_types.constant_int(0),
+                                        llvm_types.constant_int(
+                                            llvm_types._pytuple_size_ofs)])
+            nargs_given = b.load(size_p)
+            wrong_size = b.icmp(lc.ICMP_NE, nargs_given,
+                                lc.Constant.int(nargs_given.type, nargs))
+            self.raise_if(wrong_size, 'PyExc_TypeError',
+                          "%s() takes exactly %d arguments" % (func_name,
+                                                               nargs))
+
+            for i in range(nargs):
+                item_p = b.gep(args_tuple, [llvm_types.constant_int(0),
+                                            llvm_types.constant_int(
+                                                llvm_types._pytuple_items_ofs),
+                                            llvm_types.constant_int(i)])
+                largs.append(b.load(item_p))
+
+        return largs
+
+    def check_array_argument(self, lobj, array_type, argnum):
+        """
+        Check that an argument object is a NumPy array with the dimensionality
+        and element type (type number, size and native byte order) of the
+        array type it was compiled for. The common case (an exact ndarray)
+        is a pointer comparison.
+        """
+        b = self.builder
+        zero = llvm_types.constant_int(0)
+        msg = "Argument %d: expected a %d-dimensional array of %s" % (
+                                    argnum, array_type.ndim, array_type.dtype)
+
+        ndarray = self.visit(nodes.ObjectInjectNode(np.ndarray))
+        ob_type_p = b.gep(lobj, [zero, llvm_types.constant_int(
+                                            llvm_types._head_len - 1)])
+        ob_type = b.ptrtoint(b.load(ob_type_p), _intp)
+        is_ndarray = b.icmp(lc.ICMP_EQ, ob_type, b.ptrtoint(ndarray, _intp))
+
+        bb_isinstance = self.append_basic_block('array_isinstance')
+        bb_checked = self.append_basic_block('array_type_checked')
+        b.cbranch(is_ndarray, bb_checked, bb_isinstance)
+
+        # Fall back to isinstance() for subclasses
+        b.position_at_end(bb_isinstance)
+        _, isinstance_func = self.function_cache.function_by_name(
+                                                    'PyObject_IsInstance')
+        result = b.call(isinstance_func, [lobj, ndarray])
+        self.raise_if(b.icmp(lc.ICMP_SLE, result,
+                             lc.Constant.int(result.type, 0)),
+                      'PyExc_TypeError', msg)
+        b.branch(bb_checked)
+        b.position_at_end(bb_checked)
+
+        # Check dimensionality and dtype
+        acc = ndarray_helpers.PyArrayAccessor(
+                            b, b.bitcast(lobj, llvm_types._numpy_array))
+        ndim = acc.ndim
+        wrong_ndim = b.icmp(lc.ICMP_NE, ndim,
+                            lc.Constant.int(ndim.type, array_type.ndim))
+
+        dtype = minitypes.map_minitype_to_dtype(array_type.dtype)
+        descr = b.bitcast(acc.descr, llvm_types._numpy_descr)
+        fields = llvm_types._numpy_descr_field_ofs
+
+        def field(name):
+            return b.load(b.gep(descr, [zero, llvm_types.constant_int(
+                                                            fields[name])]))
+
+        type_num = field('type_num')
+        known_type = lc.Constant.int(llvm_types._int1, 0)
+        for num in accepted_type_nums(array_type.dtype, dtype):
+            known_type = b.or_(known_type, b.icmp(
+                    lc.ICMP_EQ, type_num, lc.Constant.int(type_num.type, num)))
+
+        elsize = field('elsize')
+        byteorder = field('byteorder')
+        swapped = {'little': '>', 'big': '<'}[sys.byteorder]
+        wrong_dtype = b.or_(
+            b.or_(b.not_(known_type),
+                  b.icmp(lc.ICMP_EQ, byteorder,
+                         lc.Constant.int(byteorder.type, ord(swapped)))),
+            b.icmp(lc.ICMP_NE, elsize, lc.Constant.int(elsize.type,
+                                                       dtype.itemsize)))
+        self.raise_if(b.or_(wrong_ndim, wrong_dtype), 'PyExc_TypeError', msg)
+
+        self.check_contiguity(lobj, array_type, 'PyExc_TypeError',
+                              "Argument %d: expected a %%s contiguous array" %
+                                                                    argnum)
+
+    def check_contiguity(self, larray, array_type, exc_name, msg):
+        """
+        Raise exc_name if an array is not contiguous in the order of its
+        array type, if that is C or Fortran contiguous. Element accesses
+        rely on the contiguity of the array type. `msg` is formatted with
+        the name of the order.
+        """
+        if not (array_type.is_c_contig or array_type.is_f_contig):
+            return
+
+        if array_type.is_c_contig:
+            order, flag = 'C', array_expressions.NPY_C_CONTIGUOUS
+        else:
+            order, flag = 'Fortran', array_expressions.NPY_F_CONTIGUOUS
+
+        b = self.builder
+        acc = ndarray_helpers.PyArrayAccessor(
+                            b, b.bitcast(larray, llvm_types._numpy_array))
+        flags = acc.flags
+        not_contig = b.icmp(lc.ICMP_EQ,
+                            b.and_(flags, lc.Constant.int(flags.type, flag)),
+                            lc.Constant.int(flags.type, 0))
+        self.raise_if(not_contig, exc_name, msg % order)
+
+    def raise_if(self, llvm_cond, exc_name, msg):
+        "Raise exc_name with the given message if llvm_cond is true"
+        bb_raise = self.append_basic_block('raise_%s' % exc_name)
+        bb_ok = self.append_basic_block('no_error')
+        self.builder.cbranch(llvm_cond, bb_raise, bb_ok)
+        self.builder.position_at_end(bb_raise)
+        self.raise_exception(exc_name, msg)
+        self.builder.position_at_end(bb_ok)
+
+    def raise_exception(self, exc_name, msg):
+        "Set a Python exception and jump to the error label"
+        try:
+            self.mod.add_global_variable(object_.to_llvm(self.context),
+                                         exc_name)
+        except llvm.LLVMException:
+            pass
+
+        exc = self.builder.load(self.mod.get_global_variable_named(exc_name))
+        lmsg = self.visit(nodes.ConstNode(msg, c_string_type))
+        _, set_string = self.function_cache.function_by_name('PyErr_SetString')
+        self.call_with_gil(set_string, [exc, lmsg])
+        self.builder.branch(self.error_label)
+
+    def call_with_gil(self, lfunc, args):
+        """
+        Call a function of the Python C API that needs the GIL. Functions
+        compiled with nogil=True (and prange loop bodies) run without it,
+        so it is reacquired around the call. This is meant for error paths.
+        """
+        b = self.builder
+        if not self.nogil:
+            return b.call(lfunc, args)
+
+        _, ensure = self.function_cache.function_by_name('PyGILState_Ensure')
+        _, release = self.function_cache.function_by_name(
+                                                    'PyGILState_Release')
+        gil_state = b.call(ensure, [])
+        result = b.call(lfunc, args)
+        b.call(release, [gil_state])
+        return result
 
     def _null_obj_temp(self, name, type=None):
         lhs = self.llvm_alloca(type or llvm_types._pyobject_head_struct_p,
@@ -630,6 +1012,8 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
         return self.visit(node.value)
 
     def visit_ConstNode(self, node):
+        if node.type.is_pointer:
+            self.is_relocatable = False
         return node.value(self)
 
     def visit_Attribute(self, node):
@@ -705,7 +1089,9 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
             # FIXME
             raise error.NumbaError(node, 'Else in for-loop is not implemented.')
 
-        if node.iter.type.is_range:
+        if node.iter.type.is_prange:
+            self.generate_prange(node)
+        elif node.iter.type.is_range:
             self.generate_for_range(node, node.target, node.iter, node.body)
         else:
             raise error.NumbaError(node, "Looping over iterables")
@@ -877,6 +1263,245 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
         self.builder.position_at_end(bb_exit)
         self.teardown_loop()
 
+    # Attributes describing the function being generated, swapped out while
+    # generating the body of a prange loop
+    _function_state = ['lfunc', 'builder', 'caster', 'object_coercer',
+                       'blocks', 'in_loop', 'loop_beginnings', 'loop_exits',
+                       'error_label', 'cleanup_label', 'current_cleanup_bb',
+                       'array_descriptors', 'nogil']
+
+    def generate_prange(self, node):
+        """
+        Outline the body of a prange loop into a function executing a chunk
+        of iterations, and run the chunks in parallel through
+        numba.parallel.parallel_for(). See numba.parallel.
+        """
+        from numba import parallel
+
+        parallel.check_prange_body(node)
+
+        b = self.builder
+        start, stop, step = self.visitlist(node.iter.args)
+        self.raise_if(b.icmp(lc.ICMP_EQ, step, lc.Constant.int(step.type, 0)),
+                      'PyExc_ValueError', "prange() step must not be zero")
+
+        def local_variables(names):
+            return [(name, self.symtab[name]) for name in sorted(names)
+                        if name in self.symtab and self.symtab[name].is_local]
+
+        copied = local_variables(node.shared | node.private)
+        reductions = []
+        for name, var in local_variables(node.reductions):
+            if not (var.type.is_int or var.type.is_float):
+                raise error.NumbaError(
+                    node, "Reduction variable %r must be an integer or "
+                          "floating point value, got %s" % (name, var.type))
+            op, identity = node.reductions[name]
+            buffer = self.llvm_alloca(lc.Type.array(self.to_llvm(var.type),
+                                                    parallel.MAX_CHUNKS),
+                                      name='%s_partials' % name)
+            reductions.append((name, var, op, identity, buffer))
+
+        # Environment: pointers to the copied variables followed by the
+        # buffers receiving the partial result of each chunk
+        env_pointers = ([var.lvalue for name, var in copied] +
+                        [buffer for name, var, op, identity, buffer
+                                in reductions])
+        env = self.llvm_alloca(lc.Type.array(llvm_types._void_star,
+                                             len(env_pointers) or 1),
+                               name='prange_env')
+        for i, pointer in enumerate(env_pointers):
+            env_item = b.gep(env, [llvm_types.constant_int(0),
+                                   llvm_types.constant_int(i)])
+            b.store(b.bitcast(pointer, llvm_types._void_star), env_item)
+
+        body_lfunc = self.build_prange_body(node, copied, reductions)
+
+        # Py_ssize_t parallel_for(void *body, void *env, Py_ssize_t start,
+        #                         Py_ssize_t stop, Py_ssize_t step)
+        self.is_relocatable = False
+        parallel_for_type = lc.Type.function(
+                    _intp, [llvm_types._void_star] * 2 + [_intp] * 3)
+        parallel_for = b.inttoptr(
+                    lc.Constant.int(_intp, parallel.parallel_for_address()),
+                    lc.Type.pointer(parallel_for_type))
+        nchunks = b.call(parallel_for, [
+                    b.bitcast(body_lfunc, llvm_types._void_star),
+                    b.bitcast(env, llvm_types._void_star),
+                    start, stop, step])
+        # Raise the exception of the failed loop
+        bb_raise = self.append_basic_block('prange_error')
+        bb_ok = self.append_basic_block('prange_done')
+        b.cbranch(b.icmp(lc.ICMP_SLT, nchunks, lc.Constant.int(_intp, 0)),
+                  bb_raise, bb_ok)
+        b.position_at_end(bb_raise)
+        reraise = self.visit(nodes.ObjectInjectNode(parallel.reraise_error))
+        _, call_object = self.function_cache.function_by_name(
+                                                    'PyObject_CallObject')
+        self.call_with_gil(call_object, [reraise,
+                                         lc.Constant.null(reraise.type)])
+        b.branch(self.error_label)
+        b.position_at_end(bb_ok)
+
+        for name, var, op, identity, buffer in reductions:
+            self.combine_partials(var, op, buffer, nchunks)
+
+    def build_prange_body(self, node, copied, reductions):
+        """
+        Build the function executing iterations [lower, upper) of a prange
+        loop:
+
+            int body(void *env, Py_ssize_t chunk, Py_ssize_t start,
+                     Py_ssize_t step, Py_ssize_t lower, Py_ssize_t upper)
+
+        All local variables are private to the function, copied variables
+        are initialized from the environment, and reduction results are
+        stored in the chunk's slot of the reduction buffers. Returns 0, or
+        -1 with an exception set in the executing thread.
+        """
+        body_type = lc.Type.function(_int32,
+                                     [llvm_types._void_star] + [_intp] * 5)
+        lfunc = self.mod.add_function(body_type, '__numba_prange_body_%s' %
+                                                            self.func_name)
+        lfunc.linkage = lc.LINKAGE_INTERNAL
+
+        state = dict((attr, getattr(self, attr))
+                         for attr in self._function_state)
+        lvalues = dict((name, var.lvalue)
+                           for name, var in self.symtab.iteritems()
+                               if var.is_local and var.lvalue is not None)
+        try:
+            self.lfunc = lfunc
+            self.blocks = {}
+            # Chunks run in worker threads without the GIL
+            self.nogil = True
+            self.builder = b = lc.Builder.new(self.append_basic_block('entry'))
+            self.caster = _LLVMCaster(b)
+            self.object_coercer = ObjectCoercer(self)
+            self.in_loop = 0
+            self.loop_beginnings = []
+            self.loop_exits = []
+
+            env, chunk, start, step, lower, upper = lfunc.args
+            env = b.bitcast(env, lc.Type.pointer(llvm_types._void_star))
+
+            def env_item(i, ltype):
+                pointer = b.load(b.gep(env, [llvm_types.constant_int(i)]))
+                return b.bitcast(pointer, lc.Type.pointer(ltype))
+
+            for name in lvalues:
+                var = self.symtab[name]
+                var.lvalue = b.alloca(self.to_llvm(var.type),
+                                      name='var_%s' % name)
+
+            for i, (name, var) in enumerate(copied):
+                b.store(b.load(env_item(i, var.lvalue.type.pointee)),
+                        var.lvalue)
+
+            # Descriptors of the function's entry block belong to the
+            # parent function, load those of the copied arrays here
+            copied_names = set(name for name, var in copied)
+            self._init_array_descriptors(
+                [name for name in self.array_descriptors
+                          if name in copied_names])
+
+            for name, var, op, identity, buffer in reductions:
+                ltype = self.to_llvm(var.type)
+                if var.type.is_float:
+                    lidentity = lc.Constant.real(ltype, identity)
+                else:
+                    lidentity = lc.Constant.int(ltype, identity)
+                b.store(lidentity, var.lvalue)
+
+            # Errors stop the chunk, parallel.parallel_for() raises them
+            # in the thread executing the loop
+            bb_entry = b.basic_block
+            self.error_label = self.append_basic_block('error_label')
+            self.cleanup_label = self.current_cleanup_bb = self.error_label
+            b.position_at_end(self.error_label)
+            b.ret(lc.Constant.int(_int32, -1))
+            b.position_at_end(bb_entry)
+
+            # for (k = lower; k < upper; k++) { target = start + k * step; ... }
+            bb_cond = self.append_basic_block('prange.cond')
+            bb_incr = self.append_basic_block('prange.incr')
+            bb_body = self.append_basic_block('prange.body')
+            bb_exit = self.append_basic_block('prange.exit')
+
+            k = b.alloca(_intp, name='k')
+            b.store(lower, k)
+            b.branch(bb_cond)
+
+            b.position_at_end(bb_cond)
+            b.cbranch(b.icmp(lc.ICMP_SLT, b.load(k), upper), bb_body, bb_exit)
+
+            b.position_at_end(bb_incr)
+            b.store(b.add(b.load(k), lc.Constant.int(_intp, 1)), k)
+            b.branch(bb_cond)
+
+            b.position_at_end(bb_body)
+            target = self.symtab[node.target.id]
+            index = b.add(start, b.mul(b.load(k), step))
+            b.store(self.caster.cast(index, self.to_llvm(target.type)),
+                    target.lvalue)
+
+            self.setup_loop(bb_incr, bb_exit)
+            for stmt in node.body:
+                self.visit(stmt)
+            if not self.is_block_terminated():
+                self.builder.branch(bb_incr)
+            self.teardown_loop()
+
+            b.position_at_end(bb_exit)
+            for i, (name, var, op, identity, buffer) in enumerate(reductions):
+                partials = env_item(len(copied) + i, buffer.type.pointee)
+                slot = b.gep(partials, [llvm_types.constant_int(0), chunk])
+                b.store(b.load(var.lvalue), slot)
+            b.ret(lc.Constant.int(_int32, 0))
+        finally:
+            for attr, value in state.iteritems():
+                setattr(self, attr, value)
+            for name, lvalue in lvalues.iteritems():
+                self.symtab[name].lvalue = lvalue
+
+        # Optimize the body like the function itself, see translate()
+        lfunc.verify()
+        if self.fastmath:
+            fastmath.relax(lfunc)
+        if self.optimize:
+            refcount.eliminate_refcount_pairs(lfunc)
+            LLVMContextManager().optimize(lfunc, self.opt_level)
+
+        return lfunc
+
+    def combine_partials(self, var, op, buffer, nchunks):
+        "var = var <op> buffer[0] <op> ... <op> buffer[nchunks - 1]"
+        b = self.builder
+        if var.type.is_float:
+            combine = {ast.Add: b.fadd, ast.Mult: b.fmul}[op]
+        else:
+            combine = {ast.Add: b.add, ast.Mult: b.mul}[op]
+
+        bb_cond = self.append_basic_block('combine.cond')
+        bb_body = self.append_basic_block('combine.body')
+        bb_exit = self.append_basic_block('combine.exit')
+
+        i = self.llvm_alloca(_intp, name='chunk')
+        b.store(lc.Constant.int(_intp, 0), i)
+        b.branch(bb_cond)
+
+        b.position_at_end(bb_cond)
+        b.cbranch(b.icmp(lc.ICMP_SLT, b.load(i), nchunks), bb_body, bb_exit)
+
+        b.position_at_end(bb_body)
+        partial = b.load(b.gep(buffer, [llvm_types.constant_int(0),
+                                        b.load(i)]))
+        b.store(combine(b.load(var.lvalue), partial), var.lvalue)
+        b.store(b.add(b.load(i), lc.Constant.int(_intp, 1)), i)
+        b.branch(bb_cond)
+
+        b.position_at_end(bb_exit)
+
     def visit_While(self, node):
         bb_cond = self.append_basic_block('while.cond')
         bb_body = self.append_basic_block('while.body')
@@ -940,6 +1565,11 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
         return self.builder.call(func, (lhs, rhs))
 
     def visit_BinOp(self, node):
+        if self.fastmath and node.type.is_float:
+            result = self._fast_float_binop(node)
+            if result is not None:
+                return result
+
         lhs = self.visit(node.left)
         rhs = self.visit(node.right)
         op = type(node.op)
@@ -969,6 +1599,51 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
 
         return result
 
+    def _fast_float_binop(self, node):
+        """
+        Contract a * b + c into llvm.fmuladd, and replace division by a
+        constant by multiplication with its reciprocal (fastmath=True).
+        Returns None for other operations.
+        """
+        op = type(node.op)
+        b = self.builder
+        ltype = node.type.to_llvm(self.context)
+
+        if op is ast.Div:
+            divisor = node.right
+            if isinstance(divisor, nodes.CoercionNode):
+                divisor = divisor.node
+            if (isinstance(divisor, nodes.ConstNode) and
+                    isinstance(divisor.pyval, (int, long, float)) and
+                    divisor.pyval != 0):
+                reciprocal = lc.Constant.real(ltype, 1.0 / divisor.pyval)
+                return b.fmul(self.visit(node.left), reciprocal)
+        elif op in (ast.Add, ast.Sub):
+            def is_product(operand):
+                return (isinstance(operand, ast.BinOp) and
+                        isinstance(operand.op, ast.Mult) and
+                        operand.type == node.type)
+
+            negative_zero = lc.Constant.real(ltype, -0.0)
+            if is_product(node.left):
+                # a * b + c, a * b - c
+                x = self.visit(node.left.left)
+                y = self.visit(node.left.right)
+                z = self.visit(node.right)
+                if op is ast.Sub:
+                    z = b.fsub(negative_zero, z)
+                return fastmath.fmuladd(self.mod, b, x, y, z)
+            elif is_product(node.right):
+                # c + a * b, c - a * b
+                z = self.visit(node.left)
+                x = self.visit(node.right.left)
+                y = self.visit(node.right.right)
+                if op is ast.Sub:
+                    x = b.fsub(negative_zero, x)
+                return fastmath.fmuladd(self.mod, b, x, y, z)
+
+        return None
+
     def visit_CoercionNode(self, node, val=None):
         if val is None:
             val = self.visit(node.node)
@@ -986,6 +1661,15 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
             val = self.builder.inttoptr(val, ldst_type)
         elif dst_type.is_complex and node_type.is_complex:
             val = self._promote_complex(node_type, dst_type, val)
+        elif node_type.is_array and dst_type.is_array:
+            # Array types differing in contiguity share their representation
+            # (see transforms.ResolveCoercions), but a coercion to a more
+            # contiguous type must be checked
+            if ((dst_type.is_c_contig and not node_type.is_c_contig) or
+                    (dst_type.is_f_contig and not node_type.is_f_contig)):
+                self.check_contiguity(val, dst_type, 'PyExc_ValueError',
+                                      "Expected a %s contiguous array")
+            val = self.caster.cast(val, ldst_type)
         elif dst_type.is_complex and node_type.is_numeric:
             ldst_base_type = dst_type.base_type.to_llvm(self.context)
             real = val
@@ -1023,6 +1707,23 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
                     value_type.is_sized_pointer):
             raise error.InternalError(node, "Unsupported type:", node.value.type)
 
+        index = node.slice
+        if isinstance(index, nodes.CoercionNode):
+            index = index.node
+
+        if (isinstance(node.value, nodes.ArrayAttributeNode) and
+                node.value.attr_name in ('shape', 'strides') and
+                isinstance(node.value.array, ast.Name) and
+                node.value.array.id in self.array_descriptors and
+                isinstance(index, nodes.ConstNode) and
+                isinstance(index.pyval, (int, long)) and
+                isinstance(node.ctx, ast.Load)):
+            # Shape or stride of an array argument, loaded in the entry block
+            descriptor = self.array_descriptors[node.value.array.id]
+            values = getattr(descriptor, node.value.attr_name)
+            if -len(values) <= index.pyval < len(values):
+                return values[index.pyval]
+
         value = self.visit(node.value)
         lptr = self.builder.gep(value, [self.visit(node.slice)])
         if node.slice.type.is_int:
@@ -1037,6 +1738,216 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
         lptr = node.subscript(self, lvalue, lindices)
         return self._handle_ctx(node, lptr)
 
+    def visit_ArraySliceNode(self, node):
+        """
+        Compute the data pointer, shape and strides of a view. Local views
+        are built as an array struct in stack memory, other views as a new
+        ndarray with the sliced array as base.
+        """
+        b = self.builder
+        larray = b.bitcast(self.visit(node.value), llvm_types._numpy_array)
+        descriptor = self.array_descriptor(node.value, larray)
+
+        zero = lc.Constant.int(_intp, 0)
+        data = descriptor.data
+        shape = []
+        strides = []
+        dim = 0
+        for slice_dim in node.dims:
+            if slice_dim.kind == 'newaxis':
+                shape.append(lc.Constant.int(_intp, 1))
+                strides.append(zero)
+                continue
+
+            extent = descriptor.shape[dim]
+            stride = descriptor.strides[dim]
+            dim += 1
+            if slice_dim.kind == 'index':
+                index = self.visit(slice_dim.index)
+                index = b.select(b.icmp(lc.ICMP_SLT, index, zero),
+                                 b.add(index, extent), index)
+                self.raise_if(b.icmp(lc.ICMP_UGE, index, extent),
+                              'PyExc_IndexError', "index out of bounds")
+                data = b.gep(data, [b.mul(index, stride)])
+            else:
+                start, length, step = self.slice_bounds(slice_dim, extent)
+                data = b.gep(data, [b.mul(start, stride)])
+                shape.append(length)
+                strides.append(b.mul(stride, step))
+
+        ndim = node.type.ndim
+        shape_array = self.llvm_alloca(lc.Type.array(_intp, ndim),
+                                       'view_shape')
+        strides_array = self.llvm_alloca(lc.Type.array(_intp, ndim),
+                                         'view_strides')
+        for i in range(ndim):
+            index = [llvm_types.constant_int(0), llvm_types.constant_int(i)]
+            b.store(shape[i], b.gep(shape_array, index))
+            b.store(strides[i], b.gep(strides_array, index))
+
+        index = [llvm_types.constant_int(0), llvm_types.constant_int(0)]
+        shape_array = b.gep(shape_array, index)
+        strides_array = b.gep(strides_array, index)
+
+        acc = ndarray_helpers.PyArrayAccessor(b, larray)
+        ob_type = b.load(b.gep(larray, [
+                llvm_types.constant_int(0),
+                llvm_types.constant_int(llvm_types._head_len - 1)]))
+        if node.local:
+            return self.build_local_view(node.type, larray, ob_type, data,
+                                         shape, strides, shape_array,
+                                         strides_array, acc.flags)
+
+        if self.nogil:
+            raise error.NumbaError(
+                node, "Cannot create array views in functions compiled with "
+                      "nogil=True that are not only used locally, this "
+                      "requires the GIL")
+
+        # The descriptor reference is stolen by PyArray_NewFromDescr. NumPy
+        # sets the contiguity flags of the new array.
+        descr = acc.descr
+        self.incref(descr)
+        result = self.call_multiarray_api(
+                'PyArray_NewFromDescr', ob_type, descr,
+                lc.Constant.int(_int32, ndim), shape_array, strides_array,
+                data, lc.Constant.int(_int32, 0), larray)
+
+        bb_set_base = self.append_basic_block('set_view_base')
+        bb_done = self.append_basic_block('view_done')
+        b.cbranch(b.icmp(lc.ICMP_EQ, result, lc.Constant.null(result.type)),
+                  bb_done, bb_set_base)
+
+        # The view keeps the sliced array alive, and is only writeable if
+        # the array is
+        b.position_at_end(bb_set_base)
+        lview = b.bitcast(result, llvm_types._numpy_array)
+        self.incref(larray)
+        b.store(b.bitcast(larray, llvm_types._void_star),
+                self._array_field(lview, 4))
+        flags_p = self._array_field(lview, 6)
+        not_writeable = lc.Constant.int(_int32, ~ndarray_helpers.NPY_WRITEABLE)
+        b.store(b.and_(b.load(flags_p), b.or_(acc.flags, not_writeable)),
+                flags_p)
+        b.branch(bb_done)
+
+        b.position_at_end(bb_done)
+        return result
+
+    def _array_field(self, larray, index):
+        "Pointer to a field of an array struct, see ndarray_helpers"
+        return self.builder.gep(larray, [
+            llvm_types.constant_int(0),
+            llvm_types.constant_int(llvm_types._head_len + index)])
+
+    def slice_bounds(self, slice_dim, extent):
+        """
+        Normalize the bounds of a slice of a dimension with the given extent
+        like PySlice_GetIndicesEx. Returns the start, the length and the step
+        of the slice.
+        """
+        b = self.builder
+
+        def const(value):
+            return lc.Constant.int(_intp, value)
+
+        zero = const(0)
+        if slice_dim.step is None:
+            step = const(1)
+        else:
+            step = self.visit(slice_dim.step)
+            if not isinstance(slice_dim.step, nodes.ConstNode):
+                self.raise_if(b.icmp(lc.ICMP_EQ, step, zero),
+                              'PyExc_ValueError', "slice step cannot be zero")
+            elif slice_dim.step.pyval == 0:
+                raise error.NumbaError(slice_dim.step,
+                                       "slice step cannot be zero")
+
+        # Bounds are clipped to [0, extent] for positive steps and to
+        # [-1, extent - 1] for negative steps. These selects are folded for
+        # constant steps.
+        positive = b.icmp(lc.ICMP_SGT, step, zero)
+        last = b.sub(extent, const(1))
+        low = b.select(positive, zero, const(-1))
+        high = b.select(positive, extent, last)
+
+        def bound(node, default):
+            if node is None:
+                return default
+            value = self.visit(node)
+            value = b.select(b.icmp(lc.ICMP_SLT, value, zero),
+                             b.add(value, extent), value)
+            value = b.select(b.icmp(lc.ICMP_SLT, value, low), low, value)
+            return b.select(b.icmp(lc.ICMP_SGT, value, high), high, value)
+
+        start = bound(slice_dim.lower, b.select(positive, zero, last))
+        stop = bound(slice_dim.upper, b.select(positive, extent, const(-1)))
+
+        # length = ceil(distance / |step|), or 0 for empty slices
+        distance = b.select(positive, b.sub(stop, start), b.sub(start, stop))
+        abs_step = b.select(positive, step, b.sub(zero, step))
+        length = b.sdiv(b.sub(b.add(distance, abs_step), const(1)), abs_step)
+        length = b.select(b.icmp(lc.ICMP_SGT, distance, zero), length, zero)
+        return start, length, step
+
+    def build_local_view(self, type, larray, ob_type, data, shape, strides,
+                         shape_array, strides_array, array_flags):
+        """
+        Build the array struct of a view that doesn't escape the function in
+        stack memory. The optimizer can keep its fields in registers.
+        """
+        b = self.builder
+        NPY_C_CONTIGUOUS = array_expressions.NPY_C_CONTIGUOUS
+        NPY_F_CONTIGUOUS = array_expressions.NPY_F_CONTIGUOUS
+
+        def flag(condition, value):
+            return b.select(condition, lc.Constant.int(_int32, value),
+                            lc.Constant.int(_int32, 0))
+
+        def contiguous(dims):
+            "Whether the view has the strides of a contiguous array"
+            result = lc.Constant.int(lc.Type.int(1), 1)
+            expected = lc.Constant.int(_intp, type.dtype.itemsize)
+            for i in dims:
+                one = lc.Constant.int(_intp, 1)
+                result = b.and_(result, b.or_(
+                    b.icmp(lc.ICMP_EQ, shape[i], one),
+                    b.icmp(lc.ICMP_EQ, strides[i], expected)))
+                expected = b.mul(expected, shape[i])
+            return result
+
+        dims = range(type.ndim)
+        flags = b.and_(array_flags, lc.Constant.int(_int32, ~(
+                    NPY_C_CONTIGUOUS | NPY_F_CONTIGUOUS |
+                    ndarray_helpers.NPY_OWNDATA)))
+        if type.is_c_contig:
+            flags = b.or_(flags, lc.Constant.int(_int32, NPY_C_CONTIGUOUS))
+        else:
+            flags = b.or_(flags, flag(contiguous(reversed(dims)),
+                                      NPY_C_CONTIGUOUS))
+        if type.is_f_contig:
+            flags = b.or_(flags, lc.Constant.int(_int32, NPY_F_CONTIGUOUS))
+        else:
+            flags = b.or_(flags, flag(contiguous(dims), NPY_F_CONTIGUOUS))
+
+        view = self.llvm_alloca(llvm_types._numpy_struct, 'view')
+        head = [llvm_types.constant_int(0),
+                llvm_types.constant_int(llvm_types._head_len - 2)]
+        # The view is never deallocated, reference counting it (when it is
+        # assigned to a variable) must not drop its count to zero
+        b.store(lc.Constant.int(_intp, 1 << 30), b.gep(view, head))
+        head[1] = llvm_types.constant_int(llvm_types._head_len - 1)
+        b.store(ob_type, b.gep(view, head))
+
+        fields = [data, lc.Constant.int(_int32, type.ndim), shape_array,
+                  strides_array, b.bitcast(larray, llvm_types._void_star),
+                  ndarray_helpers.PyArrayAccessor(b, larray).descr, flags,
+                  lc.Constant.null(llvm_types._void_star)]
+        for i, value in enumerate(fields):
+            b.store(value, self._array_field(view, i))
+
+        return view
+
     #def visit_Index(self, node):
     #    return self.visit(node.value)
 
@@ -1067,6 +1978,7 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
         # FIXME: Currently uses the runtime address of the python function.
         #        Sounds like a hack.
         self.func.live_objects.append(node.object)
+        self.is_relocatable = False
         addr = id(node.object)
         obj_addr_int = self.generate_constant_int(addr, _types.Py_ssize_t)
         obj = self.builder.inttoptr(obj_addr_int,
@@ -1132,12 +2044,14 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
 
         return_value = self._handle_struct_passing(largs, node)
 
-        if getattr(node.llvm_func, 'module', None) != self.mod:
-            lfunc = self.mod.get_or_insert_function(node.llvm_func.type.pointee,
-                                                    node.llvm_func.name)
-        else:
-            lfunc = node.llvm_func
-        result = self.builder.call(node.llvm_func, largs, name=node.name)
+        if self.nogil and node.requires_gil:
+            raise error.NumbaError(
+                node, "Cannot call %s() from a function compiled with "
+                      "nogil=True, it was not compiled with nopython=True" %
+                                        getattr(node.py_func, '__name__', ''))
+
+        lfunc = inlining.get_callee(self, node.llvm_func)
+        result = self.builder.call(lfunc, largs, name=node.name)
 
         if node.signature.struct_by_reference:
             if node.signature.return_type.is_complex:
@@ -1225,7 +2139,72 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
 
         # Generate Py_XDECREF(temp) at end-of-function cleanup path
         self.xdecref_temp_cleanup(lhs)
-        return self.builder.load(lhs, name=name + '_load')
+        result = self.builder.load(lhs, name=name + '_load')
+        if node.type.is_array:
+            result = self.builder.bitcast(result, llvm_types._numpy_array)
+        return result
+
+    def visit_ArrayNewNode(self, node):
+        """
+        Allocate an array with PyArray_Empty, PyArray_Zeros or
+        PyArray_NewLikeArray. Returns a new reference (or NULL).
+        """
+        if self.nogil:
+            raise error.NumbaError(
+                node, "Cannot allocate arrays in functions compiled with "
+                      "nogil=True, this requires the GIL")
+
+        b = self.builder
+        call = self.call_multiarray_api
+
+        def const(value):
+            return lc.Constant.int(_int32, value)
+
+        # The descriptor reference is stolen by the allocation functions
+        dtype = minitypes.map_minitype_to_dtype(node.type.dtype)
+        descr = call('PyArray_DescrFromType', const(dtype.num))
+
+        ndim = const(node.type.ndim)
+        if node.like is not None:
+            like = b.bitcast(self.visit(node.like), llvm_types._numpy_array)
+            if not node.zeros:
+                NPY_KEEPORDER = 2
+                return call('PyArray_NewLikeArray', like,
+                            const(NPY_KEEPORDER), descr, const(0))
+
+            # Fortran order for arrays that are only Fortran contiguous
+            flags = ndarray_helpers.PyArrayAccessor(b, like).flags
+            c_contig = b.and_(flags, lc.Constant.int(
+                        flags.type, array_expressions.NPY_C_CONTIGUOUS))
+            f_contig = b.and_(flags, lc.Constant.int(
+                        flags.type, array_expressions.NPY_F_CONTIGUOUS))
+            fortran = b.zext(b.and_(
+                b.icmp(lc.ICMP_NE, f_contig, lc.Constant.null(flags.type)),
+                b.icmp(lc.ICMP_EQ, c_contig, lc.Constant.null(flags.type))),
+                _int32)
+            dimensions = self.array_descriptor(node.like, like).dimensions
+            return call('PyArray_Zeros', ndim, dimensions, descr, fortran)
+
+        dimensions = self.llvm_alloca(lc.Type.array(_intp, node.type.ndim),
+                                      'dimensions')
+        for i, extent in enumerate(self.visitlist(node.shape)):
+            b.store(extent, b.gep(dimensions, [llvm_types.constant_int(0),
+                                               llvm_types.constant_int(i)]))
+
+        dimensions = b.gep(dimensions, [llvm_types.constant_int(0),
+                                        llvm_types.constant_int(0)])
+        return call(('PyArray_Empty', 'PyArray_Zeros')[node.zeros],
+                    ndim, dimensions, descr, const(node.fortran))
+
+    def call_multiarray_api(self, name, *args):
+        "Call a function of the NumPy C API, casting the arguments"
+        b = self.builder
+        # The address of the API table is specific to this process
+        self.is_relocatable = False
+        func = get_multiarray_api().load(name, self.mod, b)
+        largs = [b.bitcast(arg, ltype) if arg.type != ltype else arg
+                     for arg, ltype in zip(args, func.type.pointee.args)]
+        return b.call(func, largs)
 
     def visit_ObjectTempRefNode(self, node):
         return node.obj_temp_node.llvm_temp
@@ -1235,9 +2214,18 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
 
     def visit_ArrayAttributeNode(self, node):
         array = self.visit(node.array)
-        acc = ndarray_helpers.PyArrayAccessor(self.builder, array)
-
         attr_name = node.attr_name
+        if (isinstance(node.array, ast.Name) and
+                node.array.id in self.array_descriptors):
+            descriptor = self.array_descriptors[node.array.id]
+            if attr_name in ('shape', 'dimensions'):
+                return descriptor.dimensions
+            elif attr_name == 'strides':
+                return descriptor.strides_ptr
+            elif attr_name == 'data':
+                return descriptor.data
+
+        acc = ndarray_helpers.PyArrayAccessor(self.builder, array)
         if attr_name == 'shape':
             attr_name = 'dimensions'
 
@@ -1247,6 +2235,350 @@ class LLVMCodeGenerator(visitors.NumbaVisitor, ComplexSupportMixin,
         # hurgh, no dispatch on superclasses?
         return self.visit_ArrayAttributeNode(node)
 
+    def visit_ArrayExpressionNode(self, node):
+        """
+        Evaluate the operands, broadcast them against the result and call
+        the minivect kernel for the layout of the operands:
+
+            kernel(out.shape, data_pointers, strides_pointers, scalars...)
+        """
+        b = self.builder
+        operands = self.visitlist(node.operands)
+        if node.out is None:
+            out = self.allocate_array_expression(node, operands)
+        else:
+            out = b.bitcast(self.visit(node.out), llvm_types._numpy_array)
+
+        arrays = [(operand.type, b.bitcast(loperand, llvm_types._numpy_array))
+                      for operand, loperand in zip(node.operands, operands)
+                          if operand.type.is_array]
+        if node.out is not None:
+            # The kernels read and write element by element, operands
+            # overlapping the result (other than the result itself) would
+            # read elements already written: a[...] = a[::-1] + 1
+            arrays = [(type, self.copy_if_overlapping(node.type, out,
+                                                      type, larray))
+                          for type, larray in arrays]
+        scalars = [loperand
+                       for operand, loperand in zip(node.operands, operands)
+                           if not operand.type.is_array]
+
+        acc = ndarray_helpers.PyArrayAccessor(b, out)
+        shape = acc.dimensions
+        data_pointers = self.llvm_alloca(
+                lc.Type.array(llvm_types._void_star, len(arrays) + 1),
+                'data_pointers')
+        strides_pointers = self.llvm_alloca(
+                lc.Type.array(llvm_types._intp_star, len(arrays) + 1),
+                'strides_pointers')
+
+        def store(array, index, value):
+            b.store(value, b.gep(array, [llvm_types.constant_int(0),
+                                         llvm_types.constant_int(index)]))
+
+        store(data_pointers, 0, acc.data)
+        store(strides_pointers, 0, acc.strides)
+
+        # (ndim, itemsize, flags, strides) of the result and the operands
+        layout_info = [(node.type.ndim, node.type.dtype.itemsize, acc.flags,
+                        acc.strides)]
+        broadcasting = lc.Constant.int(lc.Type.int(1), 0)
+        broadcast_error = lc.Constant.int(lc.Type.int(1), 0)
+        for i, (type, larray) in enumerate(arrays):
+            strides, broadcast, mismatch = self.broadcast_strides(
+                    larray, type.ndim, shape, node.type.ndim)
+            broadcasting = b.or_(broadcasting, broadcast)
+            broadcast_error = b.or_(broadcast_error, mismatch)
+            array_acc = ndarray_helpers.PyArrayAccessor(b, larray)
+            store(data_pointers, i + 1, array_acc.data)
+            store(strides_pointers, i + 1, strides)
+            layout_info.append((type.ndim, type.dtype.itemsize,
+                                array_acc.flags, strides))
+
+        self.raise_if(broadcast_error, 'PyExc_ValueError',
+                      "operands could not be broadcast together")
+
+        args = [shape,
+                b.bitcast(data_pointers, llvm_types._void_star_star),
+                b.bitcast(strides_pointers,
+                          lc.Type.pointer(llvm_types._intp_star))]
+        args.extend(scalars)
+
+        layouts = array_expressions.candidate_layouts(
+                node.type.ndim, [type.ndim for type, larray in arrays])
+        conditions = self.array_layout_conditions(layout_info, broadcasting)
+
+        bb_done = self.append_basic_block('array_expression_done')
+        for layout in layouts:
+            if layout != layouts[-1]:
+                bb_kernel = self.append_basic_block('layout_%s' % layout)
+                bb_next = self.append_basic_block('not_%s' % layout)
+                b.cbranch(conditions[layout](), bb_kernel, bb_next)
+                b.position_at_end(bb_kernel)
+
+            kernel = array_expressions.get_kernel(self.context, node, layout,
+                                                  self.mod, self.ee,
+                                                  self.fastmath)
+            b.call(kernel, [b.bitcast(arg, larg.type) if arg.type != larg.type
+                                else arg
+                                    for arg, larg in zip(args, kernel.args)])
+            b.branch(bb_done)
+
+            if layout != layouts[-1]:
+                b.position_at_end(bb_next)
+
+        b.position_at_end(bb_done)
+        return out
+
+    def array_extent(self, type, larray):
+        """
+        The memory spanned by the elements of an array: the (low, high)
+        addresses, and whether the array is empty.
+        """
+        b = self.builder
+        acc = ndarray_helpers.PyArrayAccessor(b, larray)
+        zero = lc.Constant.int(_intp, 0)
+        one = lc.Constant.int(_intp, 1)
+
+        low = high = b.ptrtoint(acc.data, _intp)
+        empty = lc.Constant.int(lc.Type.int(1), 0)
+        for i in range(type.ndim):
+            index = llvm_types.constant_int(i)
+            extent = b.load(b.gep(acc.dimensions, [index]))
+            stride = b.load(b.gep(acc.strides, [index]))
+            empty = b.or_(empty, b.icmp(lc.ICMP_EQ, extent, zero))
+            offset = b.mul(b.sub(extent, one), stride)
+            negative = b.icmp(lc.ICMP_SLT, offset, zero)
+            low = b.add(low, b.select(negative, offset, zero))
+            high = b.add(high, b.select(negative, zero, offset))
+
+        high = b.add(high, lc.Constant.int(_intp, type.dtype.itemsize))
+        return low, high, empty
+
+    def copy_if_overlapping(self, out_type, out, type, larray):
+        """
+        Copy an operand of an array expression if it overlaps the result
+        array, unless it has the same data, shape and strides (each element
+        is only read before it is written). Returns the operand or the copy.
+        """
+        b = self.builder
+        out_low, out_high, out_empty = self.array_extent(out_type, out)
+        low, high, empty = self.array_extent(type, larray)
+        overlap = b.and_(b.icmp(lc.ICMP_ULT, low, out_high),
+                         b.icmp(lc.ICMP_ULT, out_low, high))
+        overlap = b.and_(overlap, b.not_(b.or_(empty, out_empty)))
+
+        if type.ndim == out_type.ndim:
+            acc = ndarray_helpers.PyArrayAccessor(b, larray)
+            out_acc = ndarray_helpers.PyArrayAccessor(b, out)
+            same = b.icmp(lc.ICMP_EQ, b.ptrtoint(acc.data, _intp),
+                          b.ptrtoint(out_acc.data, _intp))
+            for i in range(type.ndim):
+                index = llvm_types.constant_int(i)
+                for attr in ('dimensions', 'strides'):
+                    same = b.and_(same, b.icmp(lc.ICMP_EQ,
+                        b.load(b.gep(getattr(acc, attr), [index])),
+                        b.load(b.gep(getattr(out_acc, attr), [index]))))
+            overlap = b.and_(overlap, b.not_(same))
+
+        if self.nogil:
+            self.raise_if(overlap, 'PyExc_ValueError',
+                          "array expression operands overlapping the result "
+                          "can only be copied with the GIL")
+            return larray
+
+        bb_copy = self.append_basic_block('copy_operand')
+        bb_done = self.append_basic_block('copy_operand_done')
+        bb_start = b.basic_block
+        b.cbranch(overlap, bb_copy, bb_done)
+
+        # operand.copy()
+        b.position_at_end(bb_copy)
+        _, call_method = self.function_cache.function_by_name(
+                                                    'PyObject_CallMethod')
+        lobject = object_.to_llvm(self.context)
+        result = b.call(call_method, [
+                    b.bitcast(larray, lobject),
+                    self.visit(nodes.ConstNode("copy", c_string_type)),
+                    lc.Constant.null(call_method.type.pointee.args[2])])
+        result = self.visit(nodes.ObjectTempNode(nodes.LLVMValueRefNode(
+                object_, result)))
+        copy = b.bitcast(result, larray.type)
+        bb_copy_end = b.basic_block
+        b.branch(bb_done)
+
+        b.position_at_end(bb_done)
+        operand = b.phi(larray.type)
+        operand.add_incoming(larray, bb_start)
+        operand.add_incoming(copy, bb_copy_end)
+        return operand
+
+    def array_layout_conditions(self, layout_info, broadcasting):
+        """
+        Build the runtime conditions for the layouts in
+        array_expressions.layouts, given (ndim, itemsize, flags, strides)
+        of the result and operands, and whether any operand is broadcast.
+        Returns a dict mapping layout names to functions building the i1.
+        """
+        NPY_C_CONTIGUOUS = array_expressions.NPY_C_CONTIGUOUS
+        NPY_F_CONTIGUOUS = array_expressions.NPY_F_CONTIGUOUS
+
+        b = self.builder
+        true = lc.Constant.int(lc.Type.int(1), 1)
+
+        def all_(values):
+            return reduce(b.and_, values, true)
+
+        def has_flag(flags, flag):
+            flag = lc.Constant.int(flags.type, flag)
+            return b.icmp(lc.ICMP_NE, b.and_(flags, flag),
+                          lc.Constant.int(flags.type, 0))
+
+        def contiguous_in(get_dim):
+            "Whether every operand has unit stride in dimension get_dim(ndim)"
+            result = []
+            for ndim, itemsize, flags, strides in layout_info:
+                if ndim == 0:
+                    continue
+                index = llvm_types.constant_int(get_dim(ndim))
+                stride = b.load(b.gep(strides, [index]))
+                result.append(b.icmp(lc.ICMP_EQ, stride,
+                                     lc.Constant.int(_intp, itemsize)))
+            return result
+
+        def contig():
+            c_contig = all_([has_flag(flags, NPY_C_CONTIGUOUS)
+                                 for ndim, itemsize, flags, _ in layout_info])
+            f_contig = all_([has_flag(flags, NPY_F_CONTIGUOUS)
+                                 for ndim, itemsize, flags, _ in layout_info])
+            return b.and_(b.not_(broadcasting), b.or_(c_contig, f_contig))
+
+        def tiled():
+            inner = contiguous_in(lambda ndim: ndim - 1)
+            outer = contiguous_in(lambda ndim: 0)
+            return all_([b.or_(c, f) for c, f in zip(inner, outer)])
+
+        def strided_fortran():
+            out_flags = layout_info[0][2]
+            return b.and_(has_flag(out_flags, NPY_F_CONTIGUOUS),
+                          b.not_(has_flag(out_flags, NPY_C_CONTIGUOUS)))
+
+        return {
+            'contig': contig,
+            'inner_contig': lambda: all_(contiguous_in(lambda n: n - 1)),
+            'inner_contig_fortran': lambda: all_(contiguous_in(lambda n: 0)),
+            'tiled': tiled,
+            'strided_fortran': strided_fortran,
+            'strided': lambda: true,
+        }
+
+    def broadcast_strides(self, larray, ndim, shape, result_ndim):
+        """
+        Build the strides of an array operand for broadcasting against
+        `shape`. Trailing dimensions are aligned, and dimensions of extent 1
+        get stride 0. Returns the strides, an i1 which is true if the
+        operand's shape differs from `shape` and an i1 which is true if the
+        operand cannot be broadcast.
+        """
+        b = self.builder
+        acc = ndarray_helpers.PyArrayAccessor(b, larray)
+        array_shape = acc.dimensions
+        array_strides = acc.strides
+        strides = self.llvm_alloca(lc.Type.array(_intp, max(ndim, 1)),
+                                   'broadcast_strides')
+
+        one = lc.Constant.int(_intp, 1)
+        zero = lc.Constant.int(_intp, 0)
+        different = lc.Constant.int(lc.Type.int(1), ndim != result_ndim)
+        mismatch = lc.Constant.int(lc.Type.int(1), 0)
+        offset = result_ndim - ndim
+        for dim in range(ndim):
+            index = llvm_types.constant_int(dim)
+            extent = b.load(b.gep(array_shape, [index]))
+            result_extent = b.load(b.gep(
+                    shape, [llvm_types.constant_int(dim + offset)]))
+            broadcast = b.icmp(lc.ICMP_EQ, extent, one)
+            extent_differs = b.icmp(lc.ICMP_NE, extent, result_extent)
+            different = b.or_(different, extent_differs)
+            mismatch = b.or_(mismatch, b.and_(extent_differs,
+                                              b.not_(broadcast)))
+            stride = b.select(broadcast, zero,
+                              b.load(b.gep(array_strides, [index])))
+            b.store(stride, b.gep(strides, [llvm_types.constant_int(0),
+                                            index]))
+
+        strides = b.gep(strides, [llvm_types.constant_int(0),
+                                  llvm_types.constant_int(0)])
+        return strides, different, mismatch
+
+    def allocate_array_expression(self, node, operands):
+        """
+        Allocate the result of an array expression with the broadcast shape
+        of the array operands (see array_expressions.empty_result).
+        """
+        b = self.builder
+        lobject = object_.to_llvm(self.context)
+        dtype = minitypes.map_minitype_to_dtype(node.type.dtype)
+        args = [self.visit(nodes.ObjectInjectNode(dtype))]
+        for operand, loperand in zip(node.operands, operands):
+            if operand.type.is_array:
+                args.append(b.bitcast(loperand, lobject))
+
+        _, tuple_pack = self.function_cache.function_by_name('PyTuple_Pack')
+        nargs = lc.Constant.int(tuple_pack.type.pointee.args[0], len(args))
+        args_tuple = self.visit(nodes.ObjectTempNode(nodes.LLVMValueRefNode(
+                object_, b.call(tuple_pack, [nargs] + args))))
+
+        empty_result = self.visit(
+                nodes.ObjectInjectNode(array_expressions.empty_result))
+        _, call = self.function_cache.function_by_name('PyObject_Call')
+        result = b.call(call, [empty_result, args_tuple,
+                               self.visit(nodes.NULL_obj)])
+        result = self.visit(nodes.ObjectTempNode(nodes.LLVMValueRefNode(
+                object_, result)))
+        return b.bitcast(result, llvm_types._numpy_array)
+
+
+def build_wrapper_function(context, py_func, lfunc, func_signature,
+                           func_name, llvm_module=None, llvm_ee=None,
+                           nogil=False):
+    """
+    Build a PyCFunction wrapper around a compiled LLVM function. This does
+    not need the code generator that produced `lfunc`, so it can also be
+    used for functions loaded from bitcode (see numba.caching).
+
+    Functions without arguments are wrapped as METH_NOARGS and functions
+    with a single argument as METH_O, which saves the argument tuple.
+    METH_FASTCALL (vectorcall) does not exist in the Python 2 C API we
+    target, so other functions take an argument tuple (METH_VARARGS).
+
+    If nogil is set the GIL is released while `lfunc` runs.
+    """
+    # PyObject *(*)(PyObject *self, PyObject *args)
+    def func(self, args):
+        pass
+    func.live_objects = py_func.live_objects
+
+    # Create wrapper code generator and wrapper AST
+    func.__name__ = '__numba_wrapper_%s' % func_name
+    signature = minitypes.FunctionType(return_type=object_,
+                                       args=[void.pointer(), object_])
+    symtab = dict(self=Variable(object_, is_local=True),
+                  args=Variable(object_, is_local=True))
+    wrapper_call = nodes.FunctionWrapperNode(lfunc, func_signature,
+                                             py_func, func, nogil=nogil)
+    error_return = ast.Return(nodes.CoercionNode(nodes.NULL_obj, object_))
+    wrapper_call.error_return = error_return
+    t = LLVMCodeGenerator(context, func, wrapper_call, signature,
+                          symtab, llvm_module=llvm_module, llvm_ee=llvm_ee,
+                          refcount_args=False)
+    t.translate()
+
+    # Return a PyCFunctionObject holding the wrapper
+    func_pointer = t.ee.get_pointer_to_function(t.lfunc)
+    flags = calling_convention(len(func_signature.args))
+    result = pycfunction_new(py_func, func_pointer, flags)
+    return result
 
 def llvm_alloca(lfunc, builder, ltype, name='', change_bb=True):
     "Use alloca only at the entry bock of the function"
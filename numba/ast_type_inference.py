@@ -8,9 +8,9 @@ import __builtin__ as builtins
 
 import numba
 from numba import *
-from numba import error, transforms
+from numba import error, transforms, parallel, array_expressions
 from .minivect import minierror, minitypes
-from . import translate, utils, _numba_types as numba_types
+from . import utils, _numba_types as numba_types
 from .symtab import Variable
 from . import visitors, nodes, error
 from numba import stdio_util
@@ -52,6 +52,13 @@ class BuiltinResolverMixin(transforms.BuiltinResolverMixinBase):
 
     _resolve_xrange = _resolve_range
 
+    def _resolve_prange(self, func, node, argtype):
+        "numba.prange(), see numba.parallel"
+        node = self._resolve_range(func, node, argtype)
+        node.func = nodes.ObjectInjectNode(func)
+        node.variable = Variable(numba_types.PrangeType())
+        return node
+
     def _resolve_len(self, func, node, argtype):
         # Simplify len(array) to ndarray.shape[0]
         self._expect_n_args(func, node, 1)
@@ -164,6 +171,54 @@ class NumpyMixin(object):
         return (self._is_constant_index(node) and
                 node.value.pyval is Ellipsis)
 
+    def _view_type(self, type, slices, view_type):
+        """
+        Add the contiguity of a view to its type. A view of a C contiguous
+        array is C contiguous if it indexes the outer dimensions, slices at
+        most one dimension with unit step and takes the inner dimensions
+        entirely (a[i, :], a[1:-1], a[i, 2:4]), and vice versa for Fortran
+        order.
+        """
+        def kind(node):
+            if isinstance(node, nodes.ObjectInjectNode):
+                bounds = [node.object.start, node.object.stop,
+                          node.object.step]
+            elif isinstance(node, ast.Slice):
+                bounds = [node.lower, node.upper, node.step]
+                bounds = [bound if bound is None else
+                              getattr(bound, 'pyval', bound)
+                                  for bound in bounds]
+            elif node.variable.type.is_int:
+                return 'index'
+            else:
+                return None
+
+            lower, upper, step = bounds
+            if step is not None and step != 1:
+                return None
+            elif lower is None and upper is None:
+                return 'full'
+            return 'range'
+
+        def contiguous(kinds):
+            kinds = list(kinds)
+            while kinds and kinds[0] == 'index':
+                kinds.pop(0)
+            if kinds and kinds[0] == 'range':
+                kinds.pop(0)
+            return all(kind == 'full' for kind in kinds)
+
+        kinds = map(kind, slices)
+        c_contig = type.is_c_contig and contiguous(kinds)
+        f_contig = type.is_f_contig and contiguous(reversed(kinds))
+        if not (c_contig or f_contig):
+            return view_type
+
+        ndim = view_type.ndim
+        return minitypes.ArrayType(view_type.dtype, ndim,
+                                   is_c_contig=c_contig or ndim == 1,
+                                   is_f_contig=f_contig or ndim == 1)
+
     def _unellipsify(self, node, slices, subscript_node):
         """
         Given an array node `node`, process all AST slices and create the
@@ -233,6 +288,8 @@ class NumpyMixin(object):
         result_ndim = node.variable.type.ndim + len(newaxes) - indices_seen
         if result_ndim > 0:
             result_type = result_dtype[(slice(None),) * result_ndim]
+            if not newaxes:
+                result_type = self._view_type(type, result, result_type)
         elif result_ndim == 0:
             result_type = result_dtype
         else:
@@ -329,6 +386,63 @@ class NumpyMixin(object):
 
         return minitypes.ArrayType(dtype.resolve(), ndim)
 
+    def _resolve_numpy_allocation(self, numpy_func, node, result_type):
+        """
+        Allocate arrays natively for np.empty/np.zeros with an integer or a
+        tuple of integers as shape, and np.empty_like/np.zeros_like. Returns
+        a nodes.ArrayNewNode, or None if the call needs to go through
+        Python.
+        """
+        dtype = result_type.dtype
+        if not (dtype.is_numeric or dtype.is_bool):
+            # The descriptor is built from the type number, which doesn't
+            # describe structured dtypes
+            return None
+
+        if numpy_func in (numpy.empty_like, numpy.zeros_like):
+            args = self._parse_args(node, ['a', 'dtype'])
+            like_type = args['a'].variable.type
+            if not like_type.is_array:
+                return None
+
+            # The result has the memory layout of the array
+            type = minitypes.ArrayType(dtype, like_type.ndim,
+                                       is_c_contig=like_type.is_c_contig,
+                                       is_f_contig=like_type.is_f_contig)
+            return nodes.ArrayNewNode(type, numpy_func is numpy.zeros_like,
+                                      like=args['a'])
+        elif numpy_func in (numpy.empty, numpy.zeros):
+            args = self._parse_args(node, ['shape', 'dtype', 'order'])
+            shape = args['shape']
+            if shape.variable.type.is_int:
+                shape = [shape]
+            elif isinstance(shape, ast.Tuple):
+                shape = shape.elts
+            else:
+                return None
+
+            if not all(dim.variable.type.is_int for dim in shape):
+                return None
+
+            order = args['order']
+            if order is None:
+                fortran = False
+            elif (isinstance(order, nodes.ConstNode) and
+                      order.pyval in ('C', 'F')):
+                fortran = order.pyval == 'F'
+            else:
+                return None
+
+            ndim = len(shape)
+            type = minitypes.ArrayType(dtype, ndim,
+                                       is_c_contig=not fortran or ndim == 1,
+                                       is_f_contig=fortran or ndim == 1)
+            shape = nodes.CoercionNode.coerce(shape, numba_types.intp)
+            return nodes.ArrayNewNode(type, numpy_func is numpy.zeros,
+                                      shape=shape, fortran=fortran)
+
+        return None
+
     def _resolve_numpy_call(self, func_type, node):
         """
         Resolve a call of some numpy attribute or sub-attribute.
@@ -482,7 +596,12 @@ class TypeInferer(visitors.NumbaTransformer, BuiltinResolverMixin,
         ast.fix_missing_locations(rhs_target)
 
         assignment = ast.Assign([target], ast.BinOp(rhs_target, node.op, node.value))
-        return self.visit(assignment)
+        result = self.visit(assignment)
+        if (isinstance(target, ast.Name) and
+                result.targets[0].variable.type.is_array):
+            # Update the array in-place, instead of rebinding the name
+            result.inplace = True
+        return result
 
     def _handle_unpacking(self, node):
         """
@@ -579,6 +698,9 @@ class TypeInferer(visitors.NumbaTransformer, BuiltinResolverMixin,
 
         node.target = self.visit(node.target)
         node.iter = self.visit(node.iter)
+        if node.iter.variable.type.is_prange:
+            parallel.analyse_prange(node)
+
         base_type = self._get_iterator_type(node.iter.variable.type)
         node.target = self.assign(node.target.variable, Variable(base_type),
                                   node.target)
@@ -659,6 +781,11 @@ class TypeInferer(visitors.NumbaTransformer, BuiltinResolverMixin,
         node.left = self.visit(node.left)
         node.right = self.visit(node.right)
 
+        if (node.left.variable.type.is_array or
+                node.right.variable.type.is_array):
+            return self._array_expression(node, array_expressions.array_binops,
+                                          [node.left, node.right])
+
         if isinstance(node.op, ast.Pow):
             node = self.pow(node.left, node.right)
             return self.visit(node)
@@ -678,8 +805,38 @@ class TypeInferer(visitors.NumbaTransformer, BuiltinResolverMixin,
 
         return node
 
+    def _array_expression(self, node, operators, operands):
+        """
+        Type an element-wise operation on arrays, which is compiled as part
+        of an array expression (see numba.array_expressions). The result is
+        a new C contiguous array.
+        """
+        if type(node.op) not in operators:
+            raise error.NumbaError(
+                node, "Unsupported operator in array expression")
+
+        for operand in operands:
+            type = operand.variable.type
+            if type.is_array:
+                type = type.dtype
+            if not (type.is_int or type.is_float):
+                raise error.NumbaError(
+                    operand, "Array expressions only support integer and "
+                             "floating point operands, got %s" % (
+                                                    operand.variable.type,))
+
+        result_type = reduce(self.promote_types,
+                             [operand.variable.type for operand in operands])
+        node.variable = Variable(minitypes.ArrayType(
+            result_type.dtype, result_type.ndim, is_c_contig=True))
+        return node
+
     def visit_UnaryOp(self, node):
         node.operand = self.visit(node.operand)
+        if node.operand.variable.type.is_array:
+            return self._array_expression(node, array_expressions.array_unops,
+                                          [node.operand])
+
         if isinstance(node.op, ast.Not):
             node.operand = CoercionNode(node.operand, minitypes.bool_)
             return self.setvar(node, Variable(minitypes.bool_))
@@ -913,11 +1070,24 @@ class TypeInferer(visitors.NumbaTransformer, BuiltinResolverMixin,
 
         return func
 
+    def _is_prange(self, func_node, func):
+        "Whether a call is a call to numba.prange (a global or attribute)"
+        if isinstance(func_node, nodes.ObjectInjectNode):
+            func = func_node.object
+        return func is parallel.prange
+
     def _resolve_external_call(self, call_node, py_func, arg_types=None):
         """
         Resolve a call to a function. If we know about the function,
         generate a native call, otherwise go through PyObject_Call().
         """
+        from numba import functions
+
+        if (functions.is_numba_func(py_func) and
+                getattr(py_func, 'lfunc', None) is not None):
+            # Specialization compiled with jit()
+            return self._resolve_jit_call(call_node, py_func)
+
         signature, llvm_func, py_func = \
                 self.function_cache.compile_function(py_func, arg_types)
 
@@ -932,6 +1102,19 @@ class TypeInferer(visitors.NumbaTransformer, BuiltinResolverMixin,
                                         call_node.args, call_node.keywords,
                                         py_func)
 
+    def _resolve_jit_call(self, call_node, numba_func):
+        "Call a function compiled with jit() with its own signature"
+        signature = numba_func.signature
+        if call_node.keywords or len(call_node.args) != len(signature.args):
+            raise error.NumbaError(
+                call_node, "%s() takes exactly %d arguments" % (
+                                numba_func.func_name, len(signature.args)))
+
+        node = nodes.NativeCallNode(signature, call_node.args,
+                                    numba_func.lfunc, numba_func.py_func)
+        node.requires_gil = not getattr(numba_func, 'nopython', False)
+        return node
+
     def _resolve_method_calls(self, func_type, new_node, node):
         "Resolve special method calls"
         if ((func_type.base_type.is_complex or
@@ -969,6 +1152,12 @@ class TypeInferer(visitors.NumbaTransformer, BuiltinResolverMixin,
         result_type = None
         if func_type.is_numpy_attribute:
             result_type = self._resolve_numpy_call(func_type, node)
+            if result_type is not None and result_type.is_array:
+                numpy_func = getattr(func_type.module, func_type.attr)
+                allocation = self._resolve_numpy_allocation(numpy_func, node,
+                                                            result_type)
+                if allocation is not None:
+                    return ast.copy_location(allocation, node)
         elif func_type.is_module_attribute and func_type.module is cmath:
             new_node, result_type = self._infer_complex_math(
                 func_type, new_node , node, result_type)
@@ -993,7 +1182,9 @@ class TypeInferer(visitors.NumbaTransformer, BuiltinResolverMixin,
         func = self._resolve_function(func_type, func_variable.name)
 
         new_node = None
-        if func_type.is_builtin:
+        if self._is_prange(node.func, func):
+            new_node = self._resolve_prange(parallel.prange, node, None)
+        elif func_type.is_builtin:
             # Call to Python built-in function
             node.variable = Variable(object_)
             new_node = self._resolve_builtin_call(node, func)
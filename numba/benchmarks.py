@@ -0,0 +1,356 @@
+"""
+Benchmarks of compile time and runtime.
+
+Times the kernels of the test suite (sum2d, avg2d, filter2d, fbcorr,
+mandelbrot, diffusion), measuring
+
+    compile:    compiling a new function object with jit(), for the
+                argument types of the smallest problem size, with the
+                time spent in each pipeline stage (see numba.instrumentation)
+    dispatch:   calling the compiled function on the smallest problem size,
+                through an autojit function and directly
+    run:        steady-state time per call for several problem sizes and
+                array layouts, of the numba function (autojit) and the pure
+                Python and NumPy baselines
+
+Run as
+
+    python -m numba.benchmarks [-o results.json] [--compare old.json]
+                               [--quick] [benchmark ...]
+
+Results are written as JSON. With --compare, numba timings that are slower
+than those of an earlier result file by more than --threshold are reported
+and the exit status is 1.
+"""
+
+import sys
+import json
+import types
+import timeit
+
+import numpy as np
+
+timer = timeit.default_timer
+
+def make_array(shape, layout, dtype=np.double):
+    "Random array with layout 'C', 'F' or 'strided'"
+    if layout == 'strided':
+        shape = shape[:-1] + (shape[-1] * 2,)
+    result = np.asarray(np.random.random(shape) * 10, dtype=dtype)
+    if layout == 'F':
+        result = np.asfortranarray(result)
+    elif layout == 'strided':
+        result = result[..., ::2]
+    return result
+
+def copy_function(func):
+    "A new function object for `func`, which has not been compiled yet"
+    return types.FunctionType(func.func_code, func.func_globals,
+                              func.__name__, func.func_defaults,
+                              func.func_closure)
+
+class Benchmark(object):
+    """
+    A kernel to benchmark.
+
+        name:           name of the benchmark
+        get_kernel:     returns the Python function to compile
+        make_args:      make_args(size, layout) -> arguments of the kernel
+        sizes:          problem sizes, smallest first
+        layouts:        array layouts of the arguments
+        numpy_func:     NumPy implementation taking the same arguments
+        python_sizes:   number of sizes to run the pure Python kernel on
+    """
+
+    def __init__(self, name, get_kernel, make_args, sizes,
+                 layouts=('C', 'F', 'strided'), numpy_func=None,
+                 python_sizes=1):
+        self.name = name
+        self.get_kernel = get_kernel
+        self.make_args = make_args
+        self.sizes = sizes
+        self.layouts = layouts
+        self.numpy_func = numpy_func
+        self.python_sizes = python_sizes
+
+#
+### Kernels
+#
+
+def _sum2d():
+    from numba.tests.test_sum import sum2d
+    return sum2d
+
+def _avg2d():
+    from numba.tests.test_avg2d import avg2d
+    return avg2d
+
+def _avg2d_numpy(arr, result):
+    result[:] = arr.mean(axis=1)
+
+def _filter2d():
+    from numba.tests.test_filter2d import filter2d
+    return filter2d
+
+def _filter2d_args(size, layout):
+    filt = np.random.random((5, 5))
+    return make_array((size, size), layout), filt / filt.sum()
+
+def _fbcorr():
+    from numba.tests.test_fbcorr import fbcorr
+    return fbcorr
+
+def _fbcorr_args(size, layout):
+    imgs = make_array((size, 16, 16, 3), layout)
+    return imgs, np.random.randn(6, 5, 5, 3), np.zeros((size, 6, 12, 12))
+
+def _mandel_driver():
+    from numba.tests.test_mandelbrot import mandel_driver
+    return mandel_driver.py_func
+
+def _mandel_driver_args(size, layout):
+    from numba.tests.test_mandelbrot import make_palette
+    palette = make_palette()
+    image = np.zeros((size, size, 3), dtype=np.uint8, order=layout)
+    return -2.0, 1.0, -1.0, len(palette), palette, image
+
+def _diffusion():
+    from numba.tests.test_diffusion import diffusionObstacleStep
+    return diffusionObstacleStep.py_func
+
+def _diffusion_args(iterations, layout):
+    from numba.tests.test_diffusion import Lx, Ly
+    u, temp_u = make_array((Lx, Ly), layout), make_array((Lx, Ly), layout)
+    return u, temp_u, iterations
+
+benchmarks = [
+    Benchmark('sum2d', _sum2d, lambda n, layout: (make_array((n, n), layout),),
+              sizes=[100, 500, 2000], numpy_func=np.sum),
+    Benchmark('avg2d', _avg2d,
+              lambda n, layout: (make_array((n, n), layout), np.empty(n)),
+              sizes=[100, 500, 2000], numpy_func=_avg2d_numpy),
+    Benchmark('filter2d', _filter2d, _filter2d_args, sizes=[64, 256, 1024]),
+    Benchmark('fbcorr', _fbcorr, _fbcorr_args, sizes=[1, 10],
+              layouts=('C', 'F')),
+    Benchmark('mandelbrot', _mandel_driver, _mandel_driver_args,
+              sizes=[50, 200], layouts=('C', 'F')),
+    Benchmark('diffusion', _diffusion, _diffusion_args, sizes=[1, 10],
+              layouts=('C', 'F')),
+]
+
+#
+### Timing
+#
+
+def time_calls(func, args, repeat=3, min_time=0.2):
+    """
+    Time func(*args). Each measurement calls the function often enough to
+    take at least `min_time` seconds. Returns the time per call of each
+    of the `repeat` measurements.
+    """
+    def measure(number):
+        start = timer()
+        for i in xrange(number):
+            func(*args)
+        return timer() - start
+
+    number = 1
+    t = measure(number)
+    while t < min_time and number < 10 ** 6:
+        number *= 10
+        t = measure(number)
+
+    times = [t] + [measure(number) for i in range(repeat - 1)]
+    return [t / number for t in times]
+
+def make_result(benchmark, kind, implementation, times, size=None,
+                layout=None, **extra):
+    result = dict(benchmark=benchmark.name, kind=kind,
+                  implementation=implementation, size=size, layout=layout,
+                  seconds=min(times), times=times)
+    result.update(extra)
+    return result
+
+def bench_compile(benchmark, repeat):
+    "Time compiling new copies of the kernel"
+    from numba import decorators, instrumentation
+
+    kernel = benchmark.get_kernel()
+    args = benchmark.make_args(benchmark.sizes[0], benchmark.layouts[0])
+    argtypes = [decorators.context.typemapper.from_python(arg) for arg in args]
+
+    was_enabled = instrumentation.is_enabled()
+    instrumentation.enable()
+    try:
+        times = []
+        stages = {}
+        for i in range(repeat):
+            func = copy_function(kernel)
+            start = timer()
+            decorators.jit(argtypes=argtypes)(func)
+            times.append(timer() - start)
+
+            for record in instrumentation.records(func):
+                for name, seconds in record.stages:
+                    stages.setdefault(name, []).append(seconds)
+    finally:
+        if not was_enabled:
+            instrumentation.disable()
+
+    stages = dict((name, min(seconds)) for name, seconds in stages.items())
+    return [make_result(benchmark, 'compile', 'numba', times, stages=stages)]
+
+def bench_dispatch(benchmark, repeat, min_time):
+    "Time calls of a compiled specialization through autojit and directly"
+    from numba import decorators
+
+    kernel = benchmark.get_kernel()
+    args = benchmark.make_args(benchmark.sizes[0], benchmark.layouts[0])
+    argtypes = [decorators.context.typemapper.from_python(arg) for arg in args]
+
+    autojit_func = decorators.autojit(copy_function(kernel))
+    jit_func = decorators.jit(argtypes=argtypes)(copy_function(kernel))
+    autojit_func(*args)
+
+    return [
+        make_result(benchmark, 'dispatch', 'autojit',
+               time_calls(autojit_func, args, repeat, min_time),
+               benchmark.sizes[0], benchmark.layouts[0]),
+        make_result(benchmark, 'dispatch', 'jit',
+               time_calls(jit_func, args, repeat, min_time),
+               benchmark.sizes[0], benchmark.layouts[0]),
+    ]
+
+def bench_run(benchmark, repeat, min_time):
+    "Time the numba kernel and the baselines for all sizes and layouts"
+    from numba import decorators
+
+    kernel = benchmark.get_kernel()
+    numba_func = decorators.autojit(copy_function(kernel))
+
+    results = []
+    for i, size in enumerate(benchmark.sizes):
+        for layout in benchmark.layouts:
+            args = benchmark.make_args(size, layout)
+            numba_func(*args) # compile
+
+            implementations = [('numba', numba_func)]
+            if benchmark.numpy_func is not None:
+                implementations.append(('numpy', benchmark.numpy_func))
+            if i < benchmark.python_sizes:
+                implementations.append(('python', kernel))
+
+            for name, func in implementations:
+                times = time_calls(func, args, repeat, min_time)
+                results.append(make_result(benchmark, 'run', name, times,
+                                           size, layout))
+
+    return results
+
+def run_benchmarks(names=None, repeat=3, min_time=0.2, log=None):
+    "Run the benchmarks with the given names (all by default)"
+    results = []
+    for benchmark in benchmarks:
+        if names and benchmark.name not in names:
+            continue
+
+        for bench in (bench_compile(benchmark, repeat),
+                      bench_dispatch(benchmark, repeat, min_time),
+                      bench_run(benchmark, repeat, min_time)):
+            for r in bench:
+                if log is not None:
+                    log.write(format_result(r) + '\n')
+                results.append(r)
+
+    return results
+
+#
+### Reporting
+#
+
+def environment():
+    import numba
+    import llvm
+
+    return dict(numba=numba.__version__, numpy=np.__version__,
+                llvm=getattr(llvm, '__version__', None), python=sys.version,
+                platform=sys.platform)
+
+def format_result(r):
+    size = r['size']
+    if size is None:
+        size = ''
+    return '%-12s %-9s %-8s %6s %-8s %12.3f us' % (
+        r['benchmark'], r['kind'], r['implementation'], size,
+        r['layout'] or '', r['seconds'] * 1e6)
+
+def result_key(r):
+    return (r['benchmark'], r['kind'], r['implementation'], r['size'],
+            r['layout'])
+
+def compare(results, old_results, threshold=0.1):
+    """
+    Compare numba timings with an earlier run. Returns a list of
+    (new result, old result) pairs that are slower by more than `threshold`
+    (a fraction of the old time).
+    """
+    old = dict((result_key(r), r) for r in old_results)
+    regressions = []
+    for r in results:
+        if r['implementation'] in ('python', 'numpy'):
+            continue
+        old_r = old.get(result_key(r))
+        if (old_r is not None and
+                r['seconds'] > old_r['seconds'] * (1 + threshold)):
+            regressions.append((r, old_r))
+
+    return regressions
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark compile time and runtime of numba kernels")
+    parser.add_argument('benchmarks', nargs='*',
+                        help="benchmarks to run (default: all of %s)" %
+                                ', '.join(b.name for b in benchmarks))
+    parser.add_argument('-o', '--output', help="write results as JSON")
+    parser.add_argument('--compare', help="JSON results of an earlier run")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="relative slowdown reported as regression")
+    parser.add_argument('--quick', action='store_true',
+                        help="single short measurements")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        repeat, min_time = 1, 0.01
+    else:
+        repeat, min_time = 3, 0.2
+
+    results = run_benchmarks(args.benchmarks, repeat, min_time,
+                             log=sys.stdout)
+    if args.output:
+        f = open(args.output, 'w')
+        try:
+            json.dump(dict(environment=environment(), results=results), f,
+                      indent=2)
+        finally:
+            f.close()
+
+    if args.compare:
+        f = open(args.compare)
+        try:
+            old_results = json.load(f)['results']
+        finally:
+            f.close()
+        regressions = compare(results, old_results, args.threshold)
+        for new, old in regressions:
+            print 'REGRESSION %s (was %.3f us)' % (format_result(new),
+                                                  old['seconds'] * 1e6)
+        if regressions:
+            return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
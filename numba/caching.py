@@ -0,0 +1,257 @@
+"""
+Persistent on-disk cache for compiled specializations.
+
+Compiling a function through the pipeline (decompilation, type inference,
+LLVM code generation) can take seconds for larger functions. Specializations
+compiled with cache=True are compiled into a module of their own, and the
+LLVM bitcode of that module is written to the cache directory together with
+the inferred signature. Later processes load the bitcode and only build the
+(cheap) Python wrapper, skipping the compiler pipeline. Loaded functions are
+registered for inlining and recorded by numba.instrumentation like compiled
+ones.
+
+Entries are keyed by:
+
+    - the marshalled code object of the function
+    - the values of constant globals, closure variables and default
+      arguments that are baked into the code (and the types of others)
+    - the argument and return types, and compiler flags
+    - the numba, llvm-py and Python versions
+
+Functions that embed addresses of live Python objects (object mode code,
+ctypes function pointers) or call other numba functions are not cached,
+since their code is only valid in the process that generated it. This
+includes inlined calls (see numba.inlining): the key doesn't cover the code
+of the callee, so the entry would not be invalidated when it changes.
+
+The cache directory defaults to ~/.numba_cache, and can be overridden with
+the NUMBA_CACHE_DIR environment variable or set_cache_dir(). Nothing is
+written to it unless the cache is enabled, by compiling a function with
+cache=True or configuring the directory.
+"""
+
+import os
+import sys
+import errno
+import marshal
+import hashlib
+import logging
+import tempfile
+import cPickle as pickle
+
+import llvm
+import llvm.core
+
+import numba
+from numba import (naming, pipeline, ast_translate, inlining, functions,
+                   instrumentation)
+
+logger = logging.getLogger(__name__)
+
+_cache_dir = os.environ.get('NUMBA_CACHE_DIR') or os.path.join(
+                                    os.path.expanduser('~'), '.numba_cache')
+_enabled = 'NUMBA_CACHE_DIR' in os.environ
+
+def get_cache_dir():
+    return _cache_dir
+
+def set_cache_dir(path):
+    "Set the directory compiled specializations are written to"
+    global _cache_dir, _enabled
+    _cache_dir = path
+    _enabled = True
+
+def is_enabled():
+    "Whether data (e.g. numba.multiarray_api tables) may be written to disk"
+    return _enabled
+
+def compiler_version():
+    "Versions of all components that influence the generated code"
+    return (numba.__version__, getattr(llvm, '__version__', None),
+            sys.version, sys.maxint)
+
+_constant_types = (int, long, float, complex, str, bool, type(None))
+
+def _key_values(values):
+    "Constant values, and the types of other values, for cache keys"
+    return [value if isinstance(value, _constant_types) else type(value)
+                for value in values]
+
+def _cell_contents(cell):
+    try:
+        return cell.cell_contents
+    except ValueError:
+        # Empty cell, the variable is not assigned yet
+        return None
+
+class DiskCache(object):
+    """
+    Stores and loads compiled specializations. Each entry consists of two
+    files: <key>.bc holding the LLVM bitcode, and <key>.sig holding the
+    pickled signature and the name of the compiled function.
+    """
+
+    def __init__(self, context, path=None):
+        global _enabled
+        self.context = context
+        self.path = path
+        _enabled = True
+
+    @property
+    def cache_dir(self):
+        return self.path or get_cache_dir()
+
+    def key(self, func, restype, argtypes, flags):
+        "Compute the cache key for a specialization"
+        code = func.func_code
+        # Global constants are resolved at compile time (see
+        # TypeInferer.visit_Name), so they are part of the key
+        globals = []
+        for name in code.co_names:
+            value = func.func_globals.get(name)
+            if isinstance(value, _constant_types):
+                globals.append((name, value))
+
+        # Closure variables are resolved like globals, default arguments
+        # determine the types of omitted arguments
+        closure = _key_values(_cell_contents(cell)
+                                  for cell in func.func_closure or ())
+        defaults = _key_values(func.func_defaults or ())
+
+        flags = sorted((name, repr(value)) for name, value in flags.items())
+        state = (marshal.dumps(code), repr(globals), repr(closure),
+                 repr(defaults), repr(restype), repr(tuple(argtypes)),
+                 repr(flags), compiler_version())
+        return hashlib.sha1(repr(state)).hexdigest()
+
+    def module_name(self, key):
+        "The name of the LLVM module of an entry"
+        return 'numba_cache_%s' % key
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.bc', base + '.sig'
+
+    def load(self, func, key, nogil=False, flags=None):
+        """
+        Load a cached specialization. Returns (signature, lfunc, wrapper)
+        or None if there is no (valid) entry for the key. The function is
+        registered for inlining according to the compiler flags, like
+        compiled functions (see numba.inlining).
+        """
+        bitcode_path, sig_path = self._paths(key)
+        if not os.path.exists(sig_path):
+            return None
+
+        llvm_context = self.context.llvm_context
+        try:
+            with open(sig_path, 'rb') as f:
+                func_signature, func_name = pickle.load(f)
+
+            # Compiled or loaded before in this process, e.g. by another
+            # function with the same code
+            module = llvm_context.find_module(self.module_name(key))
+            if module is None:
+                if llvm_context.defines_function(func_name):
+                    logger.debug("Not loading cache entry %s, %s is "
+                                 "already defined", key, func_name)
+                    return None
+
+                with open(bitcode_path, 'rb') as f:
+                    module = llvm.core.Module.from_bitcode(f)
+                llvm_context.add_module(module)
+
+            lfunc = module.get_function_named(func_name)
+        except Exception, e:
+            logger.warning("Ignoring invalid cache entry %s: %s", key, e)
+            return None
+
+        logger.debug("Loaded %s from the disk cache", func_name)
+        inlining.register(lfunc, func, func_signature, flags or {})
+        wrapper = ast_translate.build_wrapper_function(
+                    self.context, func, lfunc, func_signature, func_name,
+                    llvm_module=module, nogil=nogil)
+        return func_signature, lfunc, wrapper
+
+    def is_cacheable(self, translator):
+        "Whether the code generated by the translator can be reloaded"
+        if not translator.is_relocatable:
+            return False
+
+        for lfunc in translator.mod.functions:
+            if lfunc.is_declaration and lfunc.name.startswith('__numba'):
+                # Calls another numba function, which may not be
+                # available when loading the entry
+                return False
+            if lfunc.name.startswith(inlining.copy_prefix):
+                # Inlined copy of another numba function, which is not part
+                # of the key
+                return False
+
+        return True
+
+    def store(self, key, translator):
+        "Write the module and signature of a translated function to disk"
+        bitcode_path, sig_path = self._paths(key)
+        try:
+            os.makedirs(self.cache_dir)
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        # Write to temporary files and rename, so that concurrent processes
+        # never see partially written entries. The signature is renamed
+        # last, since its presence marks a complete entry.
+        for path, write in [
+                (bitcode_path, translator.mod.to_bitcode),
+                (sig_path, lambda f: pickle.dump((translator.func_signature,
+                                                  translator.func_name), f,
+                                                 pickle.HIGHEST_PROTOCOL))]:
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.rename(temp_path, path)
+
+    def compile(self, func, restype=None, argtypes=None, **kwds):
+        """
+        Compile a numba function, loading it from the cache if possible.
+        Returns a triplet (signature, lfunc, wrapper) like pipeline.compile(),
+        and like it holds functions.compile_lock and records the compilation
+        (see numba.instrumentation).
+        """
+        key = self.key(func, restype, argtypes, kwds)
+        with functions.compile_lock:
+            with instrumentation.record_compile(func) as record:
+                with instrumentation.stage('load_cache'):
+                    result = self.load(func, key,
+                                       nogil=kwds.get('nogil', False),
+                                       flags=kwds)
+                if result is None:
+                    result = self._compile(func, key, restype, argtypes,
+                                           kwds)
+                if record is not None:
+                    record.signature = result[0]
+                return result
+
+    def _compile(self, func, key, restype, argtypes, kwds):
+        "Compile a function into a module of its own, and store it"
+        llvm_context = self.context.llvm_context
+        module = llvm_context.create_module(self.module_name(key))
+        pipeline_, (func_signature, symtab, ast) = pipeline._infer_types(
+                    self.context, func, restype, argtypes, codegen=True,
+                    llvm_module=module, **kwds)
+        t = pipeline_.translator
+        inlining.register(t.lfunc, func, func_signature, kwds)
+
+        if self.is_cacheable(t):
+            try:
+                self.store(key, t)
+            except (IOError, OSError, pickle.PicklingError), e:
+                logger.warning("Could not write cache entry for %s: %s",
+                               func.__name__, e)
+        else:
+            logger.debug("%s is not cacheable", t.func_name)
+
+        with instrumentation.stage('build_wrapper'):
+            wrapper = t.build_wrapper_function()
+        return func_signature, t.lfunc, wrapper
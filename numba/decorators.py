@@ -1,14 +1,15 @@
-__all__ = ['autojit', 'jit2', 'jit', 'export', 'exportmany']
+__all__ = ['autojit', 'jit2', 'jit', 'export', 'exportmany', 'vectorize',
+           'guvectorize']
 
 import functools
 import logging
+import itertools
 import types
 
 from numba import *
 from . import _numba_types
 from . import utils, functions, ast_translate as translate, ast_type_inference
-from numba import translate as bytecode_translate
-from numba import error, pipeline
+from numba import error, pipeline, dispatcher, profiler, inlining
 from .minivect import minitypes
 from numba.utils import debugout
 
@@ -21,6 +22,7 @@ default_prototypes = []
 def _internal_export(name=None, restype=double, argtypes=[double], backend='ast', **kws):
     def _iexport(func):
         if backend == 'bytecode':
+            from numba import translate as bytecode_translate
             # FIXME:  This is causing segfault when the same module
             #    is used
             t = bytecode_translate.Translate(func, restype=restype,
@@ -96,7 +98,65 @@ logger = logging.getLogger(__name__)
 #        import numpy
 #        return numpy.vectorize(func)
 
-from numpy import vectorize
+def vectorize(signatures=None, identity=None, **kws):
+    """
+    Build a NumPy ufunc from a scalar function, compiled for each of the
+    given signatures:
+
+        @vectorize(['f8(f8, f8)', 'i8(i8, i8)'], identity=0)
+        def add(a, b):
+            return a + b
+
+    Signatures are strings or minitypes function types. The kernel is
+    compiled in nopython mode, further keyword arguments (e.g. opt_level or
+    fastmath) are passed on to the compiler. identity (None, 0 or 1) is the
+    value of reductions over empty arrays.
+
+    Without signatures, fall back to numpy.vectorize.
+    """
+    if callable(signatures) and not isinstance(signatures, minitypes.Type):
+        import numpy
+        return numpy.vectorize(signatures)
+
+    def _vectorize(func):
+        from numba import ufunc_builder
+
+        builder = ufunc_builder.UFuncBuilder(func, identity, **kws)
+        return _build_ufunc(builder, signatures)
+
+    return _vectorize
+
+def guvectorize(signatures, layout, identity=None, **kws):
+    """
+    Build a generalized NumPy ufunc from a function operating on core
+    dimensions, compiled for each of the given signatures:
+
+        @guvectorize(['void(f8[:], f8[:], f8[:])'], '(n),(n)->()')
+        def dot(a, b, out):
+            result = 0.0
+            for i in range(a.shape[0]):
+                result += a[i] * b[i]
+            out[0] = result
+
+    The function takes the inputs and outputs as arguments and returns
+    nothing. Outputs without core dimensions are 1-element arrays.
+    """
+    def _guvectorize(func):
+        from numba import ufunc_builder
+
+        builder = ufunc_builder.GUFuncBuilder(func, layout, identity, **kws)
+        return _build_ufunc(builder, signatures)
+
+    return _guvectorize
+
+def _build_ufunc(builder, signatures):
+    for signature in signatures:
+        if isinstance(signature, str):
+            name, restype, argtypes = _process_sig(signature)
+            signature = restype(*argtypes)
+        builder.add(signature)
+
+    return builder.build_ufunc()
 
 # The __tr_map__ global maps from Python functions to a Translate
 # object.  This added reference prevents the translator and its
@@ -141,6 +201,7 @@ class NumbaFunction(object):
         if ctypes_func is None:
             self._is_numba_func = True
             self._numba_func = py_func
+            self.nargs = py_func.func_code.co_argcount
 
     def __repr__(self):
         if self.ctypes_func:
@@ -157,42 +218,122 @@ class NumbaFunction(object):
             if kwargs:
                 raise error.NumbaError("Cannot handle keyword arguments yet")
 
-            nargs = self.py_func.func_code.co_argcount
-            if len(args) != nargs:
+            if len(args) != self.nargs:
                 raise error.NumbaError("Expected %d arguments, got %d" % (
-                                                        len(args), nargs))
-            return self.wrapper(self, *args, **kwargs)
+                                                        len(args), self.nargs))
+            return self.wrapper(self, *args)
+
+    _call = __call__
+
+    def _profiled_call(self, *args, **kwargs):
+        "__call__ while numba.profiler is enabled"
+        if self.ctypes_func:
+            start = profiler.timer()
+            result = self.invoke_compiled(self.ctypes_func, *args, **kwargs)
+            profiler.record_call(self.py_func, self.signature, 0.0,
+                                 profiler.timer() - start)
+        elif getattr(self, 'dispatcher', None) is not None:
+            # Recorded per specialization by the Dispatcher
+            result = self._call(*args, **kwargs)
+        else:
+            start = profiler.timer()
+            result = self._call(*args, **kwargs)
+            profiler.record_call(self.py_func, None, 0.0,
+                                 profiler.timer() - start)
+
+        return result
 
     def invoke_compiled(self, compiled_numba_func, *args, **kwargs):
         return compiled_numba_func(*args, **kwargs)
 
 
 # TODO: make these two implementations the same
-def _autojit2(target, nopython, **translator_kwargs):
+def _check_nogil(nopython, kwargs):
+    if kwargs.get('nogil') and not nopython:
+        raise error.NumbaError("nogil=True requires nopython=True")
+
+# Unique names for the modules of bounded autojit functions
+_module_ids = itertools.count()
+
+# Evicted specializations whose code could not be freed yet, since other
+# modules still call them: [lfunc]
+_unreleased = []
+
+def _release_specialization(numba_func):
+    """
+    Free the code of a specialization evicted from a bounded autojit
+    function. The dispatcher only releases specializations without running
+    calls, those still called by other modules are retried on later
+    evictions.
+    """
+    signature, lfunc = numba_func.signature, numba_func.lfunc
+    key = numba_func.py_func, tuple(signature.args)
+    function_cache.compiled_functions.pop(key, None)
+
+    numba_func.ctypes_func = None
+    _unreleased.append(lfunc)
+    _free_unused_specializations()
+
+def _free_unused_specializations():
+    "Free the code of the evicted specializations that are no longer used"
+    llvm_context = context.llvm_context
+    in_use = []
+    while _unreleased:
+        lfunc = _unreleased.pop()
+        if llvm_context.is_module_referenced(lfunc.module):
+            in_use.append(lfunc)
+        else:
+            llvm_context.remove_module(lfunc.module)
+
+    if in_use:
+        logger.debug("Not freeing %d evicted specializations, they are "
+                     "still in use", len(in_use))
+    _unreleased.extend(in_use)
+
+def _autojit2(target, nopython, background=False, warmup=None,
+              max_specializations=None, **translator_kwargs):
+    _check_nogil(nopython, translator_kwargs)
+    inlining.check_inline_option(translator_kwargs.get('inline', 'auto'))
+    if max_specializations is None:
+        max_specializations = dispatcher.default_max_specializations
+
     def _autojit2_decorator(f):
         """
         Defines a numba function, that, when called, specializes on the input
         types. Uses the AST translator backend. For the bytecode translator,
         use @autojit.
         """
-        @functools.wraps(f)
-        def wrapper(numba_func, *args, **kwargs):
-            arguments = args + tuple(kwargs[k] for k in sorted(kwargs))
-            types = tuple(context.typemapper.from_python(value)
-                              for value in arguments)
+        def compile(types):
+            kwargs = dict(translator_kwargs)
+            if max_specializations is not None:
+                # Compile into a module of its own, so that the code can be
+                # freed when the specialization is evicted
+                name = 'autojit_%s_%d' % (f.__name__, _module_ids.next())
+                llvm_context = context.llvm_context
+                kwargs['_llvm_module'] = llvm_context.create_module(name)
+
             dec = jit2(argtypes=types, target=target, nopython=nopython,
-                       **translator_kwargs)
-            compiled_numba_func = dec(f)
-            return numba_func.invoke_compiled(compiled_numba_func, *args, **kwargs)
+                       **kwargs)
+            return dec(f)
+
+        dispatch = dispatcher.Dispatcher(
+            f, compile, context.typemapper, background=background,
+            max_specializations=max_specializations,
+            release=_release_specialization)
+
+        @functools.wraps(f)
+        def wrapper(numba_func, *args):
+            return dispatch(*args)
 
         f.live_objects = []
         numba_func = numba_function_autojit_targets[target](f, wrapper=wrapper)
+        numba_func.dispatcher = dispatch
+        if warmup:
+            dispatch.warmup(warmup)
         return numba_func
 
     return _autojit2_decorator
 
-_func_cache = {}
-
 def _autojit(target, nopython):
     def _autojit_decorator(f):
         """
@@ -200,6 +341,9 @@ def _autojit(target, nopython):
         types. Uses the bytecode translator backend. For the AST backend use
         @autojit2
         """
+        # argument types -> compiled NumbaFunction
+        _func_cache = {}
+
         @functools.wraps(f)
         def wrapper(numba_func, *args, **kwargs):
             # Infer argument types
@@ -226,12 +370,30 @@ def _autojit(target, nopython):
 
     return _autojit_decorator
 
-def autojit(backend='ast', target='cpu', nopython=False, locals=None):
+def autojit(backend='ast', target='cpu', nopython=False, locals=None,
+            **kwargs):
+    """
+    Create a function that specializes on the types of the arguments it is
+    called with. Additional keyword arguments (e.g. cache=True or
+    opt_level=3) are passed on to the AST translator, see jit().
+
+    Options for the AST backend:
+
+        background: compile specializations for new argument types in a
+                    background thread, and run the Python function until
+                    they are compiled (see numba.dispatcher)
+        warmup: list of signatures (sequences of argument types) to compile
+                when the function is defined, in the background if
+                background=True
+        max_specializations: maximum number of specializations to keep,
+                the least recently used one is evicted and its code freed
+                beyond that (see numba.dispatcher)
+    """
     if backend not in ('bytecode', 'ast'):
         if callable(backend):
             func = backend
             return autojit(backend='ast', target=target,
-                           nopython=nopython, locals=locals)(func)
+                           nopython=nopython, locals=locals, **kwargs)(func)
         else:
             raise Exception("The autojit decorator should be called: "
                             "@autojit(backend='bytecode|ast')")
@@ -239,10 +401,13 @@ def autojit(backend='ast', target='cpu', nopython=False, locals=None):
     if backend == 'bytecode':
         return _autojit(target, nopython)
     else:
-        return _autojit2(target, nopython, locals=locals)
+        return _autojit2(target, nopython, locals=locals, **kwargs)
 
 def _jit2(restype=None, argtypes=None, nopython=False,
           _llvm_module=None, _llvm_ee=None, **kwargs):
+    _check_nogil(nopython, kwargs)
+    inlining.check_inline_option(kwargs.get('inline', 'auto'))
+
     def _jit2_decorator(func):
         argtys = argtypes
         if func.func_code.co_argcount == 0 and argtys is None:
@@ -260,8 +425,12 @@ def _jit2(restype=None, argtypes=None, nopython=False,
                                                  llvm_ee=_llvm_ee,
                                                  **kwargs)
         signature, lfunc, wrapper_func = result
-        return NumbaFunction(func, ctypes_func=wrapper_func,
-                             signature=signature, lfunc=lfunc)
+        numba_func = NumbaFunction(func, ctypes_func=wrapper_func,
+                                   signature=signature, lfunc=lfunc)
+        # Calls from other numba functions are native calls of lfunc
+        numba_func._is_numba_func = True
+        numba_func.nopython = nopython
+        return numba_func
 
     return _jit2_decorator
 
@@ -289,6 +458,7 @@ def _jit(restype=None, argtypes=None, backend='bytecode', **kws):
         if use_ast:
             return jit2(argtypes=argtypes)(func)
         else:
+            from numba import translate as bytecode_translate
             if argtypes is None:
                 argtyps = [double]
             else:
@@ -333,6 +503,21 @@ def jit(restype=None, argtypes=None, backend='ast', target='cpu', nopython=False
     Compile a function given the input and return types. If backend='bytecode'
     the bytecode translator is used, if backend='ast' the AST translator is
     used.
+
+    Options for the AST translator:
+
+        cache: store the compiled specialization in the on-disk cache and
+               load it from there in subsequent processes (see numba.caching)
+        opt_level: LLVM optimization level 0-3, defaults to
+                   numba.passes.get_default_opt_level() (see numba.passes)
+        nogil: release the GIL while the compiled function runs (requires
+               nopython=True)
+        inline: whether calls from other numba functions inline the
+                function: 'always', 'never' or 'auto' (small functions,
+                the default), see numba.inlining
+        fastmath: relax floating point semantics (reassociation, fused
+                  multiply-add, no NaNs or infinities, reciprocals) for
+                  faster, vectorizable code, see numba.fastmath
     """
     # Called with f8(f8) syntax which returns a dictionary of argtypes and restype
     if isinstance(restype, minitypes.FunctionType):
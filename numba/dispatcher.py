@@ -0,0 +1,395 @@
+"""
+Dispatch calls of autojit functions to compiled specializations.
+
+Mapping every argument to a numba type through the type mapper, and going
+through the jit decorator and FunctionCache on every call, costs tens of
+microseconds. The Dispatcher instead classifies arguments with a cheap key:
+
+    - NumPy arrays:   (dtype, ndim, C contiguous, F contiguous)
+    - Python scalars: the Python class (int, long, float, complex, bool)
+
+which determines the numba type of the argument. The tuple of keys for
+all arguments is then looked up in a dict of compiled entry points (the
+PyCFunction wrappers). Only arguments that don't have a fast key (e.g.
+ndarray subclasses or arbitrary objects) take the slow path through the
+type mapper.
+
+Dispatch and execution times of calls are recorded when numba.profiler is
+enabled, see Dispatcher._profiled_call.
+
+With background=True, calls with argument types that have no compiled
+specialization yet run the Python function, while the specialization is
+compiled by a BackgroundCompiler thread. Once it is compiled it is
+registered in the dispatch tables, and subsequent calls use it. Since the
+LLVM compiler holds the GIL for most of its work, this bounds the latency
+of the first call rather than making compilation free for other threads.
+All compilations are serialized through numba.functions.compile_lock, and
+specializations whose compilation failed are compiled again on the next
+call.
+
+With max_specializations=N, at most N specializations are kept. When a new
+one is compiled beyond that, the least recently used specialization is
+evicted, and its machine code is freed through the `release` callback once
+no call of it is running anymore. Use and running calls are only tracked
+for bounded dispatchers; the limit defaults to the NUMBA_MAX_SPECIALIZATIONS
+environment variable, or no limit. The tables are modified under the lock
+of the dispatcher, the fast path of unbounded dispatchers only reads them.
+"""
+
+import os
+import Queue
+import logging
+import threading
+import itertools
+
+import numpy as np
+
+from numba import profiler, functions
+
+logger = logging.getLogger(__name__)
+
+_ndarray = np.ndarray
+
+# Python scalar classes whose numba type is determined by the class alone
+_scalar_classes = frozenset([int, long, float, complex, bool])
+
+def fast_key(value):
+    """
+    Return a cheap hashable key determining the numba type of `value`, or
+    None if the type mapper must be consulted.
+    """
+    cls = type(value)
+    if cls is _ndarray:
+        # Key on the dtype itself: the type number doesn't distinguish
+        # byte orders or the layouts of structured dtypes
+        flags = value.flags
+        return (value.dtype, value.ndim,
+                flags.c_contiguous, flags.f_contiguous)
+    elif cls in _scalar_classes:
+        return cls
+
+    return None
+
+
+class BackgroundCompiler(object):
+    """
+    Run compilations in a daemon thread, one at a time. The thread is
+    started on first use.
+    """
+
+    def __init__(self):
+        self.queue = Queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, compile, *args):
+        "Call compile(*args) in the compiler thread"
+        self.lock.acquire()
+        try:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run,
+                                               name='numba-compiler')
+                self.thread.daemon = True
+                self.thread.start()
+        finally:
+            self.lock.release()
+
+        self.queue.put((compile, args))
+
+    def run(self):
+        while True:
+            compile, args = self.queue.get()
+            try:
+                compile(*args)
+            except Exception:
+                logger.exception("Background compilation failed")
+            finally:
+                self.queue.task_done()
+
+    def wait(self):
+        "Wait until all submitted compilations are done"
+        self.queue.join()
+
+background_compiler = BackgroundCompiler()
+
+default_max_specializations = int(
+            os.environ.get('NUMBA_MAX_SPECIALIZATIONS', 0)) or None
+
+
+class Dispatcher(object):
+    """
+    Dispatch calls to specializations of a Python function, compiling new
+    specializations on demand.
+
+        py_func:    the Python function
+        compile:    callable taking a tuple of argument types and returning
+                    a compiled NumbaFunction
+        typemapper: maps Python values to numba types
+        background: compile new specializations in the background compiler
+                    thread, and run py_func until they are compiled
+        max_specializations:
+                    maximum number of specializations to keep, or None
+        release:    callable taking the NumbaFunction of an evicted
+                    specialization, to free its code
+    """
+
+    def __init__(self, py_func, compile, typemapper, background=False,
+                 max_specializations=None, release=None):
+        self.py_func = py_func
+        self.compile = compile
+        self.typemapper = typemapper
+        self.background = background
+        self.max_specializations = max_specializations
+        self.release = release
+
+        # fast key tuple -> compiled entry point
+        self.entry_points = {}
+        # argument types -> compiled entry point
+        self.specializations = {}
+        # compiled entry point -> signature
+        self.signatures = {}
+        # argument types submitted to the background compiler
+        self.pending = set()
+        # Guards the tables above
+        self.lock = threading.RLock()
+
+        # compiled entry point -> tick of last use, the NumbaFunction to
+        # release on eviction, and the number of running calls. Evicted
+        # entry points with running calls -> NumbaFunction. Only tracked if
+        # bounded.
+        self.last_used = None
+        self.compiled = {}
+        self.running = {}
+        self.evicted = {}
+        if max_specializations is not None:
+            self.last_used = {}
+        self.ticks = itertools.count()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __call__(self, *args):
+        key = tuple([fast_key(arg) for arg in args])
+        entry_point = self.entry_points.get(key)
+        if entry_point is None:
+            entry_point = self.resolve(args, key)
+        else:
+            self.hits += 1
+
+        if self.last_used is not None:
+            return self.call_bounded(entry_point, args)
+        return entry_point(*args)
+
+    _call = __call__
+
+    def _profiled_call(self, *args):
+        "__call__ while numba.profiler is enabled"
+        start = profiler.timer()
+        key = tuple([fast_key(arg) for arg in args])
+        entry_point = self.entry_points.get(key)
+        if entry_point is None:
+            # Don't count compilation as dispatch time
+            compile_time = profiler.total_compile_time()
+            entry_point = self.resolve(args, key)
+            start += profiler.total_compile_time() - compile_time
+        else:
+            self.hits += 1
+
+        dispatched = profiler.timer()
+        signature = self.signatures.get(entry_point)
+        if self.last_used is not None:
+            result = self.call_bounded(entry_point, args)
+        else:
+            result = entry_point(*args)
+        profiler.record_call(self.py_func, signature,
+                             dispatched - start, profiler.timer() - dispatched)
+        return result
+
+    def call_bounded(self, entry_point, args):
+        """
+        Call an entry point of a bounded dispatcher. Its use is recorded,
+        and it is not released before the call returns (see evict).
+        """
+        if entry_point is self.py_func:
+            # Background compilation fallback
+            return entry_point(*args)
+
+        with self.lock:
+            if entry_point in self.last_used:
+                self.last_used[entry_point] = self.ticks.next()
+                self.running[entry_point] = self.running.get(entry_point,
+                                                             0) + 1
+            else:
+                # Evicted by another thread since it was looked up
+                entry_point = None
+
+        if entry_point is None:
+            return self(*args)
+
+        try:
+            return entry_point(*args)
+        finally:
+            self.finish_call(entry_point)
+
+    def finish_call(self, entry_point):
+        """
+        Record that a call of an entry point returned, and release it if it
+        was evicted and this was its last running call.
+        """
+        with self.lock:
+            count = self.running.pop(entry_point) - 1
+            if count:
+                self.running[entry_point] = count
+                return
+            numba_func = self.evicted.pop(entry_point, None)
+
+        if numba_func is not None:
+            # Releasing modifies the LLVM context, like compilation
+            with functions.compile_lock:
+                self.release(numba_func)
+
+    def argtypes(self, args):
+        "Get the numba types of the arguments through the type mapper"
+        return tuple([self.typemapper.from_python(arg) for arg in args])
+
+    def resolve(self, args, key):
+        """
+        Slow path: infer the argument types, compile if needed and register
+        the entry point under the fast key.
+        """
+        types = self.argtypes(args)
+        with self.lock:
+            entry_point = self.specializations.get(types)
+            if entry_point is not None:
+                self.hits += 1
+                if None not in key:
+                    self.entry_points[key] = entry_point
+                return entry_point
+
+        if self.background:
+            self.compile_in_background(types, key)
+            return self.py_func
+
+        return self.compile_specialization(types, key)
+
+    def compile_specialization(self, types, key=None):
+        """
+        Compile and register the specialization for the given argument
+        types, and register it under the fast key if given. Returns the
+        entry point.
+        """
+        with functions.compile_lock:
+            try:
+                return self._compile_specialization(types, key)
+            finally:
+                # Failed compilations are retried
+                with self.lock:
+                    self.pending.discard(types)
+
+    def _compile_specialization(self, types, key):
+        with self.lock:
+            entry_point = self.specializations.get(types)
+            if entry_point is not None:
+                # Compiled by another thread in the meantime
+                if key is not None and None not in key:
+                    self.entry_points[key] = entry_point
+                return entry_point
+
+            self.misses += 1
+
+        start = profiler.timer()
+        numba_func = self.compile(types)
+        entry_point = numba_func.ctypes_func
+        profiler.record_compile(self.py_func, numba_func.signature,
+                                profiler.timer() - start)
+
+        with self.lock:
+            self.signatures[entry_point] = numba_func.signature
+            if self.last_used is not None:
+                self.last_used[entry_point] = self.ticks.next()
+                self.compiled[entry_point] = numba_func
+
+            self.specializations[types] = entry_point
+            if key is not None and None not in key:
+                self.entry_points[key] = entry_point
+
+            if self.max_specializations is not None:
+                limit = max(self.max_specializations, 1)
+                while len(self.specializations) > limit:
+                    self.evict_lru()
+
+        return entry_point
+
+    def evict_lru(self):
+        "Evict the least recently used specialization"
+        def last_use(types):
+            return self.last_used.get(self.specializations[types], -1)
+
+        with self.lock:
+            self.evict(min(self.specializations, key=last_use))
+
+    def evict(self, types):
+        """
+        Remove the specialization for the given argument types from the
+        dispatch tables, and pass it to the release callback.
+        """
+        with self.lock:
+            entry_point = self.specializations.pop(types)
+            value = None
+            for key, value in self.entry_points.items():
+                if value is entry_point:
+                    del self.entry_points[key]
+            del value
+
+            self.signatures.pop(entry_point, None)
+            if self.last_used is not None:
+                self.last_used.pop(entry_point, None)
+            numba_func = self.compiled.pop(entry_point, None)
+            self.evictions += 1
+
+            if self.release is None or numba_func is None:
+                return
+            if entry_point in self.running:
+                # Released when the last running call returns
+                self.evicted[entry_point] = numba_func
+                return
+
+        self.release(numba_func)
+
+    def stats(self):
+        """
+        Specialization table statistics. Hits of concurrent calls on the
+        fast path are counted without locking, and may be undercounted.
+        """
+        with self.lock:
+            return dict(specializations=len(self.specializations),
+                        max_specializations=self.max_specializations,
+                        hits=self.hits, misses=self.misses,
+                        evictions=self.evictions)
+
+    def compile_in_background(self, types, key=None):
+        "Submit the specialization for `types` to the background compiler"
+        with self.lock:
+            if types in self.pending or types in self.specializations:
+                return
+            self.pending.add(types)
+
+        background_compiler.submit(self.compile_specialization, types, key)
+
+    def warmup(self, signatures, wait=False):
+        """
+        Compile specializations for a list of signatures, given as sequences
+        of argument types or as function types. With background=True they
+        are compiled in the background unless `wait` is set.
+        """
+        for signature in signatures:
+            types = tuple(getattr(signature, 'args', signature))
+            if self.background and not wait:
+                self.compile_in_background(types)
+            elif types not in self.specializations:
+                self.compile_specialization(types)
+
+    def wait(self):
+        "Wait for all background compilations"
+        background_compiler.wait()
@@ -0,0 +1,90 @@
+"""
+Relaxed floating point semantics, the fastmath option of jit(), autojit()
+and vectorize().
+
+By default floating point code follows IEEE 754 strictly, so LLVM may not
+reassociate operations, which keeps it from vectorizing reductions such as
+sums and dot products. With fastmath=True:
+
+    - floating point arithmetic instructions get all fast-math flags:
+      operations may be reassociated, operands and results are assumed not
+      to be NaN or infinite, the sign of zero is ignored and divisions may
+      use the reciprocal. Functions get the unsafe-fp-math,
+      no-nans-fp-math and no-infs-fp-math attributes. This needs an
+      llvmpy that exposes fast-math flags (LLVM 3.3+), see supported().
+    - the code generator contracts a * b + c into llvm.fmuladd (a fused
+      multiply-add where the target has one), and replaces divisions by
+      constants by multiplications with their reciprocal.
+
+This applies to the kernels of array expressions in the function as well
+(see numba.array_expressions).
+"""
+
+import llvm.core as lc
+
+try:
+    from llvmpy import api
+except ImportError:
+    api = None
+
+# Setters of the fast-math flags of llvmpy's Instruction
+_flag_setters = [
+    'setHasUnsafeAlgebra',
+    'setHasNoNaNs',
+    'setHasNoInfs',
+    'setHasNoSignedZeros',
+    'setHasAllowReciprocal',
+]
+
+_function_attributes = [
+    'unsafe-fp-math',
+    'no-nans-fp-math',
+    'no-infs-fp-math',
+]
+
+_float_opcodes = frozenset(['fadd', 'fsub', 'fmul', 'fdiv', 'frem'])
+
+def supported():
+    "Whether the installed llvmpy can set fast-math flags"
+    return api is not None and hasattr(api.llvm.Instruction, _flag_setters[0])
+
+def is_float_arithmetic(instr):
+    return instr.opcode_name in _float_opcodes
+
+def set_fast_math_flags(instr):
+    "Set all fast-math flags of a floating point instruction"
+    for setter in _flag_setters:
+        getattr(instr._ptr, setter)(True)
+
+def relax(lfunc):
+    """
+    Relax the floating point semantics of an LLVM function: set the
+    fast-math flags of its floating point arithmetic and add the fast-math
+    function attributes. Does nothing if not supported().
+    """
+    if not supported():
+        return
+
+    for bb in lfunc.basic_blocks:
+        for instr in bb.instructions:
+            if is_float_arithmetic(instr):
+                set_fast_math_flags(instr)
+
+    for attribute in _function_attributes:
+        try:
+            lfunc._ptr.addFnAttr(attribute, 'true')
+        except (AttributeError, TypeError):
+            # String attributes are not available in this llvmpy
+            break
+
+def fmuladd(module, builder, a, b, c):
+    """
+    Build a * b + c with llvm.fmuladd, or with fmul and fadd if the
+    intrinsic is not available
+    """
+    intrinsic = getattr(lc, 'INTR_FMULADD', None)
+    if intrinsic is None:
+        return builder.fadd(builder.fmul(a, b), c)
+
+    lfunc = lc.Function.intrinsic(module, intrinsic, [a.type])
+    return builder.call(lfunc, [a, b, c])
@@ -1,4 +1,12 @@
 import ast
+import copy
+import types
+import inspect
+import weakref
+import operator
+import textwrap
+import threading
+import __future__
 
 from numba import *
 from . import naming
@@ -20,6 +28,11 @@ except Exception, exn:
 
 import llvm.core
 
+# The compiler is not thread-safe: it mutates shared LLVM modules, pass
+# managers and caches. All compilations, from any thread, are serialized
+# through this lock (see pipeline.compile() and numba.dispatcher).
+compile_lock = threading.RLock()
+
 def is_numba_func(func):
     return getattr(func, '_is_numba_func', False)
 
@@ -38,8 +51,118 @@ def fix_ast_lineno(tree):
 
     return tree
 
+# code object -> (source, first line number), or None if the source is not
+# available. Weakly keyed, so the code of discarded functions is released.
+_function_sources = weakref.WeakKeyDictionary()
+
+# code object -> decompiled AST, for functions without source
+_decompiled_asts = weakref.WeakKeyDictionary()
+
+# Compiler flags of __future__ statements, which change the bytecode
+_future_flags = reduce(operator.or_,
+                       [getattr(__future__, name).compiler_flag
+                            for name in __future__.all_feature_names])
+
+def _get_source(func):
+    "Get the source of a function, with the line number it starts at"
+    if func.__name__ == '<lambda>':
+        # The source lines of a lambda contain the entire statement
+        return None
+
+    try:
+        lines, firstlineno = inspect.getsourcelines(func)
+    except (IOError, TypeError):
+        return None
+
+    return textwrap.dedent(''.join(lines)), firstlineno
+
+def _find_code(code, name):
+    "Find the code object of a function defined (or nested) in code"
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            if const.co_name == name:
+                return const
+            found = _find_code(const, name)
+            if found is not None:
+                return found
+
+    return None
+
+def _compile_source(code, source):
+    """
+    Compile the source of a function like the function was compiled, and
+    return the code object, or None.
+    """
+    if code.co_freevars:
+        # Define the free variables in an enclosing function, so they are
+        # accessed through cells
+        lines = ['    ' + line for line in source.splitlines(True)]
+        source = 'def __numba_closure():\n    %s = None\n%s' % (
+                        ' = '.join(code.co_freevars), ''.join(lines))
+
+    try:
+        module_code = compile(source, code.co_filename, 'exec',
+                              code.co_flags & _future_flags, True)
+    except SyntaxError:
+        return None
+
+    return _find_code(module_code, code.co_name)
+
+def _parse_function(code, source, firstlineno):
+    """
+    Parse the source of a function. Returns None if it can't be parsed or
+    doesn't match the code (e.g. the file changed after it was imported).
+    """
+    if firstlineno != code.co_firstlineno:
+        return None
+
+    source_code = _compile_source(code, source)
+    if source_code is None or source_code.co_code != code.co_code:
+        return None
+
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+
+    if not tree.body or not isinstance(tree.body[0], ast.FunctionDef):
+        return None
+
+    func_def = tree.body[0]
+    argnames = [arg.id for arg in func_def.args.args
+                           if isinstance(arg, ast.Name)]
+    if (func_def.name != code.co_name or
+            argnames != list(code.co_varnames[:code.co_argcount])):
+        return None
+
+    # Decorators have been applied already
+    func_def.decorator_list = []
+    ast.increment_lineno(func_def, firstlineno - 1)
+    return func_def
+
 def _get_ast(func):
-    return decompile_func(func)
+    """
+    Get the AST of a function. It is parsed from the source of the function
+    when available, and decompiled from the bytecode otherwise. The source
+    (or decompiled AST) is memoized per code object, and every call returns
+    a new AST, since the pipeline modifies it in place.
+    """
+    code = func.func_code
+    if code not in _function_sources:
+        _function_sources[code] = _get_source(func)
+
+    source = _function_sources[code]
+    if source is not None:
+        func_def = _parse_function(code, *source)
+        if func_def is not None:
+            return func_def
+
+        # Don't try again
+        _function_sources[code] = None
+
+    if code not in _decompiled_asts:
+        _decompiled_asts[code] = decompile_func(func)
+    return copy.deepcopy(_decompiled_asts[code])
 
 def _infer_types(context, func, restype=None, argtypes=None, **kwargs):
     import numba.ast_type_inference as type_inference
@@ -96,6 +219,19 @@ class FunctionCache(object):
 
         self.string_constants = {}
 
+        # Persistent cache for functions compiled with cache=True,
+        # created on first use
+        self.disk_cache = None
+
+        # Serializes compilations from different threads
+        self.compile_lock = compile_lock
+
+    def get_disk_cache(self):
+        if self.disk_cache is None:
+            from numba import caching
+            self.disk_cache = caching.DiskCache(self.context)
+        return self.disk_cache
+
     def get_function(self, py_func, argtypes=None):
         result = None
 
@@ -120,6 +256,11 @@ class FunctionCache(object):
         `python_callable` may be the original function, or a ctypes callable
         if the function was compiled.
         """
+        with self.compile_lock:
+            return self._compile_function(func, argtypes, restype, ctypes,
+                                          **kwds)
+
+    def _compile_function(self, func, argtypes, restype, ctypes, **kwds):
         if func is not None:
             result = self.get_function(func, argtypes)
             if result is not None:
@@ -131,8 +272,19 @@ class FunctionCache(object):
                 func = getattr(func, '_numba_func', func)
                 compile_only = getattr(func, '_numba_compile_only', False)
                 kwds['compile_only'] = kwds.get('compile_only', compile_only)
+                use_disk_cache = (kwds.pop('cache', False) and not ctypes and
+                                  not kwds['compile_only'] and
+                                  kwds.get('llvm_module') is None and
+                                  kwds.get('llvm_ee') is None)
                 # numba function, compile
-                func_signature, lfunc, ctypes_func = pipeline.compile(
+                if use_disk_cache:
+                    for kwd in ('compile_only', 'llvm_module', 'llvm_ee'):
+                        kwds.pop(kwd, None)
+                    func_signature, lfunc, ctypes_func = \
+                        self.get_disk_cache().compile(func, restype,
+                                                      argtypes, **kwds)
+                else:
+                    func_signature, lfunc, ctypes_func = pipeline.compile(
                                 self.context, func, restype, argtypes,
                                 ctypes=ctypes, **kwds)
                 self.compiled_functions[func, tuple(func_signature.args)] = (
@@ -366,8 +518,7 @@ class puts(ExternalFunction):
     return_type = int32
 
 class Py_IncRef(ofunc):
-    # TODO: rewrite calls to Py_IncRef/Py_DecRef to direct integer
-    # TODO: increments/decrements
+    # Generated code updates reference counts inline, see numba.refcount
     return_type = void
 
 class Py_DecRef(Py_IncRef):
@@ -376,6 +527,10 @@ class Py_DecRef(Py_IncRef):
 class PyObject_Length(ofunc):
     return_type = Py_ssize_t
 
+class PyObject_CallObject(ExternalFunction):
+    arg_types = [object_, object_]
+    return_type = object_
+
 class PyObject_Call(ExternalFunction):
     arg_types = [object_, object_, object_]
     return_type = object_
@@ -407,6 +562,35 @@ class PyArg_ParseTuple(ExternalFunction):
     return_type = int_
     is_vararg = True
 
+class PyEval_SaveThread(ExternalFunction):
+    arg_types = []
+    return_type = void.pointer()
+
+class PyEval_RestoreThread(ExternalFunction):
+    arg_types = [void.pointer()]
+    return_type = void
+
+class PyGILState_Ensure(ExternalFunction):
+    arg_types = []
+    return_type = int_
+
+class PyGILState_Release(ExternalFunction):
+    arg_types = [int_]
+    return_type = void
+
+class PyObject_IsInstance(ExternalFunction):
+    arg_types = [object_, object_]
+    return_type = int_
+
+class PyErr_SetString(ExternalFunction):
+    arg_types = [object_, c_string_type]
+    return_type = void
+
+class PyErr_Occurred(ExternalFunction):
+    # Returns a borrowed reference
+    arg_types = []
+    return_type = object_
+
 class PyObject_Print(ExternalFunction):
     arg_types = [object_, void.pointer(), int_]
     return_type = int_
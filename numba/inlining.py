@@ -0,0 +1,157 @@
+"""
+Inlining of calls between numba functions.
+
+Calls from one numba function to another (compiled with jit() or autojit())
+are native calls (nodes.NativeCallNode). Whether the callee is inlined is
+decided by its `inline` option:
+
+    auto:   inline functions of at most `inline_threshold` LLVM instructions
+            after optimization (the default)
+    always: always inline the function
+    never:  never inline the function
+
+Inlined functions are marked alwaysinline, and inline_calls() inlines them
+when the caller is optimized (from -O1). Unlike LLVM's always-inliner, it
+only visits the caller rather than the entire module, which is shared by
+all numba functions. This requires the callee to be defined in the module
+of the caller. Callees defined in other modules (e.g. the specializations
+of bounded autojit functions, see numba.dispatcher, or functions compiled
+into a custom module) are compiled again into the module of the caller
+before the code of the caller is generated.
+"""
+
+import ast
+import os
+
+import llvm
+import llvm.core as lc
+
+from numba import error, nodes, instrumentation, refcount
+
+inline_options = ('auto', 'always', 'never')
+
+inline_threshold = int(os.environ.get('NUMBA_INLINE_THRESHOLD', 100))
+
+# Name prefix of the copies of inlined functions compiled into other modules
+copy_prefix = '__numba_inline_'
+
+# (module id, function name) -> InlinedFunction
+_functions = {}
+
+# Keys of the copies being compiled, calls back to those aren't inlined
+_linking = set()
+
+class InlinedFunction(object):
+    """
+    A function marked alwaysinline, with what is needed to compile it into
+    other modules.
+
+        py_func: the Python function
+        signature: the signature of the specialization
+        kwds: the options it was compiled with (see pipeline.compile())
+    """
+
+    def __init__(self, py_func, signature, kwds):
+        self.py_func = py_func
+        self.signature = signature
+        self.kwds = kwds
+
+def check_inline_option(inline):
+    if inline not in inline_options:
+        raise error.NumbaError("inline must be one of %s, got %r" % (
+                               ", ".join(inline_options), inline))
+
+def register(lfunc, py_func, signature, kwds):
+    """
+    Mark a compiled (and optimized) function for inlining according to its
+    inline option.
+    """
+    inline = kwds.get('inline', 'auto')
+    if inline == 'never':
+        lfunc.add_attribute(lc.ATTR_NO_INLINE)
+    elif (inline == 'always' or
+          instrumentation.count_llvm_instructions(lfunc) <= inline_threshold):
+        lfunc.add_attribute(lc.ATTR_ALWAYS_INLINE)
+        _functions[lfunc.module.id, lfunc.name] = InlinedFunction(
+                                                py_func, signature, kwds)
+
+def is_inlined(lfunc):
+    "Whether calls to a function are inlined, see inline_calls()"
+    if lfunc is None or lfunc.is_declaration:
+        return False
+
+    return (lfunc.name in (refcount.INCREF, refcount.DECREF) or
+            (lfunc.module.id, lfunc.name) in _functions)
+
+def inline_calls(lfunc):
+    """
+    Inline the calls of a function to functions marked alwaysinline (see
+    is_inlined()), including the calls of the inlined code. Returns the
+    number of inlined calls.
+    """
+    inlined = 0
+    while True:
+        calls = [instr for bb in lfunc.basic_blocks
+                           for instr in bb.instructions
+                               if instr.opcode_name == 'call']
+        # Recursive calls are not inlined
+        calls = [call for call in calls
+                     if is_inlined(getattr(call, 'called_function', None))
+                         and call.called_function.name != lfunc.name]
+        count = sum(1 for call in calls if lc.inline_function(call))
+        if not count:
+            return inlined
+        inlined += count
+
+def remove_module(mod):
+    "Forget the functions of a module removed from the execution engine"
+    for key in _functions.keys():
+        if key[0] == mod.id:
+            del _functions[key]
+
+def link_callees(translator):
+    """
+    Compile the inlined functions called by the function being translated
+    that are defined in other modules into the module of the translator.
+    This optimizes the module, so it must be done before the code of the
+    function is generated.
+    """
+    for node in ast.walk(translator.ast):
+        if isinstance(node, nodes.NativeCallNode):
+            get_callee(translator, node.llvm_func)
+
+def get_callee(translator, lfunc):
+    """
+    The function to call from the function being translated for a call to
+    `lfunc`: the function itself if it is defined in the same module, a
+    copy compiled into the module if it is inlined, otherwise a declaration.
+    """
+    mod = translator.mod
+    module = getattr(lfunc, 'module', None)
+    if module is None or module == mod:
+        return lfunc
+
+    inlined = _functions.get((module.id, lfunc.name))
+    name = copy_prefix + lfunc.name
+    if inlined is None or (mod.id, name) in _linking:
+        return mod.get_or_insert_function(lfunc.type.pointee, lfunc.name)
+
+    try:
+        return mod.get_function_named(name)
+    except llvm.LLVMException:
+        pass
+
+    from numba import pipeline
+
+    kwds = dict(inlined.kwds, llvm_module=mod, llvm_ee=translator.ee,
+                name=name)
+    signature = inlined.signature
+    _linking.add((mod.id, name))
+    try:
+        _, copy, _ = pipeline.compile(translator.context, inlined.py_func,
+                                      signature.return_type, signature.args,
+                                      compile_only=True, **kwds)
+    finally:
+        _linking.remove((mod.id, name))
+
+    return copy
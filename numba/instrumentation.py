@@ -0,0 +1,181 @@
+"""
+Compile-time instrumentation.
+
+When enabled, every compilation through pipeline.compile() (or the disk
+cache, see numba.caching) produces a CompileRecord, holding the time spent
+in each stage of the compiler and a number of counters:
+
+    ast_nodes               AST nodes before running the pipeline
+    ast_nodes_specialized   AST nodes after the last pipeline stage
+    llvm_instructions       LLVM instructions of the function before and
+    llvm_instructions_opt   after optimization
+
+Stages nest, and are named by their position in the nesting, e.g.
+'codegen.optimize' is the time spent in the LLVM optimizer during the
+'codegen' pipeline stage. Stages that run more than once are accumulated.
+
+Instrumentation is enabled with enable(), or by setting the
+NUMBA_INSTRUMENT environment variable::
+
+    from numba import instrumentation
+    instrumentation.enable()
+    f = jit(double(double))(f)
+
+    instrumentation.stats()
+    # [{'function': 'f', 'signature': 'double (*)(double)', 'total': ...,
+    #   'stages': [['get_ast', ...], ['type_infer', ...], ...],
+    #   'counters': {'ast_nodes': ..., ...}}]
+    instrumentation.dump_json('compile_stats.json')
+"""
+
+import os
+import ast
+import time
+import json
+import threading
+import contextlib
+
+_enabled = bool(os.environ.get('NUMBA_INSTRUMENT'))
+
+# All CompileRecords, in order of completion
+_records = []
+
+# Stack of active CompileRecords of the current thread
+_state = threading.local()
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+class CompileRecord(object):
+    "Timings and counters of the compilation of a single function"
+
+    def __init__(self, func, signature=None):
+        self.func = func
+        self.signature = signature
+        self.total = 0.0
+        self.stages = [] # [[name, seconds]] in order of first entry
+        self.counters = {}
+        self._stage_stack = []
+
+    def add_time(self, name, seconds):
+        for stage in self.stages:
+            if stage[0] == name:
+                stage[1] += seconds
+                break
+        else:
+            self.stages.append([name, seconds])
+
+    def as_dict(self):
+        return {
+            'function': getattr(self.func, '__name__', str(self.func)),
+            'module': getattr(self.func, '__module__', None),
+            'signature': self.signature and str(self.signature),
+            'total': self.total,
+            'stages': [list(stage) for stage in self.stages],
+            'counters': dict(self.counters),
+        }
+
+    def __repr__(self):
+        return '<CompileRecord %s: %.4fs>' % (self.as_dict()['function'],
+                                              self.total)
+
+def _stack():
+    if not hasattr(_state, 'stack'):
+        _state.stack = []
+    return _state.stack
+
+def current_record():
+    "The CompileRecord of the innermost active compilation, or None"
+    stack = _stack()
+    if stack:
+        return stack[-1]
+    return None
+
+@contextlib.contextmanager
+def record_compile(func, signature=None):
+    """
+    Record the compilation of `func`. This is re-entrant: if `func` is
+    already being recorded the active record is used.
+    """
+    record = current_record()
+    if not _enabled or (record is not None and record.func is func):
+        if record is not None and signature is not None:
+            record.signature = signature
+        yield record
+        return
+
+    record = CompileRecord(func, signature)
+    stack = _stack()
+    stack.append(record)
+    start = time.time()
+    try:
+        yield record
+    finally:
+        record.total = time.time() - start
+        stack.pop()
+        _records.append(record)
+
+@contextlib.contextmanager
+def stage(name):
+    "Time a stage of the active compilation, if any"
+    record = current_record()
+    if record is None:
+        yield
+        return
+
+    record._stage_stack.append(name)
+    full_name = '.'.join(record._stage_stack)
+    start = time.time()
+    try:
+        yield
+    finally:
+        record.add_time(full_name, time.time() - start)
+        record._stage_stack.pop()
+
+def count(name, value):
+    "Set a counter of the active compilation, if any"
+    record = current_record()
+    if record is not None:
+        record.counters[name] = value
+
+def count_ast_nodes(tree):
+    return sum(1 for node in ast.walk(tree))
+
+def count_llvm_instructions(lfunc):
+    return sum(len(bb.instructions) for bb in lfunc.basic_blocks)
+
+#
+### Querying results
+#
+
+def records(func=None):
+    "The CompileRecords of all compilations, or those of `func`"
+    if func is None:
+        return list(_records)
+    func = getattr(func, 'py_func', func)
+    return [record for record in _records if record.func is func]
+
+def stats(func=None):
+    "Like records(), but returns a list of dicts"
+    return [record.as_dict() for record in records(func)]
+
+def to_json(func=None, **kwargs):
+    return json.dumps(stats(func), **kwargs)
+
+def dump_json(filename, func=None):
+    f = open(filename, 'w')
+    try:
+        json.dump(stats(func), f, indent=2)
+    finally:
+        f.close()
+
+def clear():
+    del _records[:]
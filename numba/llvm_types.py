@@ -67,13 +67,41 @@ _numpy_array = lc.Type.pointer(_numpy_struct)
 
 _BASE_ARRAY_FIELD_OFS = len(_pyobject_head)
 
+# PyTupleObject: PyObject_VAR_HEAD followed by the inlined items
+_pytuple_struct = lc.Type.struct(_pyobject_head +
+      [_llvm_py_ssize_t,    # ob_size
+       lc.Type.array(_pyobject_head_struct_p, 0), # ob_item
+      ])
+_pytuple = lc.Type.pointer(_pytuple_struct)
+_pytuple_size_ofs = _head_len
+_pytuple_items_ofs = _head_len + 1
+
+# Leading fields of PyArray_Descr, these are stable across NumPy versions
+_numpy_descr_struct = lc.Type.struct(_pyobject_head +
+      [_void_star,          # typeobj
+       _int8,               # kind
+       _int8,               # type
+       _int8,               # byteorder
+       _int8,               # flags
+       _int32,              # type_num
+       _int32,              # elsize
+      ])
+_numpy_descr = lc.Type.pointer(_numpy_descr_struct)
+_numpy_descr_field_ofs = {
+    'kind' : _head_len + 1,
+    'byteorder' : _head_len + 3,
+    'type_num' : _head_len + 5,
+    'elsize' : _head_len + 6,
+}
+
 _numpy_array_field_ofs = {
     'data' : _BASE_ARRAY_FIELD_OFS,
     'ndim' : _BASE_ARRAY_FIELD_OFS + 1,
     'shape' : _BASE_ARRAY_FIELD_OFS + 2,
     'strides' : _BASE_ARRAY_FIELD_OFS + 3,
-    # Skipping base for now...
+    'base' : _BASE_ARRAY_FIELD_OFS + 4,
     'descr' : _BASE_ARRAY_FIELD_OFS + 5,
+    'flags' : _BASE_ARRAY_FIELD_OFS + 6,
 }
 
 def constant_int(value, type=_int32):
@@ -74,10 +74,13 @@ class LLVMCodeGen(codegen.CodeGen):
         # target_data = llvm.ee.TargetData(self.context.llvm_ee)
         llvm_fpm.add(self.context.llvm_ee.target_data)
         pmb = llvm.passes.PassManagerBuilder.new()
-        pmb.opt_level = 3
-        pmb.vectorize = True
+        pmb.opt_level = self.context.opt_level
+        pmb.vectorize = self.context.opt_level >= 3
 
         pmb.populate(llvm_fpm)
+        for llvm_pass in self.context.llvm_passes():
+            llvm_fpm.add(llvm_pass)
+
         llvm_fpm.run(self.lfunc)
 
     def visit_FunctionNode(self, node):
@@ -98,6 +101,8 @@ class LLVMCodeGen(codegen.CodeGen):
         self.visit(node.body)
 
         self.lfunc.verify()
+        if self.context.fastmath:
+            self.context.relax_floating_point(self.lfunc)
         self.optimize()
         # print self.lfunc
 
@@ -284,6 +289,9 @@ class LLVMCodeGen(codegen.CodeGen):
         rhs = self.visit(node.rhs)
 
         op = node.operator
+        if node.type.is_int and op == '/':
+            return self.generate_int_division(node, lhs, rhs)
+
         if (node.type.is_int or node.type.is_float) and node.operator in self._binops:
             llvm_method_name = self._binops[op][node.type.is_int + node.type.is_signed]
             meth = getattr(self.builder, llvm_method_name)
@@ -302,6 +310,41 @@ class LLVMCodeGen(codegen.CodeGen):
                 node, "Binop %s (type=%s) not implemented for types (%s, %s)" % (
                                                 op, node.type, lhs.type, rhs.type))
 
+    def generate_int_division(self, node, lhs, rhs):
+        """
+        Integer division with NumPy semantics: the result is rounded
+        towards minus infinity, and division by zero gives zero instead of
+        trapping.
+        """
+        b = self.builder
+        ltype = lhs.type
+        zero = llvm.core.Constant.int(ltype, 0)
+        one = llvm.core.Constant.int(ltype, 1)
+
+        division_by_zero = b.icmp(llvm.core.ICMP_EQ, rhs, zero)
+        if not node.type.signed:
+            rhs = b.select(division_by_zero, one, rhs)
+            return b.select(division_by_zero, zero, b.udiv(lhs, rhs))
+
+        # MIN / -1 overflows (and traps), NumPy gives MIN
+        min_value = llvm.core.Constant.int(ltype, -(1 << (ltype.width - 1)))
+        minus_one = llvm.core.Constant.int(ltype, -1)
+        overflow = b.and_(b.icmp(llvm.core.ICMP_EQ, lhs, min_value),
+                          b.icmp(llvm.core.ICMP_EQ, rhs, minus_one))
+        rhs = b.select(b.or_(division_by_zero, overflow), one, rhs)
+
+        # Round towards minus infinity if the remainder and divisor have
+        # different signs
+        quotient = b.sdiv(lhs, rhs)
+        remainder = b.srem(lhs, rhs)
+        adjust = b.and_(
+            b.icmp(llvm.core.ICMP_NE, remainder, zero),
+            b.icmp(llvm.core.ICMP_NE,
+                   b.icmp(llvm.core.ICMP_SLT, remainder, zero),
+                   b.icmp(llvm.core.ICMP_SLT, rhs, zero)))
+        quotient = b.select(adjust, b.sub(quotient, one), quotient)
+        return b.select(division_by_zero, zero, quotient)
+
     def generate_compare(self, node, op, lhs_value, rhs_value):
         op = node.operator
         lop = None
@@ -17,7 +17,6 @@ import type_promoter
 import minicode
 import codegen
 import llvm_codegen
-import graphviz
 
 try:
     import llvm.core
@@ -111,6 +110,12 @@ class Context(object):
     use_llvm = False
     optimize_broadcasting = True
 
+    # LLVM optimization level for generated kernels
+    opt_level = 3
+
+    # Relax floating point semantics, see relax_floating_point()
+    fastmath = False
+
     shape_type = minitypes.Py_ssize_t.pointer()
     strides_type = shape_type
 
@@ -119,7 +124,9 @@ class Context(object):
     cleanup_codegen_cls = UndocClassAttribute(codegen.CodeGenCleanup)
     codewriter_cls = UndocClassAttribute(minicode.CodeWriter)
     codeformatter_cls = UndocClassAttribute(minicode.CodeFormatter)
-    graphviz_cls = UndocClassAttribute(graphviz.GraphvizGenerator)
+    # graphviz.GraphvizGenerator by default, pydot is only imported when a
+    # graph is generated
+    graphviz_cls = None
 
     specializer_mixin_cls = None
     variable_resolving_mixin_cls = None
@@ -263,6 +270,23 @@ class Context(object):
             llvm.passes.PASS_CODE_GEN_PREPARE,
         ]
 
+    def relax_floating_point(self, lfunc):
+        """
+        Relax the floating point semantics of a generated LLVM function
+        before it is optimized (e.g. allow reassociation). Called when
+        `fastmath` is set. Does nothing by default.
+        """
+
+    def vector_math_function(self, name, vector_type):
+        """
+        Return the name of a SIMD implementation of the math function `name`
+        (e.g. 'sin') taking and returning vectors of the given
+        :py:class:`minivect.minitypes.VectorType`, or None if there is
+        none. Vectorizing specializers only vectorize calls to math functions
+        that have one.
+        """
+        return None
+
     def mangle_function_name(self, name):
         name = "%s_%d" % (name, self.func_counter)
         self.func_counter += 1
@@ -300,7 +324,12 @@ class Context(object):
         return self.typemapper.to_llvm(type)
 
     def graphviz(self, node, graphviz_name="AST"):
-        visitor = self.graphviz_cls(self, graphviz_name)
+        graphviz_cls = self.graphviz_cls
+        if graphviz_cls is None:
+            import graphviz
+            graphviz_cls = graphviz.GraphvizGenerator
+
+        visitor = graphviz_cls(self, graphviz_name)
         graphviz_graph = visitor.visit(node)
         return graphviz_graph.to_string()
 
@@ -4,6 +4,7 @@ Miscellaneous (convenience) utilities.
 
 __all__ = ['ctypes', 'np', 'llvm', 'lc', 'MiniFunction']
 
+import sys
 import __builtin__
 
 class UnavailableImport(object):
@@ -13,6 +14,20 @@ class UnavailableImport(object):
     def __getattr__(self, attr):
         __import__(self.import_name)
 
+class LazyImport(object):
+    """
+    Stands in for module `name`, which is imported (by importing
+    `import_name`) on first attribute access.
+    """
+
+    def __init__(self, name, import_name=None):
+        self.name = name
+        self.import_name = import_name or name
+
+    def __getattr__(self, attr):
+        __import__(self.import_name)
+        return getattr(sys.modules[self.name], attr)
+
 try:
     import ctypes
 except ImportError:
@@ -23,12 +38,9 @@ try:
 except ImportError:
     np = UnavailableImport("np")
 
-try:
-    import llvm.core
-    from llvm import core as lc
-except ImportError:
-    llvm = UnavailableImport("llvm")
-    lc = UnavailableImport("llvm.core")
+# LLVM is only imported when code is generated
+llvm = LazyImport("llvm", "llvm.core")
+lc = LazyImport("llvm.core")
 
 import treepath
 
@@ -865,11 +865,15 @@ def get_any_array_argument(arguments):
 class CanVectorizeVisitor(minivisitor.TreeVisitor):
     """
     Determines whether we can vectorize a given expression. Currently only
-    support arithmetic on floats and doubles.
+    support arithmetic on floats and doubles, and calls to math functions
+    that have a SIMD implementation.
     """
 
     can_vectorize = True
 
+    # Vector size of the specializer, set by can_vectorize()
+    vector_size = None
+
     def _valid_type(self, type):
         if type.is_array:
             type = type.dtype
@@ -900,7 +904,24 @@ class CanVectorizeVisitor(minivisitor.TreeVisitor):
             self.can_vectorize = False
 
     def visit_FuncCallNode(self, node):
-        self.can_vectorize = False
+        # Calls to math functions with a SIMD implementation (see
+        # Context.vector_math_function)
+        name = getattr(node.func_or_pointer, 'name', None)
+        if (name is None or self.vector_size is None or
+                not self._valid_type(node.type)):
+            self.can_vectorize = False
+            return
+
+        for arg in node.args:
+            if arg.type != node.type:
+                self.can_vectorize = False
+                return
+
+        vector_type = minitypes.VectorType(node.type, self.vector_size)
+        if self.context.vector_math_function(name, vector_type) is None:
+            self.can_vectorize = False
+        else:
+            self.visitchildren(node)
 
     def visit_NodeWrapper(self, node):
         # TODO: dispatch to self.context.can_vectorize
@@ -950,6 +971,7 @@ class VectorizingSpecializer(Specializer):
     @classmethod
     def can_vectorize(cls, context, ast):
         visitor = cls.can_vectorize_visitor(context)
+        visitor.vector_size = cls.vector_size
         visitor.visit(ast)
         # print visitor.can_vectorize, ast.pos
         return visitor.can_vectorize
@@ -990,6 +1012,22 @@ class VectorizingSpecializer(Specializer):
 
         return node
 
+    @visit_if_should_vectorize
+    def visit_FuncCallNode(self, node):
+        self.visitchildren(node)
+        if node.args and miniutils.all(arg.type.is_vector
+                                           for arg in node.args):
+            b = self.astbuilder
+            vector_type = node.args[0].type
+            name = self.context.vector_math_function(
+                                node.func_or_pointer.name, vector_type)
+            func_type = minitypes.FunctionType(
+                    return_type=vector_type,
+                    args=[vector_type] * len(node.args))
+            node = b.funccall(b.funcname(func_type, name), node.args)
+
+        return node
+
     @visit_if_should_vectorize
     def visit_ForNode(self, node):
         node.should_vectorize = True
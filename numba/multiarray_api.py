@@ -2,12 +2,25 @@
 
 Defines a utility class for generating LLVM code that retrieves values
 out of the Numpy array C API PyCObject/capsule.
+
+The symbol table of the API (names, indices and C types of its members) is
+scraped from NumPy's __multiarray_api.h once per NumPy build, and cached
+in the numba cache directory if the cache is enabled (see numba.caching).
 '''
 # ______________________________________________________________________
 
+import os
+import re
+import ctypes
+import hashlib
+import logging
+import tempfile
+import cPickle as pickle
+
+import llvm
 import llvm.core as lc
-import llvm.ee as le
 
+import numpy
 from numpy.core.multiarray import _ARRAY_API
 
 from .llvm_types import _int1, _int8, _int32, _int64, _intp, \
@@ -16,6 +29,105 @@ from .llvm_types import _int1, _int8, _int32, _int64, _intp, \
 
 from .scrape_multiarray_api import get_include, process_source
 
+logger = logging.getLogger(__name__)
+
+# ______________________________________________________________________
+
+def get_api_pointer (api_object):
+    '''Get the address of a C API table (such as
+    numpy.core.multiarray._ARRAY_API) from its PyCapsule or PyCObject.'''
+    if type(api_object).__name__ == 'PyCapsule':
+        get_pointer = ctypes.pythonapi.PyCapsule_GetPointer
+        get_pointer.argtypes = [ctypes.py_object, ctypes.c_char_p]
+        get_pointer.restype = ctypes.c_void_p
+        return get_pointer(api_object, None)
+    else:
+        get_pointer = ctypes.pythonapi.PyCObject_AsVoidPtr
+        get_pointer.argtypes = [ctypes.py_object]
+        get_pointer.restype = ctypes.c_void_p
+        return get_pointer(api_object)
+
+# ______________________________________________________________________
+
+# NumPy build -> api map, for the headers of the installed NumPy
+_api_maps = {}
+
+def _c_api_version ():
+    '''The NPY_API_VERSION of the NumPy headers, or None'''
+    config_path = os.path.join(numpy.get_include(), 'numpy',
+                               '_numpyconfig.h')
+    try:
+        with open(config_path) as config_file:
+            config = config_file.read()
+    except IOError:
+        return None
+
+    match = re.search(r'#define\s+NPY_API_VERSION\s+(\w+)', config)
+    return match and match.group(1)
+
+_numpy_build = None
+
+def numpy_build ():
+    '''Identifies the installed NumPy build: its version, ABI version
+    and C API version, which determine the layout of the API table.'''
+    global _numpy_build
+    if _numpy_build is None:
+        from numpy.core.multiarray import _get_ndarray_c_version
+        _numpy_build = (numpy.__version__, _get_ndarray_c_version(),
+                        _c_api_version())
+    return _numpy_build
+
+def _api_map_cache_path ():
+    from numba import caching
+    build_key = hashlib.sha1(repr(numpy_build())).hexdigest()
+    return os.path.join(caching.get_cache_dir(),
+                        'multiarray_api-%s.pickle' % build_key)
+
+def load_api_map ():
+    '''Get the symbol table {name : (index, C type)} of the multiarray API
+    of the installed NumPy. The header is only parsed if there is no cached
+    table for this NumPy build.'''
+    from numba import caching
+
+    build = numpy_build()
+    if build in _api_maps:
+        return _api_maps[build]
+
+    cache_path = _api_map_cache_path()
+    api_map = None
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            api_map = pickle.load(cache_file)
+    except IOError, e:
+        logger.debug("No cached multiarray API table: %s", e)
+    except Exception, e:
+        logger.warning("Ignoring invalid multiarray API table %s: %s",
+                       cache_path, e)
+
+    if api_map is None:
+        api_map = process_source(get_include())
+        if caching.is_enabled():
+            try:
+                _store_api_map(cache_path, api_map)
+            except (IOError, OSError), e:
+                logger.warning("Could not cache the multiarray API table: %s",
+                               e)
+
+    _api_maps[build] = api_map
+    return api_map
+
+def _store_api_map (cache_path, api_map):
+    cache_dir = os.path.dirname(cache_path)
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+
+    # Rename a temporary file, so concurrent processes never read a
+    # partially written table
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir)
+    with os.fdopen(fd, 'wb') as temp_file:
+        pickle.dump(api_map, temp_file, pickle.HIGHEST_PROTOCOL)
+    os.rename(temp_path, cache_path)
+
 # ______________________________________________________________________
 
 class MultiarrayAPI (object):
@@ -87,29 +199,35 @@ class MultiarrayAPI (object):
 
     def __init__ (self, include_source_path = None):
         if include_source_path is None:
-            include_source_path = get_include()
-        self.api_map = process_source(include_source_path)
-        for symbol_name, (symbol_index, c_ty_str) in self.api_map.iteritems():
-            symbol_type = self.c_ty_str_to_llvm(c_ty_str)
-            self._add_loader(symbol_name, symbol_index, symbol_type)
-            setattr(self, symbol_name + '_ty', symbol_type)
+            self.api_map = load_api_map()
+        else:
+            self.api_map = process_source(include_source_path)
         self.api_addr = None
 
+    def __getattr__ (self, attr):
+        # Loaders (load_<symbol>) and types (<symbol>_ty) are created on
+        # first use
+        if attr.startswith('load_'):
+            symbol_name = attr[len('load_'):]
+        elif attr.endswith('_ty'):
+            symbol_name = attr[:-len('_ty')]
+        else:
+            raise AttributeError(attr)
+
+        api_map = self.__dict__.get('api_map', {})
+        if symbol_name not in api_map:
+            raise AttributeError(attr)
+
+        symbol_index, c_ty_str = api_map[symbol_name]
+        symbol_type = self.c_ty_str_to_llvm(c_ty_str)
+        setattr(self, symbol_name + '_ty', symbol_type)
+        self._add_loader(symbol_name, symbol_index, symbol_type)
+        return getattr(self, attr)
+
     def calculate_api_addr (self):
-        '''Constructs a dummy LLVM module that only links to the
-        Python C API function PyCObject_AsVoidPtr().  This method then
-        uses a LLVM execution engine to extract the multiarray API
-        address from the _ARRAY_API object.'''
-        module = lc.Module.new('import_arrayish_mod')
-        # FIXME: Add test to see if we should be using the capsule API
-        # instead of PyCObject.
-        fn_ty = lc.Type.function(_void_star, [_void_star])
-        pycobj_avp = module.add_function(fn_ty, 'PyCObject_AsVoidPtr')
-        ee = le.ExecutionEngine.new(module)
-        pycobj = le.GenericValue.pointer(id(_ARRAY_API))
-        ee.run_static_ctors()
-        voidptr = ee.run_function(pycobj_avp, [pycobj])
-        ret_val = self.api_addr = voidptr.as_pointer()
+        '''Reads the multiarray API address from the _ARRAY_API
+        capsule (or PyCObject) with ctypes.'''
+        ret_val = self.api_addr = get_api_pointer(_ARRAY_API)
         return ret_val
 
     def set_PyArray_API (self, module):
@@ -122,5 +240,26 @@ class MultiarrayAPI (object):
                                                _void_star_star)
         api.linkage = lc.LINKAGE_INTERNAL
 
+    def load (self, symbol_name, module, builder):
+        '''Generate code loading the API member `symbol_name`, adding
+        PyArray_API to the module if it isn't there yet.'''
+        try:
+            module.get_global_variable_named('PyArray_API')
+        except llvm.LLVMException:
+            self.set_PyArray_API(module)
+        return getattr(self, 'load_' + symbol_name)(module, builder)
+
+# ______________________________________________________________________
+
+_multiarray_api = None
+
+def get_multiarray_api ():
+    '''Get a MultiarrayAPI instance shared by all code generators, the
+    API header is only parsed once.'''
+    global _multiarray_api
+    if _multiarray_api is None:
+        _multiarray_api = MultiarrayAPI()
+    return _multiarray_api
+
 # ______________________________________________________________________
 # End of multiarray_api.py
@@ -14,6 +14,10 @@ import llvm.core as lc
 
 const_int = lambda X: lc.Constant.int(_int32, X)
 
+# Array flags
+NPY_OWNDATA = 0x0004
+NPY_WRITEABLE = 0x0400
+
 class PyArrayAccessor(object):
     def __init__(self, builder, pyarray_ptr):
         self.builder = builder
@@ -53,3 +57,22 @@ class PyArrayAccessor(object):
         return self._get_element(6)
 
 
+class ArrayDescriptor(object):
+    '''
+    The data pointer, shape and strides of an array, loaded once at the
+    current position of the builder so that they can be reused by all
+    element accesses (e.g. in the entry block of a function, for arrays
+    that are never reassigned).
+    '''
+
+    def __init__(self, builder, pyarray_ptr, ndim):
+        acc = PyArrayAccessor(builder, pyarray_ptr)
+        self.data = acc.data
+        self.dimensions = acc.dimensions
+        self.strides_ptr = acc.strides
+        self.shape = [builder.load(builder.gep(self.dimensions,
+                                               [const_int(i)]))
+                          for i in range(ndim)]
+        self.strides = [builder.load(builder.gep(self.strides_ptr,
+                                                 [const_int(i)]))
+                            for i in range(ndim)]
@@ -6,7 +6,7 @@ import numba
 from numba import *
 from .symtab import Variable
 from . import _numba_types as numba_types
-from numba import utils, translate, error
+from numba import utils, error
 from numba.minivect import minitypes
 
 import llvm.core
@@ -191,6 +191,7 @@ class ConstNode(Node):
             else:
                 raise NotImplementedError("Use ObjectInjectNode")
         elif type.is_c_string:
+            from numba import translate
             lvalue = translate._LLVMModuleUtils.get_string_constant(
                                             translator.mod, constant)
             type_char_p = numba_types.c_string_type.to_llvm(translator.context)
@@ -233,6 +234,10 @@ class FunctionCallNode(Node):
 class NativeCallNode(FunctionCallNode):
     _fields = ['args']
 
+    # Whether the callee must be called with the GIL held (e.g. a numba
+    # function compiled in object mode)
+    requires_gil = False
+
     def __init__(self, signature, args, llvm_func, py_func=None, **kw):
         super(NativeCallNode, self).__init__(signature, args, **kw)
         self.llvm_func = llvm_func
@@ -446,36 +451,112 @@ class DataPointerNode(Node):
         caster = translator.caster
         context = translator.context
 
-        dptr, strides = self.data_descriptors(llvm_value, builder)
-#        data_ty = self.type.to_llvm(context)
-#        data_ptr_ty = llvm.core.Type.pointer(data_ty)
-#        ptr = builder.bitcast(dptr, data_ptr_ty)
-#        return ptr
-
+        # Data pointer, shape and strides, hoisted for array arguments
+        descriptor = translator.array_descriptor(self.node, llvm_value)
+        array_type = self.node.type
         ndim = self.ndim
 
-        offset = _const_int(0)
-
         if not isinstance(indices, collections.Iterable):
             indices = (indices,)
 
-        for i, index in zip(range(ndim), indices):
-            # why is the indices reversed?
-            stride_ptr = builder.gep(strides, [_const_int(i)])
-            stride = builder.load(stride_ptr)
-            index = caster.cast(index, stride.type)
-            offset = caster.cast(offset, stride.type)
-            offset = builder.add(offset, builder.mul(index, stride))
+        intp = numba_types.intp.to_llvm(context)
+        indices = [caster.cast(index, intp)
+                       for i, index in zip(range(ndim), indices)]
 
         data_ty = self.type.to_llvm(context)
         data_ptr_ty = llvm.core.Type.pointer(data_ty)
 
-        dptr_plus_offset = builder.gep(dptr, [offset])
+        if array_type.is_c_contig or array_type.is_f_contig:
+            # Compute the offset in elements from the shape, which gives
+            # unit stride accesses in the innermost dimension (the last for
+            # C and the first for Fortran order)
+            dims = range(len(indices))
+            if not array_type.is_c_contig:
+                dims.reverse()
+
+            offset = indices[dims[0]]
+            for i in dims[1:]:
+                offset = builder.add(builder.mul(offset, descriptor.shape[i]),
+                                     indices[i])
+
+            dptr = builder.bitcast(descriptor.data, data_ptr_ty)
+            return builder.gep(dptr, [offset])
+
+        offset = _const_int(0)
+        for i, index in enumerate(indices):
+            stride = descriptor.strides[i]
+            offset = caster.cast(offset, stride.type)
+            offset = builder.add(offset, builder.mul(index, stride))
+
+        dptr_plus_offset = builder.gep(descriptor.data, [offset])
 
         ptr = builder.bitcast(dptr_plus_offset, data_ptr_ty)
         return ptr
 
 
+class ArraySliceNode(Node):
+    """
+    A view of an array for basic slicing with integers, slices and new
+    axes: a[i, :], a[1:-1, ::2], a[:, None]. The data pointer, shape and
+    strides of the view are computed natively from those of the array.
+
+        value:  the sliced array
+        dims:   a SliceDimNode for each index, slice or new axis
+        local:  whether the view is only used in the function. Local views
+                are built in stack memory, other views are new ndarrays
+                sharing the data of `value` (a new reference).
+    """
+
+    _fields = ['value', 'dims']
+
+    def __init__(self, type, value, dims, local=False):
+        self.type = type
+        self.variable = Variable(type)
+        self.value = value
+        self.dims = dims
+        self.local = local
+
+class SliceDimNode(Node):
+    """
+    A dimension of an ArraySliceNode. `kind` is 'index' (with an npy_intp
+    `index`), 'slice' (with npy_intp `lower`, `upper` and `step`, each of
+    which may be None) or 'newaxis'.
+    """
+
+    _fields = ['index', 'lower', 'upper', 'step']
+
+    def __init__(self, kind, index=None, lower=None, upper=None, step=None):
+        self.kind = kind
+        self.index = index
+        self.lower = lower
+        self.upper = upper
+        self.step = step
+
+
+class ArrayNewNode(Node):
+    """
+    Allocate a new array through the NumPy C API:
+
+        np.empty(shape, dtype)      -> PyArray_Empty
+        np.zeros(shape, dtype)      -> PyArray_Zeros
+        np.empty_like(a[, dtype])   -> PyArray_NewLikeArray
+        np.zeros_like(a[, dtype])   -> PyArray_Zeros with the shape of `a`
+
+    shape is a list of integer nodes, like is the array node for the _like
+    functions. Produces a new reference.
+    """
+
+    _fields = ['shape', 'like']
+
+    def __init__(self, type, zeros, shape=None, like=None, fortran=False):
+        self.type = type
+        self.variable = Variable(type)
+        self.zeros = zeros
+        self.shape = shape
+        self.like = like
+        self.fortran = fortran
+
+
 class ArrayAttributeNode(Node):
     is_read_only = True
 
@@ -512,6 +593,26 @@ class ShapeAttributeNode(ArrayAttributeNode):
                                          array.variable.type.ndim)
         self.variable = Variable(self.type)
 
+class ArrayExpressionNode(Node):
+    """
+    Evaluate an element-wise array expression in a single loop (see
+    numba.array_expressions). The result is written to `out`, or to a new
+    array if `out` is None.
+
+        minifunc: the minivect function computing the expression, with
+                  arguments (out, operands...)
+        operands: the array and scalar leaves of the expression
+    """
+
+    _fields = ['operands', 'out']
+
+    def __init__(self, type, minifunc, operands, out=None):
+        self.type = type
+        self.variable = Variable(type)
+        self.minifunc = minifunc
+        self.operands = operands
+        self.out = out
+
 class ComplexNode(Node):
     _fields = ['real', 'imag']
     type = complex128
@@ -531,14 +632,18 @@ class FunctionWrapperNode(Node):
 
         PyObject *(*)(PyObject *self, PyObject *args)
 
-    It unpacks the tuple to native types, calls the wrapped function, and
-    coerces the return type back to an object.
+    It unboxes the arguments to native types, calls the wrapped function, and
+    coerces the return type back to an object. Functions with zero or one
+    argument use METH_NOARGS or METH_O, and get their argument directly.
+    If nogil is set, the GIL is released during the call.
     """
 
-    _fields = ['body', 'return_result']
+    _fields = ['unbox', 'body', 'return_result']
 
-    def __init__(self, wrapped_function, signature, orig_py_func, fake_pyfunc):
+    def __init__(self, wrapped_function, signature, orig_py_func, fake_pyfunc,
+                 nogil=False):
         self.wrapped_function = wrapped_function
         self.signature = signature
         self.orig_py_func = orig_py_func
         self.fake_pyfunc = fake_pyfunc
+        self.nogil = nogil
@@ -0,0 +1,323 @@
+"""
+Parallel range loops.
+
+    @jit(double(double[:]), nopython=True)
+    def sum_squares(a):
+        result = 0.0
+        for i in prange(a.shape[0]):
+            result += a[i] * a[i]
+        return result
+
+The body of a prange loop is compiled into a separate function taking a
+range of iterations (a chunk). The iteration space is split in one chunk
+per thread, and the chunks are executed concurrently by a pool of worker
+threads, without holding the GIL.
+
+Variables are classified by how the loop body uses them:
+
+    - shared:    only read in the body, their values are copied in
+    - private:   assigned in the body (and the loop target), each chunk
+                 has its own copy, initialized to the value before the loop
+    - reduction: only updated through +=, -= or *=, each chunk accumulates
+                 into its own copy which are combined after the loop
+
+Writes to array elements are shared, and must not conflict between
+iterations. The loop body must not use Python objects (nopython), and may
+not contain return or break statements. Exceptions raised in a chunk (e.g.
+an IndexError) stop the loop and are raised after all chunks finished.
+"""
+
+import os
+import sys
+import ast
+import ctypes
+import Queue
+import threading
+import multiprocessing
+
+from numba import error
+
+# Maximum number of chunks, and so the number of threads executing a loop
+MAX_CHUNKS = 256
+
+def prange(*args):
+    "Parallel range. Behaves like xrange() when called from Python."
+    return xrange(*args)
+
+# ______________________________________________________________________
+# Variable classification
+
+# AugAssign operator -> (combining operator, identity)
+reduction_ops = {
+    ast.Add: (ast.Add, 0),
+    ast.Sub: (ast.Add, 0),
+    ast.Mult: (ast.Mult, 1),
+}
+
+class PrangeVariables(ast.NodeVisitor):
+    "Collect the variables used in the (untyped) body of a prange loop"
+
+    def __init__(self):
+        self.loaded = set()
+        self.stored = set()
+        self.augassigned = {}
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            self.loaded.add(node.id)
+        else:
+            self.stored.add(node.id)
+
+    def visit_AugAssign(self, node):
+        if isinstance(node.target, ast.Name):
+            self.augassigned.setdefault(node.target.id, []).append(node)
+            self.visit(node.value)
+        else:
+            self.generic_visit(node)
+
+def analyse_prange(node):
+    """
+    Classify the variables of a prange loop. Sets the `shared`, `private`
+    and `reductions` (name -> (combining operator, identity)) attributes
+    of the ast.For node.
+    """
+    if not isinstance(node.target, ast.Name):
+        raise error.NumbaError(node.target, "prange loop target must be a name")
+
+    variables = PrangeVariables()
+    for stmt in node.body:
+        variables.visit(stmt)
+
+    reductions = {}
+    for name, augassigns in variables.augassigned.iteritems():
+        if name in variables.loaded or name in variables.stored:
+            raise error.NumbaError(
+                augassigns[0], "Reduction variable %r in prange loop may "
+                               "only be updated with +=, -= or *=" % name)
+
+        ops = set()
+        for augassign in augassigns:
+            if type(augassign.op) not in reduction_ops:
+                raise error.NumbaError(
+                    augassign, "Unsupported reduction operator in prange loop")
+            ops.add(reduction_ops[type(augassign.op)])
+
+        if len(ops) > 1:
+            raise error.NumbaError(
+                augassigns[0], "Reduction variable %r is updated with "
+                               "incompatible operators" % name)
+
+        reductions[name], = ops
+
+    node.private = variables.stored | set([node.target.id])
+    node.reductions = reductions
+    node.shared = variables.loaded - node.private
+
+class PrangeBodyChecker(ast.NodeVisitor):
+    "Check that a typed prange loop body can run without the GIL"
+
+    def visit_Return(self, node):
+        raise error.NumbaError(node, "Cannot return from a prange loop")
+
+    def visit_Break(self, node):
+        raise error.NumbaError(node, "Cannot break out of a prange loop")
+
+    def visit_For(self, node):
+        if node.iter.type.is_prange:
+            raise error.NumbaError(node, "Nested prange loops are not "
+                                         "supported")
+        self.generic_visit(node)
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            if target.type.is_array:
+                raise error.NumbaError(node, "Cannot assign arrays in a "
+                                             "prange loop")
+        self.generic_visit(node)
+
+    def generic_visit(self, node):
+        type = getattr(node, 'type', None)
+        if getattr(type, 'is_object', False):
+            raise error.NumbaError(
+                node, "prange loop bodies cannot use Python objects")
+        super(PrangeBodyChecker, self).generic_visit(node)
+
+def check_prange_body(node):
+    checker = PrangeBodyChecker()
+    for stmt in node.body:
+        checker.visit(stmt)
+
+# ______________________________________________________________________
+# Runtime
+
+_num_threads = (int(os.environ.get('NUMBA_NUM_THREADS', 0)) or
+                multiprocessing.cpu_count())
+
+def get_num_threads():
+    return _num_threads
+
+def set_num_threads(num_threads):
+    "Set the number of threads executing prange loops"
+    global _num_threads
+    if not 1 <= num_threads <= MAX_CHUNKS:
+        raise ValueError("Number of threads must be between 1 and %d" %
+                                                                MAX_CHUNKS)
+    _num_threads = num_threads
+
+# int body(void *env, Py_ssize_t chunk, Py_ssize_t start, Py_ssize_t step,
+#          Py_ssize_t lower, Py_ssize_t upper)
+# executes iterations [lower, upper) of the loop, i = start + k * step.
+# Returns -1 if it failed, with an exception set in the calling thread.
+body_functype = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p,
+                                 ctypes.c_ssize_t, ctypes.c_ssize_t,
+                                 ctypes.c_ssize_t, ctypes.c_ssize_t,
+                                 ctypes.c_ssize_t)
+
+# Functions of ctypes.pythonapi raise the exception pending in the calling
+# thread when they return. Bound once, so that nothing runs in between
+# that could clear the exception of a failed chunk (like an attribute
+# lookup falling back to __getattr__).
+_raise_pending_error = ctypes.pythonapi.PyErr_Occurred
+
+def run_chunk(body, *args):
+    "Execute a chunk, raising its exception if it failed"
+    if body(*args):
+        _raise_pending_error()
+        raise RuntimeError("Error executing prange loop")
+
+class _Latch(object):
+    "Wait until a number of tasks completed"
+
+    def __init__(self, count):
+        self.count = count
+        self.cond = threading.Condition()
+        # sys.exc_info() of the first failed task
+        self.error = None
+
+    def count_down(self, error=None):
+        with self.cond:
+            if self.error is None:
+                self.error = error
+            self.count -= 1
+            if self.count == 0:
+                self.cond.notify_all()
+
+    def wait(self):
+        with self.cond:
+            while self.count:
+                self.cond.wait()
+
+class ThreadPool(object):
+    """
+    Daemon worker threads executing loop chunks. Chunks are ctypes calls,
+    which release the GIL while the native code runs.
+    """
+
+    def __init__(self):
+        self.queue = Queue.Queue()
+        self.workers = []
+        self.workers_lock = threading.Lock()
+        self.local = threading.local()
+
+    def _ensure_workers(self, num_workers):
+        # map() may be called from several threads at once
+        with self.workers_lock:
+            while len(self.workers) < num_workers:
+                worker = threading.Thread(target=self._work)
+                worker.daemon = True
+                worker.start()
+                self.workers.append(worker)
+
+    def _work(self):
+        self.local.is_worker = True
+        while True:
+            func, args, latch = self.queue.get()
+            # Keep the worker alive, map() raises the error
+            error = None
+            try:
+                func(*args)
+            except Exception:
+                error = sys.exc_info()
+            latch.count_down(error)
+
+    def map(self, func, arglist):
+        """
+        Call func with all argument tuples in arglist, in parallel.
+        The calling thread executes the first call.
+        """
+        if getattr(self.local, 'is_worker', False):
+            # Nested parallel loop, waiting for other workers might
+            # deadlock the pool
+            for args in arglist:
+                func(*args)
+            return
+
+        latch = _Latch(len(arglist) - 1)
+        self._ensure_workers(len(arglist) - 1)
+        for args in arglist[1:]:
+            self.queue.put((func, args, latch))
+
+        try:
+            func(*arglist[0])
+        finally:
+            latch.wait()
+
+        if latch.error is not None:
+            raise latch.error[0], latch.error[1], latch.error[2]
+
+_pool = ThreadPool()
+_body_funcs = {}
+
+# The exception of the last failed parallel_for() call of each thread
+_errors = threading.local()
+
+def num_iterations(start, stop, step):
+    if step > 0:
+        return max(0, (stop - start + step - 1) // step)
+    else:
+        return max(0, (start - stop - step - 1) // -step)
+
+def parallel_for(body_addr, env, start, stop, step):
+    """
+    Execute a prange loop, called from compiled code. Returns the number of
+    chunks (which have reduction results) or -1 on error, after which the
+    compiled code calls reraise_error().
+    """
+    try:
+        body = _body_funcs.get(body_addr)
+        if body is None:
+            body = _body_funcs[body_addr] = body_functype(body_addr)
+
+        n = num_iterations(start, stop, step)
+        nchunks = min(n, _num_threads, MAX_CHUNKS)
+        if nchunks <= 1:
+            if n:
+                run_chunk(body, env, 0, start, step, 0, n)
+            return nchunks
+
+        arglist = [(body, env, i, start, step, i * n // nchunks,
+                    (i + 1) * n // nchunks) for i in range(nchunks)]
+        _pool.map(run_chunk, arglist)
+        return nchunks
+    except Exception:
+        # Exceptions can't propagate through the ctypes callback
+        _errors.exc_info = sys.exc_info()
+        return -1
+
+def reraise_error():
+    "Raise the exception of the last failed parallel_for() of this thread"
+    exc_info = getattr(_errors, 'exc_info', None)
+    _errors.exc_info = None
+    if exc_info is None:
+        raise RuntimeError("Error executing prange loop")
+    raise exc_info[0], exc_info[1], exc_info[2]
+
+# Py_ssize_t parallel_for(void *body, void *env, Py_ssize_t start,
+#                         Py_ssize_t stop, Py_ssize_t step)
+parallel_for_functype = ctypes.CFUNCTYPE(ctypes.c_ssize_t, ctypes.c_void_p,
+                                         ctypes.c_void_p, ctypes.c_ssize_t,
+                                         ctypes.c_ssize_t, ctypes.c_ssize_t)
+parallel_for_callback = parallel_for_functype(parallel_for)
+
+def parallel_for_address():
+    return ctypes.cast(parallel_for_callback, ctypes.c_void_p).value
@@ -0,0 +1,73 @@
+"""
+LLVM optimization levels.
+
+Functions are optimized at the level given by the opt_level option of
+jit/autojit, or the global default set with set_default_opt_level() (or the
+NUMBA_OPT environment variable). Levels are cumulative:
+
+    0: no optimization
+    1: promote locals (and the fields of local structs, such as array
+       views) to registers and simplify
+    2: loop invariant code motion, GVN, loop unrolling etc (default)
+    3: loop and basic block vectorization, with SIMD implementations of
+       vectorized math functions (see numba.vectormath)
+
+The function pipeline of the PassManagerBuilder only performs light cleanup;
+the loop and scalar optimizations are part of its module pipeline, which we
+can't run over the module shared by all numba functions. So the passes below
+are added on top of it. Passes not provided by the installed LLVM are skipped.
+
+Interprocedural passes would walk the entire shared module every time a
+function is compiled. Instead of the always-inliner, numba.inlining inlines
+the calls of the function being optimized, and function attributes are not
+inferred.
+"""
+
+import os
+
+import llvm.passes as lp
+
+_default_opt_level = int(os.environ.get('NUMBA_OPT', 2))
+
+def get_default_opt_level():
+    return _default_opt_level
+
+def set_default_opt_level(opt_level):
+    "Set the optimization level (0-3) of functions without an opt_level"
+    global _default_opt_level
+    _default_opt_level = opt_level
+
+function_passes = [
+    # -O1
+    ['PROMOTE_MEMORY_TO_REGISTER', 'SCALAR_REPL_AGGREGATES',
+     'INSTRUCTION_COMBINING', 'REASSOCIATE', 'CFG_SIMPLIFICATION'],
+    # -O2
+    ['LOOP_SIMPLIFY', 'LOOP_ROTATE', 'LICM', 'IND_VAR_SIMPLIFY',
+     'LOOP_DELETION', 'LOOP_UNROLL', 'INSTRUCTION_COMBINING', 'GVN',
+     'SCCP', 'DEAD_STORE_ELIMINATION', 'AGGRESSIVE_DCE',
+     'CFG_SIMPLIFICATION'],
+    # -O3
+    ['LOOP_VECTORIZE', 'BB_VECTORIZE', 'INSTRUCTION_COMBINING', 'GVN',
+     'CFG_SIMPLIFICATION'],
+]
+
+# Cleanup after the SIMD math functions are inlined at -O3 (see
+# numba.vectormath), e.g. to share their constants between calls
+cleanup_passes = [
+    ['INSTRUCTION_COMBINING', 'GVN', 'CFG_SIMPLIFICATION'],
+]
+
+def llvm_passes(passes, opt_level):
+    "The LLVM passes from `passes` (e.g. function_passes) for opt_level"
+    result = []
+    for level_passes in passes[:opt_level]:
+        for pass_name in level_passes:
+            llvm_pass = getattr(lp, 'PASS_' + pass_name, None)
+            if llvm_pass is not None:
+                result.append(llvm_pass)
+
+    return result
+
+def add_passes(pass_manager, passes, opt_level):
+    for llvm_pass in llvm_passes(passes, opt_level):
+        pass_manager.add(llvm_pass)
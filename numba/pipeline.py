@@ -7,7 +7,8 @@ import logging
 import functools
 
 from numba import error
-from numba import functions, naming, transforms
+from numba import functions, naming, transforms, array_expressions
+from numba import instrumentation, inlining
 from numba import ast_type_inference as type_inference
 from numba import ast_translate
 from numba.minivect import minitypes
@@ -39,6 +40,7 @@ class Pipeline(object):
                 'type_infer',
                 'type_set',
                 'transform_for',
+                'rewrite_array_expressions',
                 'specialize',
                 'late_specializer',
             ]
@@ -57,8 +59,17 @@ class Pipeline(object):
 
     def run_pipeline(self):
         ast = self.ast
+        instrumented = instrumentation.current_record() is not None
+        if instrumented:
+            instrumentation.count('ast_nodes',
+                                  instrumentation.count_ast_nodes(ast))
+
         for method_name in self.order:
-            ast = getattr(self, method_name)(ast)
+            if method_name == 'codegen' and instrumented:
+                instrumentation.count('ast_nodes_specialized',
+                                      instrumentation.count_ast_nodes(ast))
+            with instrumentation.stage(method_name):
+                ast = getattr(self, method_name)(ast)
 
         return self.func_signature, self.symtab, ast
 
@@ -85,6 +96,11 @@ class Pipeline(object):
         transform = self.make_specializer(transforms.TransformForIterable, ast)
         return transform.visit(ast)
 
+    def rewrite_array_expressions(self, ast):
+        transform = self.make_specializer(
+                    array_expressions.ArrayExpressionRewrite, ast)
+        return transform.visit(ast)
+
     def specialize(self, ast):
         return ast
 
@@ -115,10 +131,12 @@ def run_pipeline(context, func, ast, func_signature,
     return pipeline, pipeline.run_pipeline()
 
 def _infer_types(context, func, restype=None, argtypes=None, **kwargs):
-    ast = functions._get_ast(func)
-    func_signature = minitypes.FunctionType(return_type=restype,
-                                            args=argtypes)
-    return run_pipeline(context, func, ast, func_signature, **kwargs)
+    with instrumentation.record_compile(func):
+        with instrumentation.stage('get_ast'):
+            ast = functions._get_ast(func)
+        func_signature = minitypes.FunctionType(return_type=restype,
+                                                args=argtypes)
+        return run_pipeline(context, func, ast, func_signature, **kwargs)
 
 def infer_types(context, func, restype=None, argtypes=None, **kwargs):
     """
@@ -136,16 +154,31 @@ def compile(context, func, restype=None, argtypes=None, ctypes=False,
         - decompile function into a Python ast
         - run type inference using the given input types
         - compile the function to LLVM
+
+    See numba.instrumentation for timing the individual stages.
+    Compilations are serialized through functions.compile_lock.
     """
-    pipeline, (func_signature, symtab, ast) = _infer_types(
-                context, func, restype, argtypes, codegen=True, **kwds)
-    t = pipeline.translator
-
-    if compile_only:
-        return func_signature, t.lfunc, None
-
-    if ctypes:
-        ctypes_func = t.get_ctypes_func(kwds.get('llvm', True))
-        return func_signature, t.lfunc, ctypes_func
-    else:
-        return func_signature, t.lfunc, t.build_wrapper_function()
\ No newline at end of file
+    with functions.compile_lock:
+        return _compile(context, func, restype, argtypes, ctypes,
+                        compile_only, **kwds)
+
+def _compile(context, func, restype, argtypes, ctypes, compile_only, **kwds):
+    with instrumentation.record_compile(func) as record:
+        pipeline, (func_signature, symtab, ast) = _infer_types(
+                    context, func, restype, argtypes, codegen=True, **kwds)
+        t = pipeline.translator
+        if record is not None:
+            record.signature = func_signature
+
+        inlining.register(t.lfunc, func, func_signature, kwds)
+
+        if compile_only:
+            return func_signature, t.lfunc, None
+
+        if ctypes:
+            ctypes_func = t.get_ctypes_func(kwds.get('llvm', True))
+            return func_signature, t.lfunc, ctypes_func
+        else:
+            with instrumentation.stage('build_wrapper'):
+                wrapper = t.build_wrapper_function()
+            return func_signature, t.lfunc, wrapper
\ No newline at end of file
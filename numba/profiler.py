@@ -0,0 +1,191 @@
+"""
+Runtime call statistics for numba functions.
+
+While enabled, calls of compiled numba functions are counted per function
+and signature, together with the cumulative time spent dispatching the call
+(finding the specialization for the arguments of an autojit function) and
+executing the compiled code. Specializations compiled on demand by autojit
+functions are recorded as compile events.
+
+Profiling is off by default, and costs nothing when off: enabling it
+replaces the __call__ methods of NumbaFunction and Dispatcher with
+instrumented versions, disabling it puts the original ones back::
+
+    from numba import profiler
+    with profiler.profile() as prof:
+        run_application()
+
+    print prof.report()
+    prof.stats()
+    # [{'function': 'f', 'signature': 'double (*)(double[:])', 'calls': 1000,
+    #   'dispatch_time': ..., 'exec_time': ...}, ...]
+
+Hooks registered with add_hook() are called after every call as
+
+    hook(py_func, signature, dispatch_time, exec_time)
+
+which can be used to feed sampling profilers or application metrics.
+Profiles don't nest: profile() inside an active profile records into the
+new profile until it exits.
+"""
+
+import timeit
+import contextlib
+
+timer = timeit.default_timer
+
+# The Profile being recorded into, or None
+_active = None
+
+_hooks = []
+
+class CallStats(object):
+    "Statistics of the calls of one specialization of a function"
+
+    def __init__(self, py_func, signature):
+        self.py_func = py_func
+        self.signature = signature
+        self.calls = 0
+        self.dispatch_time = 0.0
+        self.exec_time = 0.0
+
+    def as_dict(self):
+        return {
+            'function': self.py_func.__name__,
+            'module': self.py_func.__module__,
+            'signature': self.signature and str(self.signature),
+            'calls': self.calls,
+            'dispatch_time': self.dispatch_time,
+            'exec_time': self.exec_time,
+        }
+
+class Profile(object):
+    """
+    Call statistics and compile events recorded while profiling was
+    enabled.
+
+        calls:        (py_func, signature string) -> CallStats
+        compiles:     [(py_func, signature, seconds)] in order of compilation
+        compile_time: total time spent compiling
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.compiles = []
+        self.compile_time = 0.0
+
+    def record_call(self, py_func, signature, dispatch_time, exec_time):
+        key = py_func, str(signature)
+        stats = self.calls.get(key)
+        if stats is None:
+            stats = self.calls[key] = CallStats(py_func, signature)
+
+        stats.calls += 1
+        stats.dispatch_time += dispatch_time
+        stats.exec_time += exec_time
+
+    def record_compile(self, py_func, signature, seconds):
+        self.compiles.append((py_func, signature, seconds))
+        self.compile_time += seconds
+
+    def stats(self, func=None):
+        """
+        Statistics per function and signature as a list of dicts, ordered by
+        descending execution time.
+        """
+        func = getattr(func, 'py_func', func)
+        result = [stats for stats in self.calls.itervalues()
+                            if func is None or stats.py_func is func]
+        result.sort(key=lambda stats: stats.exec_time, reverse=True)
+        return [stats.as_dict() for stats in result]
+
+    def report(self):
+        "A table of the call statistics"
+        lines = ['%10s %12s %12s  %s' % ('calls', 'dispatch (s)', 'exec (s)',
+                                         'function')]
+        for stats in self.stats():
+            lines.append('%10d %12.6f %12.6f  %s.%s %s' % (
+                stats['calls'], stats['dispatch_time'], stats['exec_time'],
+                stats['module'], stats['function'], stats['signature']))
+
+        lines.append('%d specializations compiled in %.3fs' % (
+                                    len(self.compiles), self.compile_time))
+        return '\n'.join(lines)
+
+#
+### Recording, called by the instrumented __call__ methods
+#
+
+def record_call(py_func, signature, dispatch_time, exec_time):
+    profile = _active
+    if profile is not None:
+        profile.record_call(py_func, signature, dispatch_time, exec_time)
+        for hook in _hooks:
+            hook(py_func, signature, dispatch_time, exec_time)
+
+def record_compile(py_func, signature, seconds):
+    profile = _active
+    if profile is not None:
+        profile.record_compile(py_func, signature, seconds)
+
+def total_compile_time():
+    "Time spent compiling in the active profile"
+    if _active is None:
+        return 0.0
+    return _active.compile_time
+
+#
+### Enabling and disabling
+#
+
+def _instrument(enable):
+    from numba import decorators, dispatcher
+
+    for cls in (decorators.NumbaFunction, dispatcher.Dispatcher):
+        if enable:
+            cls.__call__ = cls.__dict__['_profiled_call']
+        else:
+            cls.__call__ = cls.__dict__['_call']
+
+def enable(profile=None):
+    "Start recording calls into `profile` (a new Profile by default)"
+    global _active
+    if profile is None:
+        profile = Profile()
+    _active = profile
+    _instrument(True)
+    return profile
+
+def disable():
+    "Stop recording calls. Returns the Profile that was recorded into."
+    global _active
+    profile = _active
+    _active = None
+    _instrument(False)
+    return profile
+
+def is_enabled():
+    return _active is not None
+
+def get_profile():
+    "The active Profile, or None"
+    return _active
+
+@contextlib.contextmanager
+def profile():
+    "Record calls made in a with block into a new Profile"
+    previous = _active
+    result = enable()
+    try:
+        yield result
+    finally:
+        if previous is None:
+            disable()
+        else:
+            enable(previous)
+
+def add_hook(hook):
+    _hooks.append(hook)
+
+def remove_hook(hook):
+    _hooks.remove(hook)
@@ -7,7 +7,6 @@ import functools
 
 import numba.pycc as pyc
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 def get_ending(args):  
@@ -19,6 +18,7 @@ def get_ending(args):
         return pyc.find_shared_ending()
 
 def main(args=[]):
+    logging.basicConfig(level=logging.DEBUG)
     if not args:
         args = sys.argv
     import argparse
@@ -0,0 +1,149 @@
+"""
+Inline reference counting.
+
+The code generator emits reference count updates as calls to two small
+functions defined in each module:
+
+    __numba_incref(obj):    Py_XINCREF(obj)
+    __numba_decref(obj):    Py_XDECREF(obj)
+
+which update ob_refcnt directly, and only call Py_DecRef when the object is
+about to be deallocated. They are marked alwaysinline, so the inliner (from
+-O1, see numba.inlining.inline_calls) replaces the calls by a NULL check
+and a load and store of the reference count.
+
+Before optimization, eliminate_refcount_pairs() removes increfs that are
+followed by a decref of the same object within the same basic block, when
+nothing in between can release references. Straight-line code generated
+into several blocks is covered after CFG simplification merges them.
+
+Debug builds of Python count all references in _Py_RefTotal, which only
+Py_IncRef and Py_DecRef maintain, so there the functions call those.
+"""
+
+import sys
+
+import llvm
+import llvm.core as lc
+
+from numba import llvm_types
+
+INCREF = '__numba_incref'
+DECREF = '__numba_decref'
+
+_inline = not hasattr(sys, 'gettotalrefcount')
+
+def get_refcount_function(module, name, object_ltype):
+    "Get the incref or decref function of a module, defining it on first use"
+    try:
+        return module.get_function_named(name)
+    except llvm.LLVMException:
+        pass
+
+    lfunc_type = lc.Type.function(lc.Type.void(), [object_ltype])
+    lfunc = module.add_function(lfunc_type, name)
+    lfunc.linkage = lc.LINKAGE_INTERNAL
+    lfunc.add_attribute(lc.ATTR_ALWAYS_INLINE)
+    _build_refcount_function(module, lfunc, incref=name == INCREF)
+    return lfunc
+
+def _build_refcount_function(module, lfunc, incref):
+    obj, = lfunc.args
+    py_func_name = incref and 'Py_IncRef' or 'Py_DecRef'
+    py_func = module.get_or_insert_function(lfunc.type.pointee, py_func_name)
+
+    b = lc.Builder.new(lfunc.append_basic_block('entry'))
+    if not _inline:
+        b.call(py_func, [obj])
+        b.ret_void()
+        return
+
+    bb_update = lfunc.append_basic_block('update')
+    bb_return = lfunc.append_basic_block('return')
+    b.cbranch(b.icmp(lc.ICMP_EQ, obj, lc.Constant.null(obj.type)),
+              bb_return, bb_update)
+
+    b.position_at_end(bb_update)
+    refcnt_p = b.bitcast(obj, lc.Type.pointer(llvm_types._llvm_py_ssize_t))
+    refcnt = b.load(refcnt_p)
+    one = lc.Constant.int(refcnt.type, 1)
+    if incref:
+        b.store(b.add(refcnt, one), refcnt_p)
+        b.branch(bb_return)
+    else:
+        bb_dealloc = lfunc.append_basic_block('dealloc')
+        bb_decrement = lfunc.append_basic_block('decrement')
+        b.cbranch(b.icmp(lc.ICMP_EQ, refcnt, one), bb_dealloc, bb_decrement)
+
+        # Let Python deallocate the object
+        b.position_at_end(bb_dealloc)
+        b.call(py_func, [obj])
+        b.branch(bb_return)
+
+        b.position_at_end(bb_decrement)
+        b.store(b.sub(refcnt, one), refcnt_p)
+        b.branch(bb_return)
+
+    b.position_at_end(bb_return)
+    b.ret_void()
+
+#
+### Incref/decref pair elimination
+#
+
+def _strip_bitcasts(value):
+    while getattr(value, 'opcode_name', None) == 'bitcast':
+        value = value.operands[0]
+    return value
+
+def _value_key(value):
+    """
+    Key identifying the object a refcount function is called on. Loads
+    are identified by the pointer they load from. Values are compared as
+    LLVM values, not by how they print, which distinct values may share.
+    """
+    value = _strip_bitcasts(value)
+    if getattr(value, 'opcode_name', None) == 'load':
+        return 'load', _strip_bitcasts(value.operands[0])
+    return 'value', value
+
+def _called_name(call):
+    return getattr(call.called_function, 'name', None)
+
+def eliminate_refcount_pairs(lfunc):
+    """
+    Remove increfs that are followed by a decref of the same object in the
+    same basic block, if no call (or other decref) in between may release
+    references. Returns the number of removed pairs.
+    """
+    removed = []
+    for bb in lfunc.basic_blocks:
+        # value key -> incref calls not matched yet
+        pending = {}
+        for instr in bb.instructions:
+            opcode = instr.opcode_name
+            if opcode == 'call':
+                name = _called_name(instr)
+                if name == INCREF:
+                    key = _value_key(instr.operands[0])
+                    pending.setdefault(key, []).append(instr)
+                    continue
+                elif name == DECREF:
+                    increfs = pending.get(_value_key(instr.operands[0]))
+                    if increfs:
+                        removed.append((increfs.pop(), instr))
+                        continue
+
+                # Anything else may release references
+                pending.clear()
+            elif opcode == 'store':
+                # Loads before the store may yield a different object
+                for key in pending.keys():
+                    if key[0] == 'load':
+                        del pending[key]
+
+    for incref, decref in removed:
+        incref.erase_from_parent()
+        decref.erase_from_parent()
+
+    return len(removed)
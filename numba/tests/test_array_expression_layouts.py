@@ -0,0 +1,99 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_array_expression_layouts
+
+Test the selection of array expression kernels for C, Fortran, strided and
+mixed operand layouts.
+'''
+# ______________________________________________________________________
+
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba import array_expressions
+from numba.decorators import jit
+
+# ______________________________________________________________________
+
+def add(out, a, b):
+    out[...] = a + b * 2.0
+
+def add_row(out, a, b):
+    out[...] = a + b
+
+# ______________________________________________________________________
+
+class TestArrayExpressionLayouts(unittest.TestCase):
+
+    def test_candidate_layouts(self):
+        self.assertEqual(array_expressions.candidate_layouts(1, [1, 1]),
+                         ['contig', 'inner_contig', 'strided'])
+        self.assertEqual(array_expressions.candidate_layouts(2, [2, 2]),
+                         array_expressions.layouts)
+        self.assertEqual(array_expressions.candidate_layouts(2, [2, 1]),
+                         ['inner_contig', 'tiled', 'strided_fortran',
+                          'strided'])
+
+    def test_layouts(self):
+        cadd = jit(void(double[:, :], double[:, :], double[:, :]),
+                   nopython=True)(add)
+        a = np.arange(48, dtype=np.double).reshape(6, 8)
+        b = np.arange(48, dtype=np.double)[::-1].reshape(6, 8)
+
+        for layout in ('C', 'F'):
+            out = np.empty((6, 8), order=layout)
+            x, y = np.array(a, order=layout), np.array(b, order=layout)
+            cadd(out, x, y)
+            self.assertTrue(np.all(out == a + b * 2.0))
+
+        # Mixed C and Fortran operands
+        out = np.empty((6, 8))
+        cadd(out, a, np.asfortranarray(b))
+        self.assertTrue(np.all(out == a + b * 2.0))
+
+        out = np.empty((6, 8), order='F')
+        cadd(out, a, b)
+        self.assertTrue(np.all(out == a + b * 2.0))
+
+        # Transposed and strided operands
+        out = np.empty((8, 6))
+        cadd(out, a.T, b.T)
+        self.assertTrue(np.all(out == a.T + b.T * 2.0))
+
+        out = np.empty((3, 4))
+        cadd(out, a[::2, ::2], b[1::2, ::-2])
+        self.assertTrue(np.all(out == a[::2, ::2] + b[1::2, ::-2] * 2.0))
+
+        out = np.empty((12, 8))[::2]
+        cadd(out, a, b)
+        self.assertTrue(np.all(out == a + b * 2.0))
+
+    def test_broadcasting(self):
+        cadd_row = jit(void(double[:, :], double[:, :], double[:]),
+                       nopython=True)(add_row)
+        a = np.arange(48, dtype=np.double).reshape(6, 8)
+        b = np.arange(8, dtype=np.double)
+
+        for layout in ('C', 'F'):
+            out = np.empty((6, 8), order=layout)
+            cadd_row(out, np.array(a, order=layout), b)
+            self.assertTrue(np.all(out == a + b))
+
+        out = np.empty((6, 8))
+        cadd_row(out, a, b[:1])
+        self.assertTrue(np.all(out == a + b[0]))
+
+        cadd = jit(void(double[:, :], double[:, :], double[:, :]),
+                   nopython=True)(add_row)
+        cadd(out, a, a[:1])
+        self.assertTrue(np.all(out == a + a[:1]))
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_array_expression_layouts.py
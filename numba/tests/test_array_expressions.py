@@ -0,0 +1,163 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_array_expressions
+
+Test element-wise array expressions compiled through minivect.
+'''
+# ______________________________________________________________________
+
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba import error
+from numba.decorators import jit, autojit
+
+# ______________________________________________________________________
+
+def axpy(a, x, y):
+    return a * x + y
+
+def assign_slice(out, a, b):
+    out[:] = a + b * 2.0
+
+def assign_ellipsis(out, a, b):
+    out[...] = -a * b - 1.0
+
+def inplace(a, b):
+    a += b * b
+
+def broadcast_error(out, a, b):
+    out[:] = a + b
+
+def assign_first(out, a, b):
+    out[...] = a + b
+    return out[0]
+
+def allocate_nopython(a, b):
+    c = a + b
+    return c[0]
+
+def power(a):
+    return a ** 2
+
+def reverse(a):
+    a[...] = a[::-1] + 1.0
+
+def divide(out, a, b):
+    out[:] = a / b
+
+# ______________________________________________________________________
+
+class TestArrayExpressions(unittest.TestCase):
+
+    def test_allocate(self):
+        caxpy = autojit(axpy)
+        x = np.arange(10, dtype=np.double)
+        y = np.arange(10, dtype=np.double) * 3
+        self.assertTrue(np.all(caxpy(2.0, x, y) == axpy(2.0, x, y)))
+
+        # Broadcasting and mixed types
+        x = np.arange(12, dtype=np.double).reshape(3, 4)
+        y = np.arange(4, dtype=np.int64)
+        result = caxpy(2.0, x, y)
+        self.assertEqual(result.shape, (3, 4))
+        self.assertTrue(np.all(result == axpy(2.0, x, y)))
+
+        x = np.arange(3, dtype=np.double).reshape(3, 1)
+        result = caxpy(2.0, x, y)
+        self.assertEqual(result.shape, (3, 4))
+        self.assertTrue(np.all(result == axpy(2.0, x, y)))
+
+    def test_assign_slice(self):
+        cassign = jit(void(double[:], double[:], double[:]),
+                      nopython=True)(assign_slice)
+        a = np.arange(10, dtype=np.double)
+        b = np.arange(10, dtype=np.double)[::-1].copy()
+        out = np.empty(10, dtype=np.double)
+        cassign(out, a, b)
+        self.assertTrue(np.all(out == a + b * 2.0))
+
+        # Strided operands
+        out = np.zeros(5, dtype=np.double)
+        cassign(out, a[::2], b[1::2])
+        self.assertTrue(np.all(out == a[::2] + b[1::2] * 2.0))
+
+    def test_assign_ellipsis(self):
+        cassign = jit(void(double[:, :], double[:, :], double[:]),
+                      nopython=True)(assign_ellipsis)
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        b = np.arange(4, dtype=np.double)
+        out = np.empty((3, 4), dtype=np.double)
+        cassign(out, a, b)
+        self.assertTrue(np.all(out == -a * b - 1.0))
+
+        cassign(out, a.T.copy().T, b)
+        self.assertTrue(np.all(out == -a * b - 1.0))
+
+    def test_inplace(self):
+        cinplace = jit(void(double[:, :], double[:]), nopython=True)(inplace)
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        b = np.arange(4, dtype=np.double)
+        expected = a + b * b
+        alias = a
+        cinplace(a, b)
+        self.assertTrue(np.all(alias == expected))
+
+    def test_overlap(self):
+        creverse = jit(void(double[:]), nopython=True)(reverse)
+        a = np.arange(10, dtype=np.double)
+        expected = a[::-1] + 1.0
+        creverse(a)
+        self.assertTrue(np.all(a == expected))
+
+        cassign = jit(void(double[:], double[:], double[:]),
+                      nopython=True)(assign_slice)
+        a = np.arange(11, dtype=np.double)
+        expected = a[1:] + a[:-1] * 2.0
+        cassign(a[:-1], a[1:], a[:-1])
+        self.assertTrue(np.all(a[:-1] == expected))
+
+    def test_integer_division(self):
+        cdivide = jit(void(int64[:], int64[:], int64[:]),
+                      nopython=True)(divide)
+        a = np.array([7, -7, 7, -7, 5, np.iinfo(np.int64).min],
+                     dtype=np.int64)
+        b = np.array([2, 2, -2, -2, 0, -1], dtype=np.int64)
+        out = np.empty_like(a)
+        cdivide(out, a, b)
+        self.assertEqual(list(out), [3, -4, -4, 3, 0,
+                                     np.iinfo(np.int64).min])
+
+    def test_broadcast_error(self):
+        cbroadcast = autojit(broadcast_error)
+        out = np.empty(10, dtype=np.double)
+        a = np.arange(10, dtype=np.double)
+        self.assertRaises(ValueError, cbroadcast, out, a, a[:5])
+
+        # The error is raised instead of returning the dummy result
+        for nogil in (False, True):
+            cassign_first = jit(double(double[:], double[:], double[:]),
+                                nopython=True, nogil=nogil)(assign_first)
+            self.assertEqual(cassign_first(out, a + 1.0, a), 1.0)
+            self.assertRaises(ValueError, cassign_first, out, a, a[:5])
+
+        # Overlapping operands can't be copied without the GIL
+        creverse = jit(void(double[:]), nopython=True, nogil=True)(reverse)
+        self.assertRaises(ValueError, creverse, a)
+        self.assertTrue(np.all(a == np.arange(10)))
+
+    def test_errors(self):
+        self.assertRaises(error.NumbaError,
+                          jit(double(double[:], double[:]), nopython=True),
+                          allocate_nopython)
+        self.assertRaises(error.NumbaError, jit(object_(double[:])), power)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_array_expressions.py
@@ -0,0 +1,74 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_benchmarks
+
+Test the benchmark harness on a small problem size.
+'''
+# ______________________________________________________________________
+
+import json
+import unittest
+
+import numpy as np
+
+from numba import benchmarks
+
+# ______________________________________________________________________
+
+def sum1d(a):
+    result = 0.0
+    for i in range(a.shape[0]):
+        result += a[i]
+    return result
+
+def sum1d_args(size, layout):
+    return benchmarks.make_array((size,), layout),
+
+small_sum1d = benchmarks.Benchmark('sum1d', lambda: sum1d, sum1d_args,
+                                   sizes=[10, 100], numpy_func=np.sum)
+
+# ______________________________________________________________________
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_make_array(self):
+        self.assertTrue(benchmarks.make_array((4, 6), 'C').flags.c_contiguous)
+        self.assertTrue(benchmarks.make_array((4, 6), 'F').flags.f_contiguous)
+        strided = benchmarks.make_array((4, 6), 'strided')
+        self.assertEqual(strided.shape, (4, 6))
+        self.assertFalse(strided.flags.c_contiguous or
+                         strided.flags.f_contiguous)
+
+    def test_results(self):
+        results = (benchmarks.bench_compile(small_sum1d, 1) +
+                   benchmarks.bench_dispatch(small_sum1d, 1, 0.001) +
+                   benchmarks.bench_run(small_sum1d, 1, 0.001))
+        json.dumps(results)
+
+        kinds = [(r['kind'], r['implementation']) for r in results]
+        self.assertEqual(kinds.count(('compile', 'numba')), 1)
+        self.assertEqual(kinds.count(('dispatch', 'autojit')), 1)
+        self.assertEqual(kinds.count(('run', 'numba')), 6)
+        self.assertEqual(kinds.count(('run', 'numpy')), 6)
+        self.assertEqual(kinds.count(('run', 'python')), 3)
+        self.assertTrue('type_infer' in results[0]['stages'])
+
+        for r in results:
+            self.assertTrue(r['seconds'] > 0.0)
+
+    def test_compare(self):
+        old = [dict(benchmark='sum1d', kind='run', implementation='numba',
+                    size=10, layout='C', seconds=1.0)]
+        new = [dict(old[0], seconds=1.05), dict(old[0], seconds=1.5,
+                                                  layout='F')]
+        self.assertEqual(benchmarks.compare(new, old), [])
+        new[0]['seconds'] = 2.0
+        self.assertEqual(benchmarks.compare(new, old), [(new[0], old[0])])
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_benchmarks.py
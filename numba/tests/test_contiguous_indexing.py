@@ -0,0 +1,87 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_contiguous_indexing
+
+Test element access for C contiguous, Fortran contiguous and strided array
+types.
+'''
+# ______________________________________________________________________
+
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba.decorators import jit, autojit
+
+# ______________________________________________________________________
+
+def sum2d(a):
+    result = 0.0
+    for i in range(a.shape[0]):
+        for j in range(a.shape[1]):
+            result += a[i, j] * (i + 1)
+    return result
+
+def scale2d(a, out):
+    for i in range(a.shape[0]):
+        for j in range(a.shape[1]):
+            out[i, j] = a[i, j] * 2.0
+
+def reassign(a, b):
+    result = 0.0
+    for i in range(2):
+        result += a[0, 1]
+        a = b
+    return result
+
+# ______________________________________________________________________
+
+class TestContiguousIndexing(unittest.TestCase):
+
+    def test_layouts(self):
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        expected = sum2d(a)
+        for signature in (double(double[:, ::1]),
+                          double(double[::1, :]),
+                          double(double[:, :])):
+            csum2d = jit(signature)(sum2d)
+            if signature.args[0].is_f_contig:
+                self.assertEqual(csum2d(np.asfortranarray(a)), expected)
+            else:
+                self.assertEqual(csum2d(a), expected)
+
+        csum2d = jit(double(double[:, :]))(sum2d)
+        self.assertEqual(csum2d(a[:, ::2]), sum2d(a[:, ::2]))
+
+    def test_store(self):
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        cscale2d = jit(void(double[::1, :], double[:, ::1]))(scale2d)
+        out = np.empty((3, 4))
+        cscale2d(np.asfortranarray(a), out)
+        self.assertTrue(np.all(out == a * 2.0))
+
+    def test_autojit(self):
+        csum2d = autojit(sum2d)
+        a = np.arange(24, dtype=np.double).reshape(4, 6)
+        for array in (a, np.asfortranarray(a), a[::2, ::3], a.T):
+            self.assertEqual(csum2d(array), sum2d(array))
+
+    def test_reassigned(self):
+        creassign = jit(double(double[:, ::1], double[:, ::1]))(reassign)
+        a = np.arange(4, dtype=np.double).reshape(2, 2)
+        self.assertEqual(creassign(a, a * 10), reassign(a, a * 10))
+
+    def test_not_contiguous(self):
+        csum2d = jit(double(double[:, ::1]))(sum2d)
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        self.assertRaises(TypeError, csum2d, a[:, ::2])
+        self.assertRaises(TypeError, csum2d, a.T)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_contiguous_indexing.py
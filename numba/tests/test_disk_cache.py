@@ -0,0 +1,165 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_disk_cache
+
+Test the persistent on-disk cache for compiled specializations.
+'''
+# ______________________________________________________________________
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+from numba import *
+from numba import caching, decorators, inlining, instrumentation
+from numba.decorators import jit
+
+# ______________________________________________________________________
+
+def sum1d(arr):
+    result = 0.0
+    for i in range(arr.shape[0]):
+        result += arr[i]
+    return result
+
+def call_object(arr):
+    return len(list(arr))
+
+@jit(double(double), inline='always')
+def cube(x):
+    return x * x * x
+
+def call_inlined(x):
+    return cube(x) + 1.0
+
+def make_scale(factor):
+    def scale(x):
+        return x * factor
+    return scale
+
+def add_default(x, y=1.0):
+    return x + y
+
+def square(x):
+    return x * x
+
+# ______________________________________________________________________
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.disk_cache = caching.DiskCache(decorators.context,
+                                            path=self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_store_and_load(self):
+        sum1d.live_objects = []
+        argtypes = [double[:]]
+        key = self.disk_cache.key(sum1d, None, argtypes, {})
+        self.assertEqual(self.disk_cache.load(sum1d, key), None)
+
+        sig, lfunc, wrapper = self.disk_cache.compile(sum1d, None, argtypes)
+        self.assertEqual(sig.return_type, double)
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir,
+                                                    key + '.bc')))
+
+        sig, lfunc, wrapper = self.disk_cache.load(sum1d, key)
+        self.assertEqual(sig.return_type, double)
+        arr = numpy.arange(10, dtype=numpy.double)
+        self.assertEqual(wrapper(arr), sum1d(arr))
+
+    def test_key(self):
+        key1 = self.disk_cache.key(sum1d, None, [double[:]], {})
+        key2 = self.disk_cache.key(sum1d, None, [float_[:]], {})
+        key3 = self.disk_cache.key(sum1d, None, [double[:]],
+                                   {'nopython': True})
+        self.assertNotEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+        self.assertEqual(key1, self.disk_cache.key(sum1d, None,
+                                                   [double[:]], {}))
+
+    def test_closure_and_defaults_key(self):
+        key = lambda func: self.disk_cache.key(func, None, [double], {})
+        self.assertNotEqual(key(make_scale(2.0)), key(make_scale(3.0)))
+        self.assertEqual(key(make_scale(2.0)), key(make_scale(2.0)))
+
+        def add_other_default(x, y=2.0):
+            return x + y
+        add_other_default.func_code = add_default.func_code
+        self.assertNotEqual(key(add_default), key(add_other_default))
+
+    def test_load_twice(self):
+        sum1d.live_objects = []
+        argtypes = [double[:]]
+        key = self.disk_cache.key(sum1d, None, argtypes, {})
+        self.disk_cache.compile(sum1d, None, argtypes)
+
+        # The module is already in the execution engine
+        sig1, lfunc1, wrapper1 = self.disk_cache.load(sum1d, key)
+        sig2, lfunc2, wrapper2 = self.disk_cache.load(sum1d, key)
+        self.assertEqual(lfunc1.module.id, lfunc2.module.id)
+        arr = numpy.arange(10, dtype=numpy.double)
+        self.assertEqual(wrapper2(arr), sum1d(arr))
+
+    def test_inlining_and_instrumentation(self):
+        # Loaded functions are registered and recorded like compiled ones
+        square.live_objects = []
+        self.disk_cache.compile(square, None, [double], inline='always')
+        was_enabled = instrumentation.is_enabled()
+        instrumentation.enable()
+        instrumentation.clear()
+        try:
+            sig, lfunc, wrapper = self.disk_cache.compile(
+                                    square, None, [double], inline='always')
+            record, = instrumentation.records(square)
+        finally:
+            if not was_enabled:
+                instrumentation.disable()
+            instrumentation.clear()
+
+        self.assertEqual(record.signature, sig)
+        stages = [name for name, seconds in record.stages]
+        self.assertEqual(stages[0], 'load_cache')
+        self.assertFalse('get_ast' in stages)
+        self.assertTrue(inlining.is_inlined(lfunc))
+        self.assertEqual(wrapper(3.0), 9.0)
+
+    def test_object_code_not_cached(self):
+        call_object.live_objects = []
+        self.disk_cache.compile(call_object, None, [double[:]])
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_inlined_callee_not_cached(self):
+        # The code of the callee is not part of the key
+        call_inlined.live_objects = []
+        sig, lfunc, wrapper = self.disk_cache.compile(call_inlined, None,
+                                                      [double])
+        self.assertEqual(wrapper(2.0), 9.0)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_jit_cache_option(self):
+        old_cache_dir = caching.get_cache_dir()
+        caching.set_cache_dir(self.cache_dir)
+        try:
+            def square(x):
+                return x * x
+
+            csquare = jit(double(double), cache=True)(square)
+            self.assertEqual(csquare(3.0), 9.0)
+            self.assertTrue(os.listdir(self.cache_dir))
+        finally:
+            caching.set_cache_dir(old_cache_dir)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_disk_cache.py
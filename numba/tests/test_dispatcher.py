@@ -0,0 +1,227 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_dispatcher
+
+Test dispatching of autojit calls to compiled specializations.
+'''
+# ______________________________________________________________________
+
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba import decorators, error
+from numba.decorators import autojit
+from numba.dispatcher import fast_key, Dispatcher
+
+# ______________________________________________________________________
+
+@autojit(backend='ast')
+def add(a, b):
+    return a + b
+
+@autojit(backend='ast')
+def first(arr):
+    return arr[0]
+
+def sum1d(arr):
+    result = 0.0
+    for i in range(arr.shape[0]):
+        result += arr[i]
+    return result
+
+# ______________________________________________________________________
+
+class TestFastKey(unittest.TestCase):
+
+    def test_scalars(self):
+        self.assertEqual(fast_key(1), int)
+        self.assertEqual(fast_key(1.0), float)
+        self.assertEqual(fast_key(1j), complex)
+
+    def test_arrays(self):
+        a = np.empty((10, 10), dtype=np.double)
+        self.assertEqual(fast_key(a), (a.dtype, 2, True, False))
+        self.assertEqual(fast_key(a.T), (a.dtype, 2, False, True))
+        self.assertEqual(fast_key(a[:, ::2]), (a.dtype, 2, False, False))
+        self.assertNotEqual(fast_key(a), fast_key(a.astype(np.float32)))
+
+    def test_dtypes(self):
+        # Byte orders and record layouts sharing a type number
+        self.assertNotEqual(fast_key(np.empty(3, dtype='<f8')),
+                            fast_key(np.empty(3, dtype='>f8')))
+        self.assertNotEqual(
+            fast_key(np.empty(3, dtype=[('x', 'f8'), ('y', 'i4')])),
+            fast_key(np.empty(3, dtype=[('x', 'i4'), ('y', 'f8')])))
+
+    def test_slow_path(self):
+        self.assertEqual(fast_key("foo"), None)
+        self.assertEqual(fast_key(np.matrix([[1.0]])), None)
+
+
+class TestDispatcher(unittest.TestCase):
+
+    def test_scalar_dispatch(self):
+        self.assertEqual(add(1, 2), 3)
+        self.assertEqual(add(1.5, 2.0), 3.5)
+        self.assertEqual(add(1, 2), 3)
+        self.assertEqual(len(add.dispatcher.specializations), 2)
+        self.assertEqual(len(add.dispatcher.entry_points), 2)
+
+    def test_array_dispatch(self):
+        a = np.arange(10, dtype=np.double)
+        b = np.arange(10, dtype=np.int32)
+        self.assertEqual(first(a), 0.0)
+        self.assertEqual(first(b), 0)
+        self.assertEqual(first(a[1:]), 1.0)
+        self.assertEqual(first(b[::2]), 0)
+
+        dispatcher = first.dispatcher
+        self.assertEqual(len(dispatcher.entry_points),
+                         len(dispatcher.specializations))
+
+
+class TestBackgroundCompilation(unittest.TestCase):
+
+    def test_fallback(self):
+        csum1d = autojit(background=True)(sum1d)
+        dispatcher = csum1d.dispatcher
+        a = np.arange(10, dtype=np.double)
+
+        # Runs the Python function, or the specialization if the compiler
+        # thread was quick
+        self.assertEqual(csum1d(a), 45.0)
+        dispatcher.wait()
+        self.assertEqual(len(dispatcher.specializations), 1)
+        self.assertEqual(len(dispatcher.entry_points), 1)
+
+        self.assertEqual(csum1d(a), 45.0)
+        entry_point = dispatcher.entry_points[(fast_key(a),)]
+        self.assertTrue(entry_point in dispatcher.signatures)
+
+    def test_warmup(self):
+        a = np.arange(10, dtype=np.double)
+        argtypes = decorators.context.typemapper.from_python(a),
+
+        csum1d = autojit(background=True, warmup=[argtypes])(sum1d)
+        csum1d.dispatcher.wait()
+        self.assertEqual(csum1d.dispatcher.specializations.keys(), [argtypes])
+
+        csum1d = autojit(warmup=[argtypes])(sum1d)
+        self.assertEqual(csum1d.dispatcher.specializations.keys(), [argtypes])
+        self.assertEqual(csum1d(a), 45.0)
+
+    def test_failed_compilation(self):
+        # A failed background compilation is retried on the next call
+        attempts = []
+        class Compiled(object):
+            ctypes_func = signature = None
+
+        def compile(types):
+            attempts.append(types)
+            if len(attempts) == 1:
+                raise error.NumbaError("compilation failed")
+            compiled = Compiled()
+            compiled.ctypes_func = lambda arr: -1.0
+            return compiled
+
+        dispatcher = Dispatcher(sum1d, compile, decorators.context.typemapper,
+                                background=True)
+        a = np.arange(10, dtype=np.double)
+        self.assertEqual(dispatcher(a), 45.0)
+        dispatcher.wait()
+        self.assertEqual(dispatcher.pending, set())
+        self.assertEqual(dispatcher.specializations, {})
+
+        self.assertEqual(dispatcher(a), 45.0)
+        dispatcher.wait()
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(dispatcher(a), -1.0)
+
+
+def scale(a, factor):
+    return a * factor
+
+class TestBoundedSpecializations(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cscale = autojit(max_specializations=2)(scale)
+        dispatcher = cscale.dispatcher
+
+        self.assertEqual(cscale(2, 3), 6)
+        self.assertEqual(cscale(2.0, 3.0), 6.0)
+        self.assertEqual(cscale(2, 3), 6)
+        # Evicts the (float, float) specialization
+        self.assertEqual(cscale(2j, 3j), -6.0)
+        self.assertEqual(len(dispatcher.specializations), 2)
+        self.assertEqual(len(dispatcher.entry_points), 2)
+        self.assertFalse((float, float) in dispatcher.entry_points)
+
+        self.assertEqual(cscale(2.0, 3.0), 6.0)
+        self.assertEqual(dispatcher.stats(),
+                         dict(specializations=2, max_specializations=2,
+                              hits=1, misses=4, evictions=2))
+
+    def test_release(self):
+        released = []
+        cscale = autojit(max_specializations=1)(scale)
+        dispatcher = cscale.dispatcher
+        release = dispatcher.release
+        def record_release(numba_func):
+            released.append(numba_func.signature)
+            release(numba_func)
+        dispatcher.release = record_release
+
+        for i in range(3):
+            self.assertEqual(cscale(2, 3), 6)
+            self.assertEqual(cscale(2.0, 3.0), 6.0)
+
+        self.assertEqual(len(released), 5)
+        self.assertEqual(len(dispatcher.specializations), 1)
+        self.assertEqual(dispatcher.compiled.keys(),
+                         dispatcher.specializations.values())
+
+    def test_deferred_release(self):
+        released = []
+        class Compiled(object):
+            signature = None
+
+        def compile(types):
+            compiled = Compiled()
+            def entry_point(x):
+                if isinstance(x, int):
+                    # Evicts this specialization while it runs
+                    self.assertEqual(dispatcher(float(x)), x)
+                    self.assertFalse(compiled in released)
+                    self.assertEqual(dispatcher.evicted.values(), [compiled])
+                return x
+            compiled.ctypes_func = entry_point
+            return compiled
+
+        dispatcher = Dispatcher(sum1d, compile, decorators.context.typemapper,
+                                max_specializations=1,
+                                release=released.append)
+        self.assertEqual(dispatcher(2), 2)
+        self.assertEqual(len(released), 1)
+        self.assertEqual(dispatcher.running, {})
+        self.assertEqual(dispatcher.evicted, {})
+        self.assertEqual(dispatcher.stats()['evictions'], 1)
+
+        # Specializations that aren't running are released right away
+        self.assertEqual(dispatcher(3), 3)
+        self.assertEqual(len(released), 3)
+
+    def test_unbounded_hits(self):
+        cscale = autojit(scale)
+        for i in range(3):
+            self.assertEqual(cscale(2, 3), 6)
+        self.assertEqual(cscale.dispatcher.stats()['hits'], 2)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_dispatcher.py
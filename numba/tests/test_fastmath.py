@@ -0,0 +1,115 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_fastmath
+
+Test the fastmath option (relaxed floating point semantics).
+'''
+# ______________________________________________________________________
+
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba import fastmath
+from numba.decorators import jit, autojit, vectorize
+
+# ______________________________________________________________________
+
+def sum_loop(a):
+    total = 0.0
+    for i in range(a.shape[0]):
+        total += a[i]
+    return total
+
+def dot_loop(a, b):
+    total = 0.0
+    for i in range(a.shape[0]):
+        total = total + a[i] * b[i]
+    return total
+
+def multiply_add(a, b, c):
+    return a * b + c, c - a * b, a * b - c
+
+def divide_by_constant(a):
+    return a / 4.0 + a / 3
+
+def array_expression(a, b, out):
+    out[:] = a * b + 1.0
+
+def saxpy(a, x, y):
+    return a * x + y
+
+def prange_sum(a):
+    total = 0.0
+    for i in prange(a.shape[0]):
+        total += a[i]
+    return total
+
+# ______________________________________________________________________
+
+class TestFastMath(unittest.TestCase):
+
+    def setUp(self):
+        self.a = np.linspace(0, 1, 1001)
+        self.b = np.linspace(1, 2, 1001)
+
+    def test_reductions(self):
+        csum = jit(double(double[:]), fastmath=True, opt_level=3)(sum_loop)
+        cdot = jit(double(double[:], double[:]), fastmath=True,
+                   opt_level=3)(dot_loop)
+        self.assertAlmostEqual(csum(self.a), np.sum(self.a))
+        self.assertAlmostEqual(cdot(self.a, self.b), np.dot(self.a, self.b))
+
+    def test_multiply_add(self):
+        cfunc = jit(double(double, double, double), fastmath=True)(
+                        lambda a, b, c: a * b + c)
+        self.assertEqual(cfunc(2.0, 3.0, 4.0), 10.0)
+        for a, b, c in ((2.0, 3.0, 4.0), (-1.5, 0.5, 8.0)):
+            result = autojit(fastmath=True)(multiply_add)(a, b, c)
+            self.assertEqual(result, multiply_add(a, b, c))
+
+    def test_divide_by_constant(self):
+        cfunc = jit(double(double), fastmath=True)(divide_by_constant)
+        for x in (0.0, 1.0, -12.0, 1e10):
+            self.assertAlmostEqual(cfunc(x), divide_by_constant(x))
+
+    def test_array_expression(self):
+        cfunc = jit(void(double[:], double[:], double[:]),
+                    fastmath=True)(array_expression)
+        out = np.empty_like(self.a)
+        cfunc(self.a, self.b, out)
+        self.assertTrue(np.allclose(out, self.a * self.b + 1.0))
+
+    def test_vectorize(self):
+        ufunc = vectorize(['f8(f8, f8, f8)'], fastmath=True)(saxpy)
+        self.assertTrue(np.allclose(ufunc(2.0, self.a, self.b),
+                                    2.0 * self.a + self.b))
+
+    def test_flags(self):
+        if not fastmath.supported():
+            return
+
+        relaxed = jit(double(double[:]), fastmath=True)(sum_loop)
+        strict = jit(double(double[:]))(sum_loop)
+        self.assertTrue('fadd fast' in str(relaxed.lfunc))
+        self.assertFalse('fadd fast' in str(strict.lfunc))
+
+    def test_prange(self):
+        cfunc = jit(double(double[:]), fastmath=True)(prange_sum)
+        self.assertAlmostEqual(cfunc(self.a), np.sum(self.a))
+        if not fastmath.supported():
+            return
+
+        bodies = [str(f) for f in cfunc.lfunc.module.functions
+                      if f.name.startswith('__numba_prange_body_prange_sum')]
+        self.assertTrue(bodies)
+        self.assertTrue(all('fadd fast' in body for body in bodies))
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_fastmath.py
@@ -0,0 +1,131 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_guvectorize
+
+Test building compiled generalized ufuncs with guvectorize().
+'''
+# ______________________________________________________________________
+
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba import error, ufunc_builder
+from numba.decorators import guvectorize
+
+# ______________________________________________________________________
+
+def dot(a, b, out):
+    result = 0.0
+    for i in range(a.shape[0]):
+        result += a[i] * b[i]
+    out[0] = result
+
+def matvec(m, v, out):
+    for i in range(m.shape[0]):
+        result = 0.0
+        for j in range(m.shape[1]):
+            result += m[i, j] * v[j]
+        out[i] = result
+
+def scale(a, factor, out):
+    for i in range(a.shape[0]):
+        out[i] = a[i] * factor
+
+def twice(a, out):
+    out[:] = a * 2.0
+
+# ______________________________________________________________________
+
+class TestGUFuncBuilder(unittest.TestCase):
+
+    def test_parse_layout(self):
+        self.assertEqual(ufunc_builder.parse_layout('(m,n),(n)->(m)'),
+                         ([['m', 'n'], ['n']], [['m']]))
+        self.assertEqual(ufunc_builder.parse_layout('(n), () -> ()'),
+                         ([['n'], []], [[]]))
+        self.assertRaises(error.NumbaError, ufunc_builder.parse_layout,
+                          '(n)')
+        self.assertRaises(error.NumbaError, ufunc_builder.parse_layout,
+                          '(n-1)->()')
+
+    def test_dot(self):
+        gdot = guvectorize(['void(f8[:], f8[:], f8[:])',
+                            'void(f4[:], f4[:], f4[:])'], '(n),(n)->()')(dot)
+        self.assertEqual(gdot.signature, '(n),(n)->()')
+        self.assertEqual(gdot.ntypes, 2)
+
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        b = np.arange(4, dtype=np.double)
+        self.assertTrue(np.all(gdot(a, b) == np.dot(a, b)))
+        self.assertTrue(np.all(gdot(a[:, ::2], b[::2]) ==
+                               np.dot(a[:, ::2], b[::2])))
+
+        c = a.astype(np.float32)
+        self.assertEqual(gdot(c, c).dtype, np.float32)
+        self.assertTrue(np.all(gdot(c, c) == (c * c).sum(axis=1)))
+
+    def test_contiguous_types(self):
+        gdot = guvectorize(['void(f8[::1], f8[::1], f8[:])'],
+                           '(n),(n)->()')(dot)
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        b = np.arange(4, dtype=np.double)
+        for x, y in [(a, b), (a[:, ::2], b[::2]), (a.T, a[:, 0])]:
+            self.assertTrue(np.all(gdot(x, y) == np.dot(x, y)))
+
+        gmatvec = guvectorize(['void(f8[:, ::1], f8[::1], f8[::1])'],
+                              '(m,n),(n)->(m)')(matvec)
+        m = np.arange(24, dtype=np.double).reshape(2, 3, 4)
+        v = np.arange(4, dtype=np.double)
+        for x in [m, m.transpose(0, 2, 1).copy().transpose(0, 2, 1)]:
+            expected = np.array([np.dot(x[i], v) for i in range(2)])
+            self.assertTrue(np.all(gmatvec(x, v) == expected))
+            out = np.empty((3, 2)).T
+            gmatvec(x, v, out)
+            self.assertTrue(np.all(out == expected))
+
+    def test_matvec(self):
+        gmatvec = guvectorize(['void(f8[:, :], f8[:], f8[:])'],
+                              '(m,n),(n)->(m)')(matvec)
+        m = np.arange(24, dtype=np.double).reshape(2, 3, 4)
+        v = np.arange(4, dtype=np.double)
+        expected = np.array([np.dot(m[i], v) for i in range(2)])
+        self.assertTrue(np.all(gmatvec(m, v) == expected))
+
+        out = np.empty((2, 3))
+        gmatvec(m, v, out)
+        self.assertTrue(np.all(out == expected))
+
+    def test_array_expression(self):
+        # The core operands are complete arrays (flags, descriptor)
+        gtwice = guvectorize(['void(f8[:], f8[:])'], '(n)->(n)')(twice)
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        self.assertTrue(np.all(gtwice(a) == a * 2.0))
+        self.assertTrue(np.all(gtwice(a.T) == a.T * 2.0))
+
+    def test_scalar_input(self):
+        gscale = guvectorize(['void(f8[:], f8, f8[:])'],
+                             '(n),()->(n)')(scale)
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        factors = np.array([1.0, 2.0, 3.0])
+        self.assertTrue(np.all(gscale(a, factors) ==
+                               a * factors[:, np.newaxis]))
+
+    def test_errors(self):
+        self.assertRaises(error.NumbaError, guvectorize(
+            ['void(f8[:], f8[:], f8[:])'], '(n)->()'), dot)
+        self.assertRaises(error.NumbaError, guvectorize(
+            ['f8(f8[:], f8[:], f8[:])'], '(n),(n)->()'), dot)
+        self.assertRaises(error.NumbaError, guvectorize(
+            ['void(f8[:, :], f8[:], f8[:])'], '(n),(n)->()'), dot)
+        self.assertRaises(error.NumbaError, guvectorize(
+            ['void(f8[:], f8[:], f8)'], '(n),(n)->()'), dot)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_guvectorize.py
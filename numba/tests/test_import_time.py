@@ -0,0 +1,89 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_import_time
+
+Test that "import numba" doesn't load the compiler, and track how long it
+takes.
+'''
+# ______________________________________________________________________
+
+import sys
+import logging
+import unittest
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+# Modules that must only be imported on first compile or first use
+lazy_modules = [
+    'llvm',
+    'llvm.core',
+    'numba.decorators',
+    'numba.pipeline',
+    'numba.translate',
+    'numba.ast_translate',
+    'numba.minivect.miniast',
+    'numba.minivect.graphviz',
+    'pydot',
+]
+
+# Maximum time "import numba" may take on top of "import numpy", relative
+# to the time of "import numpy" (absolute times depend on the machine)
+max_import_overhead = 1.0
+
+def run_python(code):
+    return subprocess.check_output([sys.executable, '-c', code]).strip()
+
+def import_time(module):
+    return float(run_python(
+        "import time; t = time.time(); import %s; print time.time() - t" %
+                                                                    module))
+
+# ______________________________________________________________________
+
+class TestImportTime(unittest.TestCase):
+
+    def test_lazy_modules(self):
+        imported = run_python(
+            "import sys, numba; "
+            "print ' '.join(m for m in %r if m in sys.modules)" % lazy_modules)
+        self.assertEqual(imported, '')
+
+    def test_decorators_attribute(self):
+        result = run_python(
+            "import sys, numba\n"
+            "print 'numba.decorators' in sys.modules,\n"
+            "print numba.decorators is sys.modules['numba.decorators']\n")
+        self.assertEqual(result, 'False True')
+
+        result = run_python(
+            "import sys\n"
+            "from numba import decorators\n"
+            "print decorators is sys.modules['numba.decorators']\n")
+        self.assertEqual(result, 'True')
+
+    def test_import_time(self):
+        numpy_time = min(import_time('numpy') for i in range(3))
+        numba_time = min(import_time('numba') for i in range(3))
+        logger.info("import numpy: %.3fs, import numba: %.3fs",
+                    numpy_time, numba_time)
+        self.assertTrue(
+            numba_time - numpy_time < max_import_overhead * numpy_time,
+            (numba_time, numpy_time))
+
+    def test_compile_after_import(self):
+        result = run_python(
+            "import sys, numba\n"
+            "def add(a, b):\n"
+            "    return a + b\n"
+            "add = numba.jit(numba.double(numba.double, numba.double))(add)\n"
+            "print add(1.0, 2.0), 'numba.decorators' in sys.modules\n")
+        self.assertEqual(result, '3.0 True')
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_import_time.py
@@ -0,0 +1,150 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_inlining
+
+Test inlining of calls between numba functions.
+'''
+# ______________________________________________________________________
+
+import unittest
+
+import numpy as np
+import llvm.core as lc
+
+from numba import *
+from numba import error, inlining
+from numba.decorators import jit, context
+
+# ______________________________________________________________________
+
+@jit(double(double, double), inline='always')
+def distance_always(a, b):
+    return (a - b) * (a - b)
+
+@jit(double(double, double), inline='never')
+def distance_never(a, b):
+    return (a - b) * (a - b)
+
+@jit(double(double, double))
+def distance_auto(a, b):
+    return (a - b) * (a - b)
+
+def total_always(x, y):
+    total = 0.0
+    for i in range(x.shape[0]):
+        total += distance_always(x[i], y[i])
+    return total
+
+def total_never(x, y):
+    total = 0.0
+    for i in range(x.shape[0]):
+        total += distance_never(x[i], y[i])
+    return total
+
+def total_auto(x, y):
+    total = 0.0
+    for i in range(x.shape[0]):
+        total += distance_auto(x[i], y[i])
+    return total
+
+def plus_one(a, b):
+    return distance_always(a, b) + 1.0
+
+def minus_one(a, b):
+    return distance_always(a, b) - 1.0
+
+@jit(double(double, double))
+def distance_object_mode(a, b):
+    return (a - b) * (a - b)
+
+def call_object_mode(a, b):
+    return distance_object_mode(a, b)
+
+def distance_of_ints():
+    return distance_auto(1, 4)
+
+def called_functions(lfunc):
+    "The names of the functions called by an LLVM function"
+    return set(instr.called_function.name
+                   for bb in lfunc.basic_blocks
+                       for instr in bb.instructions
+                           if isinstance(instr, lc.CallOrInvokeInstruction))
+
+# ______________________________________________________________________
+
+class TestInlining(unittest.TestCase):
+
+    def compile_total(self, func, **kwargs):
+        return jit(double(double[:], double[:]), nopython=True, opt_level=2,
+                   **kwargs)(func)
+
+    def check_total(self, ctotal):
+        x = np.arange(10, dtype=np.double)
+        y = x[::-1].copy()
+        self.assertEqual(ctotal(x, y), np.sum((x - y) ** 2))
+
+    def test_inline_always(self):
+        ctotal = self.compile_total(total_always)
+        self.check_total(ctotal)
+        self.assertFalse(distance_always.lfunc.name in
+                         called_functions(ctotal.lfunc))
+
+    def test_inline_never(self):
+        ctotal = self.compile_total(total_never)
+        self.check_total(ctotal)
+        self.assertTrue(distance_never.lfunc.name in
+                        called_functions(ctotal.lfunc))
+
+    def test_inline_auto(self):
+        ctotal = self.compile_total(total_auto)
+        self.check_total(ctotal)
+        self.assertFalse(distance_auto.lfunc.name in
+                         called_functions(ctotal.lfunc))
+
+    def test_only_caller_visited(self):
+        # Optimizing a function doesn't inline calls of other functions in
+        # the module
+        signature = double(double, double)
+        unoptimized = jit(signature, nopython=True, opt_level=0)(plus_one)
+        optimized = jit(signature, nopython=True, opt_level=2)(minus_one)
+        self.assertEqual(unoptimized(1.0, 4.0), 10.0)
+        self.assertEqual(optimized(1.0, 4.0), 8.0)
+        self.assertTrue(distance_always.lfunc.name in
+                        called_functions(unoptimized.lfunc))
+        self.assertFalse(distance_always.lfunc.name in
+                         called_functions(optimized.lfunc))
+        self.assertEqual(inlining.inline_calls(optimized.lfunc), 0)
+
+    def test_other_module(self):
+        # The callee is compiled into the module of the caller
+        module = context.llvm_context.create_module('test_inlining')
+        ctotal = self.compile_total(total_always, _llvm_module=module)
+        self.check_total(ctotal)
+        self.assertEqual(ctotal.lfunc.module, module)
+        for name in called_functions(ctotal.lfunc):
+            self.assertFalse(distance_always.lfunc.name in name)
+
+    def test_coerce_arguments(self):
+        # Calls use the signature of the callee
+        self.assertEqual(jit(double())(distance_of_ints)(), 9.0)
+
+    def test_nogil_caller(self):
+        # Functions compiled in object mode need the GIL
+        self.assertRaises(error.NumbaError,
+                          jit(double(double, double), nopython=True,
+                              nogil=True),
+                          call_object_mode)
+        ccall = jit(double(double, double), nopython=True)(call_object_mode)
+        self.assertEqual(ccall(1.0, 4.0), 9.0)
+
+    def test_invalid_option(self):
+        self.assertRaises(error.NumbaError, jit, double(double),
+                          inline='sometimes')
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_inlining.py
@@ -0,0 +1,77 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_instrumentation
+
+Test the per-stage compile time instrumentation.
+'''
+# ______________________________________________________________________
+
+import json
+import unittest
+
+from numba import *
+from numba import instrumentation
+from numba.decorators import jit
+
+# ______________________________________________________________________
+
+def sum1d(a):
+    result = 0.0
+    for i in range(a.shape[0]):
+        result += a[i]
+    return result
+
+# ______________________________________________________________________
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.was_enabled = instrumentation.is_enabled()
+        instrumentation.enable()
+        instrumentation.clear()
+
+    def tearDown(self):
+        if not self.was_enabled:
+            instrumentation.disable()
+        instrumentation.clear()
+
+    def test_stages(self):
+        csum1d = jit(double(double[:]))(sum1d)
+        records = instrumentation.records(csum1d)
+        self.assertEqual(len(records), 1)
+
+        record = records[0].as_dict()
+        self.assertEqual(record['function'], 'sum1d')
+        self.assertTrue(record['signature'])
+
+        stages = dict(record['stages'])
+        for name in ('get_ast', 'type_infer', 'late_specializer', 'codegen',
+                     'codegen.verify', 'codegen.optimize', 'build_wrapper'):
+            self.assertTrue(name in stages, name)
+            self.assertTrue(stages[name] >= 0.0)
+
+        self.assertTrue(stages['codegen'] >= stages['codegen.optimize'])
+        self.assertTrue(record['total'] >= stages['codegen'])
+
+        counters = record['counters']
+        for name in ('ast_nodes', 'ast_nodes_specialized',
+                     'llvm_instructions', 'llvm_instructions_opt'):
+            self.assertTrue(counters[name] > 0, name)
+
+    def test_json(self):
+        jit(double(double[:]))(sum1d)
+        stats = json.loads(instrumentation.to_json())
+        self.assertEqual(stats, instrumentation.stats())
+
+    def test_disabled(self):
+        instrumentation.disable()
+        jit(double(double[:]))(sum1d)
+        self.assertEqual(instrumentation.records(), [])
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_instrumentation.py
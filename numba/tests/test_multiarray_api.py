@@ -6,7 +6,10 @@ Test the code generation utility class numba.multiarray_api.MultiarrayAPI.
 '''
 # ______________________________________________________________________
 
+import os
 import ctypes
+import shutil
+import tempfile
 
 import llvm.core as lc
 import llvm.ee as le
@@ -143,6 +146,53 @@ def _get_pyarray_getptr(module):
 #    } PyArrayObject;
 
 class TestMultiarrayAPI(unittest.TestCase):
+    def test_api_map_cache(self):
+        from numba import caching
+        from numba.scrape_multiarray_api import get_include, process_source
+
+        old_cache_dir = caching.get_cache_dir()
+        cache_dir = tempfile.mkdtemp()
+        caching.set_cache_dir(cache_dir)
+        try:
+            ma._api_maps.clear()
+            api_map = ma.load_api_map()
+            self.assertEqual(api_map, process_source(get_include()))
+            self.assertTrue(os.path.exists(ma._api_map_cache_path()))
+
+            # Reload from the cache
+            ma._api_maps.clear()
+            self.assertEqual(ma.load_api_map(), api_map)
+            self.assertTrue(ma.MultiarrayAPI().api_map is ma.load_api_map())
+        finally:
+            caching.set_cache_dir(old_cache_dir)
+            shutil.rmtree(cache_dir)
+
+    def test_api_map_cache_disabled(self):
+        from numba import caching
+
+        old_cache_dir = caching.get_cache_dir()
+        old_enabled = caching._enabled
+        cache_dir = tempfile.mkdtemp()
+        caching.set_cache_dir(cache_dir)
+        caching._enabled = False
+        try:
+            ma._api_maps.clear()
+            self.assertTrue(ma.load_api_map())
+            self.assertFalse(os.path.exists(ma._api_map_cache_path()))
+            self.assertTrue(np.__version__ in ma.numpy_build())
+        finally:
+            caching.set_cache_dir(old_cache_dir)
+            caching._enabled = old_enabled
+            shutil.rmtree(cache_dir)
+
+    def test_api_addr(self):
+        ma_obj = ma.MultiarrayAPI()
+        addr = ma_obj.calculate_api_addr()
+        self.assertTrue(addr)
+        self.assertEqual(addr, ma.get_api_pointer(ma._ARRAY_API))
+        self.assertTrue(isinstance(ma_obj.PyArray_Zeros_ty, lc.Type))
+        self.assertRaises(AttributeError, getattr, ma_obj, 'load_PyArray_Nope')
+
     def test_call_PyArray_Zeros(self):
         ma_obj = ma.MultiarrayAPI()
         module = lc.Module.new('test_module')
@@ -0,0 +1,116 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_native_allocation
+
+Test allocating arrays with np.empty, np.zeros, np.empty_like and
+np.zeros_like through the NumPy C API, also in nopython context.
+'''
+# ______________________________________________________________________
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba import error, caching, decorators
+from numba.decorators import jit
+
+# ______________________________________________________________________
+
+def cumsum(a):
+    result = np.empty(a.shape[0], dtype=np.double)
+    total = 0.0
+    for i in range(a.shape[0]):
+        total += a[i]
+        result[i] = total
+    return result
+
+def zeros2d(m, n):
+    result = np.zeros((m, n), dtype=np.double)
+    for i in range(m):
+        result[i, n - 1] = 1.0
+    return result
+
+def zeros_fortran(m, n):
+    return np.zeros((m, n), dtype=np.double, order='F')
+
+def scratch(a):
+    total = 0.0
+    for i in range(a.shape[0]):
+        tmp = np.zeros_like(a)
+        tmp[i] = a[i]
+        total += tmp[i]
+    return total
+
+def like(a):
+    result = np.empty_like(a)
+    for i in range(a.shape[0]):
+        for j in range(a.shape[1]):
+            result[i, j] = a[i, j] * 2.0
+    return result
+
+# ______________________________________________________________________
+
+class TestNativeAllocation(unittest.TestCase):
+
+    def test_empty(self):
+        ccumsum = jit(double[:](double[:]), nopython=True)(cumsum)
+        a = np.arange(10, dtype=np.double)
+        self.assertTrue(np.all(ccumsum(a) == np.cumsum(a)))
+
+    def test_zeros(self):
+        czeros2d = jit(double[:, :](int_, int_), nopython=True)(zeros2d)
+        result = czeros2d(3, 4)
+        self.assertEqual(result.shape, (3, 4))
+        self.assertTrue(np.all(result == zeros2d(3, 4)))
+
+        czeros_fortran = jit(double[:, :](int_, int_),
+                             nopython=True)(zeros_fortran)
+        result = czeros_fortran(3, 4)
+        self.assertTrue(result.flags['F_CONTIGUOUS'])
+        self.assertTrue(np.all(result == 0.0))
+
+    def test_like(self):
+        cscratch = jit(double(double[:]), nopython=True)(scratch)
+        a = np.arange(10, dtype=np.double)
+        self.assertEqual(cscratch(a), a.sum())
+
+        clike = jit(double[:, :](double[:, :]), nopython=True)(like)
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        for array in (a, np.asfortranarray(a), a[:, ::2]):
+            result = clike(array)
+            self.assertEqual(result.shape, array.shape)
+            self.assertTrue(np.all(result == array * 2.0))
+
+        self.assertTrue(clike(np.asfortranarray(a)).flags['F_CONTIGUOUS'])
+
+    def test_not_cached(self):
+        # The address of the NumPy API table is specific to the process
+        cache_dir = tempfile.mkdtemp()
+        try:
+            disk_cache = caching.DiskCache(decorators.context, path=cache_dir)
+            cumsum.live_objects = []
+            sig, lfunc, wrapper = disk_cache.compile(cumsum, None,
+                                                     [double[:]],
+                                                     nopython=True)
+            a = np.arange(10, dtype=np.double)
+            self.assertTrue(np.all(wrapper(a) == np.cumsum(a)))
+            self.assertEqual(os.listdir(cache_dir), [])
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_nogil(self):
+        self.assertRaises(error.NumbaError,
+                          jit(double[:](double[:]), nopython=True, nogil=True),
+                          cumsum)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_native_allocation.py
@@ -0,0 +1,190 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_native_slicing
+
+Test basic slicing of arrays into views computed natively, also in
+nopython context.
+'''
+# ______________________________________________________________________
+
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba import error
+from numba.decorators import jit
+
+# ______________________________________________________________________
+
+def row_sums(a, out):
+    for i in range(a.shape[0]):
+        row = a[i, :]
+        total = 0.0
+        for j in range(row.shape[0]):
+            total += row[j]
+        out[i] = total
+
+def column_sums(a, out):
+    for j in range(a.shape[1]):
+        total = 0.0
+        for i in range(a.shape[0]):
+            total += a[:, j][i]
+        out[j] = total
+
+def scale_rows(a, out):
+    for i in range(a.shape[0]):
+        out[i, :] = a[i, :] * 2.0 + 1.0
+
+def smooth(u, out):
+    out[1:-1] = (u[:-2] + u[1:-1] + u[2:]) / 3.0
+
+def slice_3(a, start, stop, step):
+    return a[start:stop:step]
+
+def slice_2d(a):
+    return a[1:-1, ::2]
+
+def reverse(a):
+    return a[::-1]
+
+def index_last(a):
+    return a[-1, :]
+
+def newaxis(a):
+    return a[:, None]
+
+def row_sum(a, i):
+    row = a[i, :]
+    total = 0.0
+    for j in range(row.shape[0]):
+        total += row[j]
+    return total
+
+def strided_sum(a, step):
+    view = a[::step]
+    total = 0.0
+    for i in range(view.shape[0]):
+        total += view[i]
+    return total
+
+def zero_step(a):
+    return a[::0]
+
+def escaping_row(a):
+    row = a[0, :]
+    return row
+
+# ______________________________________________________________________
+
+class TestNativeSlicing(unittest.TestCase):
+
+    def test_local_view(self):
+        crow_sums = jit(void(double[:, :], double[:]),
+                        nopython=True)(row_sums)
+        a = np.arange(20, dtype=np.double).reshape(4, 5)
+        for array in (a, np.asfortranarray(a), a[:, ::2]):
+            out = np.empty(array.shape[0])
+            crow_sums(array, out)
+            self.assertTrue(np.all(out == array.sum(axis=1)))
+
+    def test_view_of_view(self):
+        ccolumn_sums = jit(void(double[:, :], double[:]),
+                           nopython=True)(column_sums)
+        a = np.arange(20, dtype=np.double).reshape(4, 5)
+        out = np.empty(5)
+        ccolumn_sums(a, out)
+        self.assertTrue(np.all(out == a.sum(axis=0)))
+
+    def test_array_expressions(self):
+        cscale_rows = jit(void(double[:, :], double[:, :]),
+                          nopython=True)(scale_rows)
+        a = np.arange(20, dtype=np.double).reshape(4, 5)
+        out = np.zeros((4, 5))
+        cscale_rows(a, out)
+        self.assertTrue(np.all(out == a * 2.0 + 1.0))
+
+        csmooth = jit(void(double[:], double[:]), nopython=True)(smooth)
+        u = np.arange(10, dtype=np.double) ** 2
+        out = np.zeros(10)
+        expected = np.zeros(10)
+        smooth(u, expected)
+        csmooth(u, out)
+        self.assertTrue(np.allclose(out, expected))
+
+    def test_bounds(self):
+        cslice = jit(double[:](double[:], Py_ssize_t, Py_ssize_t,
+                               Py_ssize_t))(slice_3)
+        a = np.arange(10, dtype=np.double)
+        for start in (-12, -3, 0, 2, 9, 12):
+            for stop in (-12, -1, 0, 5, 10, 12):
+                for step in (-3, -1, 1, 2):
+                    self.assertTrue(np.all(cslice(a, start, stop, step) ==
+                                           a[start:stop:step]))
+
+        self.assertRaises(ValueError, cslice, a, 0, 10, 0)
+
+    def test_constant_slices(self):
+        a = np.arange(40, dtype=np.double).reshape(5, 8)
+        for func in (slice_2d, reverse, index_last, newaxis):
+            cfunc = jit(argtypes=[double[:, :]])(func)
+            result = cfunc(a)
+            self.assertEqual(result.shape, func(a).shape)
+            self.assertTrue(np.all(result == func(a)))
+
+    def test_escaping_view(self):
+        cescaping_row = jit(double[:](double[:, :]),
+                            nopython=True)(escaping_row)
+        a = np.arange(20, dtype=np.double).reshape(4, 5)
+        row = cescaping_row(a)
+        self.assertTrue(np.all(row == a[0]))
+        self.assertTrue(row.base is a)
+        self.assertTrue(row.flags.c_contiguous)
+
+        row[0] = 100.0
+        self.assertEqual(a[0, 0], 100.0)
+
+        a.flags.writeable = False
+        self.assertFalse(cescaping_row(a).flags.writeable)
+
+    def test_index_out_of_bounds(self):
+        cindex_last = jit(double[:](double[:, :]))(index_last)
+        self.assertRaises(IndexError, cindex_last, np.empty((0, 3)))
+        self.assertRaises(error.NumbaError, jit(double[:](double[:])),
+                          zero_step)
+
+    def test_nogil(self):
+        # Local views don't need the GIL
+        crow_sums = jit(void(double[:, :], double[:]), nopython=True,
+                        nogil=True)(row_sums)
+        a = np.arange(20, dtype=np.double).reshape(4, 5)
+        out = np.empty(4)
+        crow_sums(a, out)
+        self.assertTrue(np.all(out == a.sum(axis=1)))
+
+        # Bounds are checked without the GIL as well
+        crow_sum = jit(double(double[:, :], Py_ssize_t), nopython=True,
+                       nogil=True)(row_sum)
+        self.assertEqual(crow_sum(a, -1), a[-1].sum())
+        self.assertRaises(IndexError, crow_sum, a, 4)
+        self.assertRaises(IndexError, crow_sum, a, -5)
+
+        # Scalar results are not returned when the step check fails
+        for nogil in (False, True):
+            cstrided_sum = jit(double(double[:], Py_ssize_t),
+                               nopython=True, nogil=nogil)(strided_sum)
+            self.assertEqual(cstrided_sum(a[0], 2), a[0, ::2].sum())
+            self.assertEqual(cstrided_sum(a[0], -1), a[0].sum())
+            self.assertRaises(ValueError, cstrided_sum, a[0], 0)
+
+        self.assertRaises(error.NumbaError,
+                          jit(double[:](double[:, :]), nopython=True,
+                              nogil=True), escaping_row)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_native_slicing.py
@@ -0,0 +1,91 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_nogil
+
+Test releasing the GIL in nopython functions.
+'''
+# ______________________________________________________________________
+
+import threading
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba import error
+from numba.decorators import jit, autojit
+
+# ______________________________________________________________________
+
+def sum1d(arr):
+    result = 0.0
+    for i in range(arr.shape[0]):
+        result += arr[i]
+    return result
+
+def fill(arr, value):
+    for i in range(arr.shape[0]):
+        arr[i] = value
+
+def prange_step(arr, step):
+    for i in prange(0, arr.shape[0], step):
+        arr[i] = 1.0
+
+def add_arrays(out, a, b):
+    out[:] = a + b
+
+# ______________________________________________________________________
+
+class TestNoGIL(unittest.TestCase):
+
+    def test_results(self):
+        csum1d = jit(double(double[:]), nopython=True, nogil=True)(sum1d)
+        cfill = jit(void(double[:], double), nopython=True, nogil=True)(fill)
+        a = np.empty(100, dtype=np.double)
+        self.assertEqual(cfill(a, 2.0), None)
+        self.assertEqual(csum1d(a), 200.0)
+
+        asum1d = autojit(nopython=True, nogil=True)(sum1d)
+        self.assertEqual(asum1d(a), 200.0)
+
+    def test_threads(self):
+        csum1d = jit(double(double[:]), nopython=True, nogil=True)(sum1d)
+        arrays = [np.arange(100000, dtype=np.double) * i for i in range(8)]
+        results = [None] * len(arrays)
+
+        def run(i):
+            for _ in range(10):
+                results[i] = csum1d(arrays[i])
+
+        threads = [threading.Thread(target=run, args=(i,))
+                       for i in range(len(arrays))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [arr.sum() for arr in arrays])
+
+    def test_errors(self):
+        # Exceptions are raised with the GIL reacquired
+        cprange_step = jit(void(double[:], long_), nopython=True,
+                           nogil=True)(prange_step)
+        self.assertRaises(ValueError, cprange_step, np.empty(10), 0)
+
+        cadd_arrays = jit(void(double[:], double[:], double[:]),
+                          nopython=True, nogil=True)(add_arrays)
+        a = np.arange(10, dtype=np.double)
+        self.assertRaises(ValueError, cadd_arrays, np.empty(10), a, a[:5])
+
+    def test_requires_nopython(self):
+        self.assertRaises(error.NumbaError, jit, double(double[:]),
+                          nogil=True)
+        self.assertRaises(error.NumbaError, autojit, nogil=True)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_nogil.py
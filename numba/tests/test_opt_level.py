@@ -0,0 +1,72 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_opt_level
+
+Test the opt_level option and the global default optimization level.
+'''
+# ______________________________________________________________________
+
+import types
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba import passes
+from numba.decorators import jit, autojit
+
+# ______________________________________________________________________
+
+def sum1d(arr):
+    result = 0.0
+    for i in range(arr.shape[0]):
+        result += arr[i]
+    return result
+
+# ______________________________________________________________________
+
+class TestOptLevel(unittest.TestCase):
+
+    def compile(self, **kwds):
+        # Compile a fresh copy, compiled specializations are cached per
+        # function and argument types
+        func = types.FunctionType(sum1d.func_code, sum1d.func_globals)
+        return jit(double(double[:]), nopython=True, **kwds)(func)
+
+    def test_results(self):
+        arr = np.arange(100, dtype=np.double)
+        for opt_level in range(4):
+            csum1d = self.compile(opt_level=opt_level)
+            self.assertEqual(csum1d(arr), arr.sum())
+
+        func = types.FunctionType(sum1d.func_code, sum1d.func_globals)
+        asum1d = autojit(opt_level=3)(func)
+        self.assertEqual(asum1d(arr), arr.sum())
+
+    def test_mem2reg(self):
+        # Stack allocated locals are promoted to registers from -O1
+        self.assertTrue('alloca' in str(self.compile(opt_level=0).lfunc))
+        self.assertFalse('alloca' in str(self.compile(opt_level=1).lfunc))
+
+    def test_default_opt_level(self):
+        old_opt_level = passes.get_default_opt_level()
+        passes.set_default_opt_level(0)
+        try:
+            self.assertTrue('alloca' in str(self.compile().lfunc))
+        finally:
+            passes.set_default_opt_level(old_opt_level)
+
+    def test_pass_levels(self):
+        levels = [passes.llvm_passes(passes.function_passes, opt_level)
+                      for opt_level in range(4)]
+        self.assertEqual(levels[0], [])
+        for lower, higher in zip(levels, levels[1:]):
+            self.assertEqual(higher[:len(lower)], lower)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_opt_level.py
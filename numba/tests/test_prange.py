@@ -0,0 +1,197 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_prange
+
+Test parallel range loops.
+'''
+# ______________________________________________________________________
+
+import ast
+import unittest
+import threading
+
+import numpy as np
+
+from numba import *
+from numba import parallel, error
+from numba.decorators import jit, autojit
+
+# ______________________________________________________________________
+
+def sum_squares(a):
+    result = 0.0
+    for i in prange(a.shape[0]):
+        result += a[i] * a[i]
+    return result
+
+def scale(a, out, factor):
+    for i in prange(a.shape[0]):
+        value = a[i] * factor
+        out[i] = value
+
+def row_sums(a, out):
+    for i in prange(a.shape[0]):
+        total = 0.0
+        for j in range(a.shape[1]):
+            total += a[i, j]
+        out[i] = total
+
+def reductions(n):
+    total = 0
+    product = 1.0
+    for i in prange(1, n, 2):
+        total -= i
+        product *= 1.5
+    return total + product
+
+def bad_reduction(a):
+    result = 0.0
+    for i in prange(a.shape[0]):
+        result += a[i]
+        a[i] = result
+    return result
+
+def gather_first(a, rows):
+    total = 0.0
+    for i in prange(rows.shape[0]):
+        total += a[rows[i], :][0]
+    return total
+
+def object_body(a):
+    for i in prange(a.shape[0]):
+        print a
+    return 0
+
+# ______________________________________________________________________
+
+class TestPrangeAnalysis(unittest.TestCase):
+
+    def analyse(self, source):
+        node = ast.parse(source).body[0]
+        parallel.analyse_prange(node)
+        return node
+
+    def test_classification(self):
+        node = self.analyse("for i in prange(n):\n"
+                            "    x = a[i] * c\n"
+                            "    s += x\n"
+                            "    p *= x")
+        self.assertEqual(node.private, set(['i', 'x']))
+        self.assertEqual(node.shared, set(['a', 'c']))
+        self.assertEqual(sorted(node.reductions), ['p', 's'])
+
+    def test_invalid_reductions(self):
+        self.assertRaises(error.NumbaError, self.analyse,
+                          "for i in prange(n):\n    s /= a[i]")
+        self.assertRaises(error.NumbaError, self.analyse,
+                          "for i in prange(n):\n    s += a[i]\n    s *= 2")
+        self.assertRaises(error.NumbaError, self.analyse,
+                          "for i in prange(n):\n    s += a[i]\n    b[i] = s")
+
+
+class TestPrange(unittest.TestCase):
+
+    def setUp(self):
+        self.num_threads = parallel.get_num_threads()
+        parallel.set_num_threads(4)
+
+    def tearDown(self):
+        parallel.set_num_threads(self.num_threads)
+
+    def test_reduction(self):
+        csum_squares = jit(double(double[:]), nopython=True)(sum_squares)
+        a = np.arange(1000, dtype=np.double)
+        self.assertEqual(csum_squares(a), np.sum(a * a))
+        self.assertEqual(csum_squares(a[:3]), np.sum(a[:3] * a[:3]))
+        self.assertEqual(csum_squares(a[:0]), 0.0)
+
+    def test_shared_and_private(self):
+        cscale = autojit(scale)
+        a = np.arange(100, dtype=np.double)
+        out = np.empty_like(a)
+        cscale(a, out, 2.0)
+        self.assertTrue(np.all(out == a * 2.0))
+
+    def test_array_arguments(self):
+        # Array descriptors of the arguments are loaded in the body function
+        crow_sums = jit(void(double[:, ::1], double[::1]))(row_sums)
+        a = np.arange(60, dtype=np.double).reshape(12, 5)
+        out = np.empty(12)
+        crow_sums(a, out)
+        self.assertTrue(np.all(out == a.sum(axis=1)))
+
+    def test_multiple_reductions(self):
+        creductions = jit(double(long_))(reductions)
+        for n in (0, 1, 2, 10, 41):
+            self.assertEqual(creductions(n), reductions(n))
+
+    def test_python_semantics(self):
+        a = np.arange(10, dtype=np.double)
+        self.assertEqual(sum_squares(a), np.sum(a * a))
+
+    def test_body_errors(self):
+        a = np.arange(20, dtype=np.double).reshape(4, 5)
+        rows = np.arange(100) % 4
+        for nogil in (False, True):
+            cgather_first = jit(double(double[:, :], long_[:]),
+                                nopython=True, nogil=nogil)(gather_first)
+            self.assertEqual(cgather_first(a, rows), a[rows, 0].sum())
+
+            # The exception of the failed chunk is raised by the caller
+            rows[77] = 4
+            for _ in range(2):
+                self.assertRaises(IndexError, cgather_first, a, rows)
+            rows[77] = 0
+            self.assertEqual(cgather_first(a, rows), a[rows, 0].sum())
+
+    def test_errors(self):
+        self.assertRaises(error.NumbaError, jit(double(double[:])),
+                          bad_reduction)
+        self.assertRaises(error.NumbaError, jit(int_(double[:])),
+                          object_body)
+
+class TestThreadPool(unittest.TestCase):
+
+    def test_errors(self):
+        pool = parallel.ThreadPool()
+        def work(i):
+            if i == 3:
+                raise ZeroDivisionError(i)
+            results[i] = i
+
+        # Run it twice, the workers must survive the failed task
+        for _ in range(2):
+            results = [None] * 4
+            self.assertRaises(ZeroDivisionError, pool.map, work,
+                              [(i,) for i in range(4)])
+            self.assertEqual(results[:3], [0, 1, 2])
+
+        results = [None] * 3
+        pool.map(work, [(i,) for i in range(3)])
+        self.assertEqual(results, [0, 1, 2])
+
+    def test_concurrent_maps(self):
+        pool = parallel.ThreadPool()
+        calls = []
+        def work(i):
+            calls.append(i)
+
+        threads = [threading.Thread(target=pool.map,
+                                    args=(work, [(i,) for i in range(4)]))
+                       for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Each map() needs 3 workers, they are only started once
+        self.assertEqual(len(pool.workers), 3)
+        self.assertEqual(sorted(calls), sorted(range(4) * 8))
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_prange.py
@@ -0,0 +1,92 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_profiler
+
+Test the runtime call statistics of numba.profiler.
+'''
+# ______________________________________________________________________
+
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba import profiler, decorators, dispatcher
+from numba.decorators import jit, autojit
+
+# ______________________________________________________________________
+
+def add(a, b):
+    return a + b
+
+def sum1d(a):
+    result = 0.0
+    for i in range(a.shape[0]):
+        result += a[i]
+    return result
+
+# ______________________________________________________________________
+
+class TestProfiler(unittest.TestCase):
+
+    def test_jit(self):
+        cadd = jit(double(double, double))(add)
+        with profiler.profile() as prof:
+            for i in range(10):
+                cadd(1.0, 2.0)
+
+        stats = prof.stats(cadd)
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]['function'], 'add')
+        self.assertEqual(stats[0]['calls'], 10)
+        self.assertTrue(stats[0]['exec_time'] >= 0.0)
+        self.assertEqual(prof.compiles, [])
+
+    def test_autojit(self):
+        csum1d = autojit(sum1d)
+        with profiler.profile() as prof:
+            csum1d(np.arange(10, dtype=np.double))
+            csum1d(np.arange(10, dtype=np.double))
+            csum1d(np.arange(10, dtype=np.int32))
+
+        stats = prof.stats(csum1d)
+        self.assertEqual(len(stats), 2)
+        self.assertEqual(sorted(s['calls'] for s in stats), [1, 2])
+        for s in stats:
+            self.assertTrue(s['signature'])
+            self.assertTrue(s['dispatch_time'] >= 0.0)
+
+        self.assertEqual(len(prof.compiles), 2)
+        self.assertTrue(prof.compile_time > 0.0)
+        self.assertTrue('2 specializations compiled' in prof.report())
+
+    def test_hooks(self):
+        calls = []
+        def hook(py_func, signature, dispatch_time, exec_time):
+            calls.append(py_func)
+
+        cadd = jit(double(double, double))(add)
+        profiler.add_hook(hook)
+        try:
+            with profiler.profile():
+                cadd(1.0, 2.0)
+        finally:
+            profiler.remove_hook(hook)
+
+        self.assertEqual(calls, [add])
+
+    def test_disabled(self):
+        with profiler.profile():
+            self.assertTrue(profiler.is_enabled())
+
+        self.assertFalse(profiler.is_enabled())
+        for cls in (decorators.NumbaFunction, dispatcher.Dispatcher):
+            self.assertTrue(cls.__dict__['__call__'] is cls.__dict__['_call'])
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_profiler.py
@@ -0,0 +1,124 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_refcount_elimination
+
+Test inline reference counting and the elimination of incref/decref
+pairs.
+'''
+# ______________________________________________________________________
+
+import sys
+import unittest
+
+import llvm.core as lc
+
+from numba import *
+from numba import refcount
+from numba.decorators import jit
+
+# ______________________________________________________________________
+
+def build_function(body):
+    "Build void f(i8 *obj), with body(builder, obj, incref, decref, opaque)"
+    module = lc.Module.new('test_refcount_elimination')
+    object_ltype = lc.Type.pointer(lc.Type.int(8))
+    incref = refcount.get_refcount_function(module, refcount.INCREF,
+                                            object_ltype)
+    decref = refcount.get_refcount_function(module, refcount.DECREF,
+                                            object_ltype)
+    opaque = module.add_function(lc.Type.function(lc.Type.void(), []),
+                                 'opaque')
+
+    lfunc = module.add_function(
+        lc.Type.function(lc.Type.void(), [object_ltype]), 'f')
+    b = lc.Builder.new(lfunc.append_basic_block('entry'))
+    body(b, lfunc.args[0], incref, decref, opaque)
+    b.ret_void()
+    lfunc.verify()
+    return lfunc
+
+def refcount_calls(lfunc):
+    return [getattr(instr.called_function, 'name', None)
+                for bb in lfunc.basic_blocks
+                    for instr in bb.instructions
+                        if instr.opcode_name == 'call']
+
+def copy_list(L):
+    result = []
+    for x in L:
+        result.append(x)
+    return result
+
+# ______________________________________________________________________
+
+class TestRefcountElimination(unittest.TestCase):
+
+    def test_pairs(self):
+        def body(b, obj, incref, decref, opaque):
+            b.call(incref, [obj])
+            b.call(decref, [obj])
+            b.call(incref, [obj])
+            b.call(incref, [obj])
+            b.call(decref, [obj])
+
+        lfunc = build_function(body)
+        self.assertEqual(refcount.eliminate_refcount_pairs(lfunc), 2)
+        self.assertEqual(refcount_calls(lfunc), [refcount.INCREF])
+        lfunc.verify()
+
+    def test_calls_in_between(self):
+        def body(b, obj, incref, decref, opaque):
+            b.call(incref, [obj])
+            b.call(opaque, [])
+            b.call(decref, [obj])
+            # A decref followed by an incref may deallocate the object
+            b.call(decref, [obj])
+            b.call(incref, [obj])
+
+        lfunc = build_function(body)
+        self.assertEqual(refcount.eliminate_refcount_pairs(lfunc), 0)
+        self.assertEqual(len(refcount_calls(lfunc)), 5)
+
+    def test_loads(self):
+        def body(b, obj, incref, decref, opaque):
+            slot = b.alloca(obj.type)
+            b.store(obj, slot)
+            b.call(incref, [b.load(slot)])
+            b.call(decref, [b.load(slot)])
+            b.call(incref, [b.load(slot)])
+            b.store(lc.Constant.null(obj.type), slot)
+            b.call(decref, [b.load(slot)])
+
+        lfunc = build_function(body)
+        self.assertEqual(refcount.eliminate_refcount_pairs(lfunc), 1)
+
+    def test_distinct_values(self):
+        def body(b, obj, incref, decref, opaque):
+            # Unnamed slots holding (possibly) different objects
+            slots = [b.alloca(obj.type), b.alloca(obj.type)]
+            for slot in slots:
+                b.store(obj, slot)
+            b.call(incref, [b.load(slots[0])])
+            b.call(decref, [b.load(slots[1])])
+
+        lfunc = build_function(body)
+        self.assertEqual(refcount.eliminate_refcount_pairs(lfunc), 0)
+        self.assertEqual(len(refcount_calls(lfunc)), 2)
+
+    def test_object_code(self):
+        ccopy_list = jit(object_(object_))(copy_list)
+        L = [object() for i in range(10)]
+        counts = [sys.getrefcount(x) for x in L]
+        for i in range(10):
+            self.assertEqual(ccopy_list(L), L)
+        self.assertEqual([sys.getrefcount(x) for x in L], counts)
+
+        self.assertFalse('Py_IncRef' in refcount_calls(ccopy_list.lfunc))
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_refcount_elimination.py
@@ -0,0 +1,97 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_source_ast
+
+Test that functions are parsed from their source, with their actual line
+numbers, and decompiled only when the source is not available.
+'''
+# ______________________________________________________________________
+
+import ast
+import inspect
+import unittest
+
+from numba import *
+from numba import functions
+from numba.decorators import jit
+
+# ______________________________________________________________________
+
+def add(a, b):
+    result = a + b
+    return result
+
+def make_nested():
+    def nested(a):
+        return a * 2.0
+    return nested
+
+def make_closure(factor):
+    def closure(a):
+        return a * factor
+    return closure
+
+# ______________________________________________________________________
+
+class TestSourceAST(unittest.TestCase):
+
+    def test_line_numbers(self):
+        func_def = functions._get_ast(add)
+        self.assertTrue(isinstance(func_def, ast.FunctionDef))
+        firstlineno = inspect.getsourcelines(add)[1]
+        self.assertEqual(func_def.lineno, firstlineno)
+        self.assertEqual(func_def.body[0].lineno, firstlineno + 1)
+        self.assertEqual(func_def.body[1].lineno, firstlineno + 2)
+
+    def test_nested(self):
+        nested = make_nested()
+        func_def = functions._get_ast(nested)
+        self.assertEqual(func_def.name, 'nested')
+        self.assertEqual(func_def.lineno, inspect.getsourcelines(nested)[1])
+
+    def test_closure(self):
+        closure = make_closure(2.0)
+        source = functions._get_source(closure)
+        self.assertTrue(functions._parse_function(closure.func_code,
+                                                  *source) is not None)
+
+    def test_stale_source(self):
+        # The source doesn't match the code, e.g. after editing the file
+        source, firstlineno = functions._get_source(add)
+        changed = source.replace('a + b', 'a - b')
+        self.assertEqual(functions._parse_function(add.func_code, changed,
+                                                   firstlineno), None)
+        self.assertEqual(functions._parse_function(add.func_code, source,
+                                                   firstlineno + 1), None)
+        self.assertTrue(functions._parse_function(add.func_code, source,
+                                                  firstlineno) is not None)
+
+    def test_fresh_ast(self):
+        first, second = functions._get_ast(add), functions._get_ast(add)
+        self.assertTrue(first is not second)
+        self.assertTrue(add.func_code in functions._function_sources)
+
+    def test_decorated(self):
+        @jit(double(double, double))
+        def sub(a, b):
+            return a - b
+
+        self.assertEqual(sub(3.0, 1.0), 2.0)
+
+    def test_decompile_fallback(self):
+        namespace = {}
+        exec "def mul(a, b):\n    return a * b\n" in namespace
+        mul = namespace['mul']
+        self.assertTrue(functions._get_ast(mul) is not None)
+        self.assertTrue(mul.func_code in functions._decompiled_asts)
+
+        cmul = jit(double(double, double))(mul)
+        self.assertEqual(cmul(3.0, 2.0), 6.0)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_source_ast.py
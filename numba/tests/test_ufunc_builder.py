@@ -0,0 +1,95 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_ufunc_builder
+
+Test building compiled ufuncs with vectorize().
+'''
+# ______________________________________________________________________
+
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba import error
+from numba.decorators import vectorize
+
+# ______________________________________________________________________
+
+def add(a, b):
+    return a + b
+
+def scaled(a, b):
+    return a * 2.0 + b
+
+def sincos(x):
+    return np.sin(x) + np.cos(x)
+
+# ______________________________________________________________________
+
+class TestUFuncBuilder(unittest.TestCase):
+
+    def test_signatures(self):
+        uadd = vectorize(['f8(f8, f8)', 'i8(i8, i8)'])(add)
+        self.assertTrue(isinstance(uadd, np.ufunc))
+        self.assertEqual(uadd.nin, 2)
+        self.assertEqual(uadd.ntypes, 2)
+
+        a = np.arange(10, dtype=np.double)
+        self.assertTrue(np.all(uadd(a, a) == a + a))
+        self.assertEqual(uadd(a, a).dtype, np.double)
+
+        b = np.arange(10, dtype=np.int64)
+        self.assertTrue(np.all(uadd(b, b) == b + b))
+        self.assertEqual(uadd(b, b).dtype, np.int64)
+
+    def test_minitypes_signature(self):
+        uscaled = vectorize([double(double, double)])(scaled)
+        a = np.arange(10, dtype=np.double)
+        self.assertTrue(np.all(uscaled(a, 1.0) == a * 2.0 + 1.0))
+
+    def test_broadcasting_and_strides(self):
+        uscaled = vectorize(['f8(f8, f8)'])(scaled)
+        a = np.arange(24, dtype=np.double).reshape(2, 3, 4)
+        b = np.arange(4, dtype=np.double)
+        self.assertTrue(np.all(uscaled(a, b) == a * 2.0 + b))
+        self.assertTrue(np.all(uscaled(a[:, ::2, ::-1], b[::-1]) ==
+                               a[:, ::2, ::-1] * 2.0 + b[::-1]))
+
+    def test_out(self):
+        uadd = vectorize(['f8(f8, f8)'])(add)
+        a = np.arange(10, dtype=np.double)
+        out = np.empty_like(a)
+        result = uadd(a, a, out)
+        self.assertTrue(result is out)
+        self.assertTrue(np.all(out == a + a))
+
+    def test_reduce(self):
+        uadd = vectorize(['f8(f8, f8)'], identity=0)(add)
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        self.assertEqual(uadd.reduce(a.ravel()), a.sum())
+        self.assertTrue(np.all(uadd.reduce(a, axis=0) == a.sum(axis=0)))
+        self.assertEqual(uadd.reduce(a[:0].ravel()), 0.0)
+        self.assertTrue(np.all(uadd.accumulate(a.ravel()) == a.cumsum()))
+
+    def test_math(self):
+        usincos = vectorize(['f8(f8)'], opt_level=3)(sincos)
+        x = np.linspace(0, 10, 100)
+        self.assertTrue(np.allclose(usincos(x), np.sin(x) + np.cos(x)))
+
+    def test_errors(self):
+        self.assertRaises(error.NumbaError, vectorize(['f8(f8)']), add)
+        self.assertRaises(error.NumbaError, vectorize(['f8(f8, f8)'],
+                                                      identity=2), add)
+
+    def test_numpy_fallback(self):
+        vadd = vectorize(add)
+        self.assertTrue(isinstance(vadd, np.vectorize))
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_ufunc_builder.py
@@ -0,0 +1,156 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_vectormath
+
+Test the SIMD implementations of math functions, and their use in
+vectorized loops.
+'''
+# ______________________________________________________________________
+
+import math
+import ctypes
+import unittest
+
+import numpy as np
+import llvm.core as lc
+
+from numba import *
+from numba import vectormath
+from numba.minivect import minitypes
+from numba.decorators import jit, context
+
+# ______________________________________________________________________
+
+def build_apply(module, name, count, bits):
+    """
+    Build a function applying a vector function to `count` elements:
+
+        void apply(T *src, T *dst)
+    """
+    vector_func = vectormath.get_vector_function(module, name, count, bits)
+    v = vectormath.VectorBuilder(None, count, bits)
+    ptr_type = lc.Type.pointer(v.element_type)
+    lfunc = module.add_function(
+                lc.Type.function(lc.Type.void(), [ptr_type, ptr_type]),
+                'apply_%s_v%df%d' % (name, count, bits))
+    src, dst = lfunc.args
+
+    b = lc.Builder.new(lfunc.append_basic_block('entry'))
+    indices = [lc.Constant.int(lc.Type.int(32), i) for i in range(count)]
+    vector = lc.Constant.undef(v.type)
+    for index in indices:
+        vector = b.insert_element(vector, b.load(b.gep(src, [index])), index)
+
+    result = b.call(vector_func, [vector])
+    for index in indices:
+        b.store(b.extract_element(result, index), b.gep(dst, [index]))
+    b.ret_void()
+    return lfunc
+
+def apply_vector_function(name, dtype, count, x):
+    "Apply a vector function to the elements of `x`, `count` at a time"
+    dtype = np.dtype(dtype)
+    module = context.llvm_context.create_module(
+                    'test_vectormath_%s_%s_%d' % (name, dtype.name, count))
+    lfunc = build_apply(module, name, count, dtype.itemsize * 8)
+    ee = context.llvm_context.get_execution_engine()
+    prototype = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p)
+    apply = prototype(ee.get_pointer_to_function(lfunc))
+
+    x = np.asarray(x, dtype=dtype)
+    src = np.zeros(len(x) + count, dtype=dtype)
+    src[:len(x)] = x
+    dst = np.empty_like(src)
+    for i in range(0, len(x), count):
+        apply(src[i:].ctypes.data, dst[i:].ctypes.data)
+
+    return dst[:len(x)]
+
+def exp_loop(a, out):
+    for i in range(a.shape[0]):
+        out[i] = math.exp(a[i])
+
+def sin_cos_loop(a, out):
+    for i in range(a.shape[0]):
+        out[i] = math.sin(a[i]) * math.cos(a[i])
+
+# ______________________________________________________________________
+
+class TestVectorMath(unittest.TestCase):
+
+    inputs = {
+        'exp': [np.linspace(-80, 80, 1001), [0.0, -0.0, 1.0, 100.0, -100.0,
+                                             800.0, -800.0]],
+        'log': [np.exp(np.linspace(-80, 80, 1001)), [0.0, 1.0, -1.0, 1e-40,
+                                                     1e-320, 0.5]],
+        'sin': [np.linspace(-100, 100, 1001), [0.0, np.pi, 1e5, 1e10]],
+        'cos': [np.linspace(-100, 100, 1001), [0.0, np.pi, 1e5, 1e10]],
+    }
+
+    special = [np.nan, np.inf, -np.inf]
+
+    def check(self, name, dtype, count):
+        x = np.concatenate(self.inputs[name] + [self.special])
+        x = x.astype(dtype)
+        result = apply_vector_function(name, dtype, count, x)
+        old_settings = np.seterr(all='ignore')
+        try:
+            expected = getattr(np, name)(x)
+        finally:
+            np.seterr(**old_settings)
+
+        nan = np.isnan(expected)
+        self.assertTrue(np.all(np.isnan(result) == nan), (name, dtype))
+        if dtype == np.float32:
+            rtol = atol = 1e-6
+        else:
+            rtol = atol = 1e-15
+        self.assertTrue(np.allclose(result[~nan], expected[~nan],
+                                    rtol=rtol, atol=atol), (name, dtype))
+
+    def test_vector_functions(self):
+        for name in sorted(vectormath.functions):
+            for dtype, count in ((np.float32, 4), (np.float32, 8),
+                                 (np.float64, 2), (np.float64, 4)):
+                self.check(name, dtype, count)
+
+    def test_vectorized_loops(self):
+        for func in (exp_loop, sin_cos_loop):
+            for dtype in (float_, double):
+                cfunc = jit(void(dtype[:], dtype[:]), opt_level=3)(func)
+                a = np.linspace(-10, 10, 103).astype(dtype.get_dtype())
+                out = np.empty_like(a)
+                expected = np.empty_like(a)
+                cfunc(a, out)
+                func(a, expected)
+                self.assertTrue(np.allclose(out, expected, rtol=1e-6))
+
+                # No vector intrinsics of the math functions are left
+                for bb in cfunc.lfunc.basic_blocks:
+                    for instr in bb.instructions:
+                        if isinstance(instr, lc.CallOrInvokeInstruction):
+                            name = getattr(instr.called_function, 'name', '')
+                            self.assertFalse(
+                                vectormath._intrinsic_name.match(name), name)
+
+    def test_vector_math_function(self):
+        for type, names in ((double, ('exp', 'sin')), (float_, ('sinf',))):
+            vector_type = minitypes.VectorType(type, 4)
+            for name in names:
+                vector_name = context.vector_math_function(name, vector_type)
+                self.assertTrue(vector_name.startswith('__numba_vector_'))
+
+        vector_type = minitypes.VectorType(double, 2)
+        self.assertEqual(context.vector_math_function('tan', vector_type),
+                         None)
+        vector_type = minitypes.VectorType(int64, 2)
+        self.assertEqual(context.vector_math_function('sin', vector_type),
+                         None)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_vectormath.py
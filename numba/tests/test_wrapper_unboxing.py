@@ -0,0 +1,109 @@
+#! /usr/bin/env python
+# ______________________________________________________________________
+'''test_wrapper_unboxing
+
+Test argument unboxing and checking in the generated Python wrappers.
+'''
+# ______________________________________________________________________
+
+import unittest
+
+import numpy as np
+
+from numba import *
+from numba.decorators import jit, autojit
+
+# ______________________________________________________________________
+
+def noargs():
+    return 42
+
+def square(x):
+    return x * x
+
+def add(a, b):
+    return a + b
+
+def sum2d(arr):
+    result = 0.0
+    for i in range(arr.shape[0]):
+        for j in range(arr.shape[1]):
+            result += arr[i, j]
+    return result
+
+def scale(arr, factor):
+    for i in range(arr.shape[0]):
+        arr[i] = arr[i] * factor
+
+def row_first(arr, i):
+    row = arr[i, :]
+    return row[0]
+
+# ______________________________________________________________________
+
+class TestWrapperUnboxing(unittest.TestCase):
+
+    def test_calling_conventions(self):
+        self.assertEqual(jit(int_())(noargs)(), 42)
+        self.assertEqual(jit(double(double))(square)(3.0), 9.0)
+        self.assertEqual(jit(double(double))(square)(3), 9.0)
+        self.assertEqual(jit(long_(long_, long_))(add)(1, 2), 3)
+
+    def test_argument_count(self):
+        csquare = jit(double(double))(square)
+        cadd = jit(long_(long_, long_))(add)
+        self.assertRaises(TypeError, csquare)
+        self.assertRaises(TypeError, csquare, 1.0, 2.0)
+        self.assertRaises(TypeError, cadd, 1)
+        self.assertRaises(TypeError, cadd, 1, 2, 3)
+
+    def test_array_arguments(self):
+        csum2d = jit(double(double[:, :]))(sum2d)
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        self.assertEqual(csum2d(a), a.sum())
+        # Subclasses take the slow isinstance() path
+        self.assertEqual(csum2d(np.matrix(a)), a.sum())
+
+        cscale = jit(void(double[:], double))(scale)
+        b = np.arange(10, dtype=np.double)
+        cscale(b, 2.0)
+        self.assertTrue(np.all(b == np.arange(10) * 2.0))
+
+    def test_array_type_errors(self):
+        csum2d = jit(double(double[:, :]))(sum2d)
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        self.assertRaises(TypeError, csum2d, a.ravel())
+        self.assertRaises(TypeError, csum2d, a.astype(np.float32))
+        self.assertRaises(TypeError, csum2d, a.astype(np.int64))
+        self.assertRaises(TypeError, csum2d, a.tolist())
+        self.assertRaises(TypeError, csum2d,
+                          a.astype(a.dtype.newbyteorder()))
+
+    def test_array_dtypes(self):
+        # Bool arrays are int8 arrays
+        csum2d = autojit(sum2d)
+        a = np.arange(12).reshape(3, 4) % 3 == 0
+        self.assertEqual(csum2d(a), a.sum())
+
+        csum2d = jit(double(long_[:, :]))(sum2d)
+        a = np.arange(12, dtype=np.longlong).reshape(3, 4)
+        self.assertEqual(csum2d(a), a.sum())
+
+    def test_native_errors(self):
+        # Exceptions set by native code are raised instead of returning
+        # the dummy error value
+        a = np.arange(12, dtype=np.double).reshape(3, 4)
+        for nogil in (False, True):
+            crow_first = jit(double(double[:, :], Py_ssize_t),
+                             nopython=True, nogil=nogil)(row_first)
+            self.assertEqual(crow_first(a, 1), 4.0)
+            self.assertRaises(IndexError, crow_first, a, 3)
+            self.assertEqual(crow_first(a, -1), 8.0)
+
+# ______________________________________________________________________
+
+if __name__ == "__main__":
+    unittest.main()
+
+# ______________________________________________________________________
+# End of test_wrapper_unboxing.py
@@ -87,10 +87,10 @@ import numba
 from numba import *
 from numba import error
 from .minivect import minierror, minitypes
-from . import translate, utils, _numba_types as numba_types
+from . import utils, _numba_types as numba_types
 from .symtab import Variable
 from . import visitors, nodes, error, functions
-from numba import stdio_util
+from numba import stdio_util, array_expressions
 from numba._numba_types import is_obj, promote_closest
 
 import llvm.core
@@ -377,6 +377,14 @@ class ResolveCoercions(visitors.NumbaTransformer):
         node_type = node.node.type
         dst_type = node.dst_type
 
+        if (node_type.is_array and dst_type.is_array and
+                node_type.dtype == dst_type.dtype and
+                node_type.ndim == dst_type.ndim):
+            # Array types differing only in contiguity share their
+            # representation, this coercion needs no object operations
+            self.generic_visit(node)
+            return node
+
         if self.nopython and is_obj(node_type):
             raise error.NumbaError(node, "Cannot coerce to or from object in "
                                          "nopython context")
@@ -482,9 +490,64 @@ class ResolveCoercions(visitors.NumbaTransformer):
 
         return new_node
 
+def find_local_views(tree):
+    """
+    Find the array views that don't escape the function: views that are
+    only indexed, sliced into local views, used for their attributes or
+    written to and read by array expressions with a destination, directly
+    or through local variables that are used in no other way. Returns a set
+    of the ids of these subscript nodes.
+    """
+    # ids of the nodes used in a way that can't make them escape
+    local_uses = set()
+    views = []
+    assigned_views = []
+    loads = []
+    for node in ast.walk(tree):
+        if array_expressions.is_array_view(node):
+            views.append(node)
+        elif isinstance(node, ast.Subscript) and node.value.type.is_array:
+            local_uses.add(id(node.value))
+        elif isinstance(node, nodes.ArrayAttributeNode):
+            local_uses.add(id(node.array))
+        elif (isinstance(node, nodes.ArrayExpressionNode) and
+                  node.out is not None):
+            # Without a destination, the operands are passed to NumPy to
+            # allocate the result
+            local_uses.add(id(node.out))
+            local_uses.update(id(operand) for operand in node.operands)
+        elif (isinstance(node, ast.Assign) and len(node.targets) == 1 and
+                  isinstance(node.targets[0], ast.Name)):
+            value = node.value
+            while (isinstance(value, nodes.CoercionNode) and
+                       value.type.is_array):
+                value = value.node
+            if array_expressions.is_array_view(value):
+                assigned_views.append((node.targets[0].id, value))
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            loads.append(node)
+
+    # A view of a view is only local if the latter is (ndarrays created
+    # for escaping views reference the array they slice)
+    while True:
+        escaping_names = set(name.id for name in loads
+                                         if id(name) not in local_uses)
+        result = set(id(view) for view in views if id(view) in local_uses)
+        result.update(id(view) for name, view in assigned_views
+                                   if name not in escaping_names)
+
+        sliced = set(id(view.value) for view in views if id(view) in result)
+        if sliced <= local_uses:
+            return result
+        local_uses.update(sliced)
+
 class LateSpecializer(ResolveCoercions, LateBuiltinResolverMixin):
 
+    # ids of the array views that don't escape, see find_local_views()
+    local_views = frozenset()
+
     def visit_FunctionDef(self, node):
+        self.local_views = find_local_views(node)
         self.generic_visit(node)
 
         ret_type = self.func_signature.return_type
@@ -592,6 +655,12 @@ class LateSpecializer(ResolveCoercions, LateBuiltinResolverMixin):
             node = nodes.ObjectTempNode(node)
         return node
 
+    def visit_ArrayNewNode(self, node):
+        # Allocation produces a new reference, which is also allowed in
+        # nopython context
+        self.generic_visit(node)
+        return nodes.ObjectTempNode(node)
+
     def visit_ObjectCallNode(self, node):
         # self.generic_visit(node)
         assert node.function
@@ -648,6 +717,12 @@ class LateSpecializer(ResolveCoercions, LateBuiltinResolverMixin):
             if node.value.is_read_only and isinstance(node.ctx, ast.Store):
                 raise error.NumbaError("Attempt to load read-only attribute")
 
+        if (array_expressions.is_array_view(node) and
+                isinstance(node.ctx, ast.Load)):
+            view = self._array_view(node)
+            if view is not None:
+                return view
+
         # logging.debug(ast.dump(node))
         self.generic_visit(node)
 
@@ -673,6 +748,62 @@ class LateSpecializer(ResolveCoercions, LateBuiltinResolverMixin):
 
         return node
 
+    def _array_view(self, node):
+        """
+        Build an ArraySliceNode for basic slicing of an array with integers,
+        slices and new axes (see ast_type_inference._unellipsify). Returns
+        None for other subscripts, which are handled by the array object.
+        """
+        def bound(value):
+            if value is None:
+                return None
+            if isinstance(value, (int, long)):
+                return nodes.ConstNode(value, numba_types.intp)
+            return self.visit(nodes.CoercionNode(value, numba_types.intp))
+
+        def is_bound(value):
+            if isinstance(value, ast.AST):
+                return value.type.is_int
+            return value is None or isinstance(value, (int, long))
+
+        dims = []
+        for dim in node.slice.dims:
+            if isinstance(dim, ast.Index):
+                dim = dim.value
+
+            if (dim.type.is_newaxis or dim.type.is_none or
+                    (isinstance(dim, nodes.ConstNode) and dim.pyval is None)):
+                dims.append(nodes.SliceDimNode('newaxis'))
+                continue
+            elif dim.type.is_int:
+                dims.append(nodes.SliceDimNode('index', index=bound(dim)))
+                continue
+
+            if (isinstance(dim, nodes.ObjectInjectNode) and
+                    isinstance(dim.object, slice)):
+                bounds = [dim.object.start, dim.object.stop, dim.object.step]
+            elif isinstance(dim, ast.Slice):
+                bounds = [dim.lower, dim.upper, dim.step]
+            else:
+                return None
+
+            if not all(is_bound(value) for value in bounds):
+                return None
+            if isinstance(bounds[2], (int, long)) and bounds[2] == 0:
+                raise error.NumbaError(node, "slice step cannot be zero")
+
+            lower, upper, step = map(bound, bounds)
+            dims.append(nodes.SliceDimNode('slice', lower=lower, upper=upper,
+                                           step=step))
+
+        view = nodes.ArraySliceNode(node.type, self.visit(node.value), dims,
+                                    local=id(node) in self.local_views)
+        if view.local:
+            return view
+
+        # The view escapes, create an ndarray
+        return nodes.ObjectTempNode(view)
+
     def visit_ExtSlice(self, node):
         if node.type.is_object:
             return self.visit(ast.Tuple(elts=node.dims, ctx=ast.Load()))
@@ -0,0 +1,554 @@
+"""
+Build NumPy ufuncs from scalar kernels.
+
+    @vectorize(['f8(f8, f8)', 'i8(i8, i8)'], identity=0)
+    def add(a, b):
+        return a + b
+
+Each signature compiles the kernel through the AST pipeline (in nopython
+mode, since NumPy runs the loops without the GIL), and generates an inner
+loop for it:
+
+    void loop(char **args, npy_intp *dimensions, npy_intp *steps, void *data)
+
+which calls the kernel for every element of the (strided) operands. The
+kernel is inlined into the loop. The loops are registered as a single ufunc
+through PyUFunc_FromFuncAndData, which gives broadcasting, type dispatch,
+out= arguments and (for binary functions) reductions.
+
+Generalized ufuncs operate on core dimensions:
+
+    @guvectorize(['void(f8[:], f8[:], f8[:])'], '(n),(n)->()')
+    def dot(a, b, out):
+        result = 0.0
+        for i in range(a.shape[0]):
+            result += a[i] * b[i]
+        out[0] = result
+
+NumPy broadcasts the outer dimensions and collapses them into the single
+dimension of the inner loop, which passes the core operands of each
+element to the kernel as arrays. These are registered through
+PyUFunc_FromFuncAndDataAndSignature. NumPy doesn't make core operands
+contiguous, so kernels taking contiguous arrays (e.g. f8[::1]) are also
+compiled for strided arrays, which the loop calls for other operands.
+"""
+
+import ctypes
+
+import llvm.core as lc
+
+from numba import error, llvm_types, multiarray_api, array_expressions
+from numba.minivect import minitypes
+
+# Values of the identity argument of PyUFunc_FromFuncAndData
+PyUFunc_One = 1
+PyUFunc_Zero = 0
+PyUFunc_None = -1
+
+_identities = {
+    None: PyUFunc_None,
+    0: PyUFunc_Zero,
+    1: PyUFunc_One,
+}
+
+# Indices into the ufunc C API table
+_PyUFunc_FromFuncAndData = 1
+_PyUFunc_FromFuncAndDataAndSignature = 31
+
+def ufunc_api():
+    "The ufunc C API table (numpy.core.umath._UFUNC_API) as a void **"
+    from numpy.core import umath
+
+    pointer = multiarray_api.get_api_pointer(umath._UFUNC_API)
+    return ctypes.cast(pointer, ctypes.POINTER(ctypes.c_void_p))
+
+# Everything a ufunc points to (loops, type arrays, names, dtypes) must stay
+# alive as long as the ufunc. Ufuncs can't be garbage collected reliably
+# anyway, since NumPy may cache references to them.
+_keepalive = []
+
+def dtype_num(type):
+    return minitypes.map_minitype_to_dtype(type).num
+
+def build_outer_loop(kernel, name, noperands, setup):
+    """
+    Build an inner ufunc loop in the module of the LLVM function `kernel`:
+
+        void loop(char **args, npy_intp *dimensions, npy_intp *steps,
+                  void *data)
+
+    iterating over dimensions[0] elements with the strides in steps.
+
+    setup(builder, dimensions, steps) is called in the entry block, and
+    returns a function call_kernel(builder, pointers) which emits the kernel
+    call for one element given the i8 * operand pointers of that element.
+    It returns a list of the call instructions, which are inlined.
+    """
+    _intp = llvm_types._intp
+    loop_type = lc.Type.function(lc.Type.void(), [llvm_types._void_star_star,
+                                                  llvm_types._intp_star,
+                                                  llvm_types._intp_star,
+                                                  llvm_types._void_star])
+    loop = kernel.module.add_function(loop_type, name)
+    args, dimensions, steps, data = loop.args
+
+    entry = loop.append_basic_block('entry')
+    bb_cond = loop.append_basic_block('loop.cond')
+    bb_body = loop.append_basic_block('loop.body')
+    bb_exit = loop.append_basic_block('loop.exit')
+
+    b = lc.Builder.new(entry)
+    n = b.load(dimensions)
+    data_pointers = []
+    strides = []
+    for i in range(noperands):
+        index = [llvm_types.constant_int(i)]
+        data_pointers.append(b.load(b.gep(args, index)))
+        strides.append(b.load(b.gep(steps, index)))
+
+    call_kernel = setup(b, dimensions, steps)
+
+    counter = b.alloca(_intp, 'i')
+    b.store(lc.Constant.int(_intp, 0), counter)
+    b.branch(bb_cond)
+
+    b.position_at_end(bb_cond)
+    i = b.load(counter)
+    b.cbranch(b.icmp(lc.ICMP_SLT, i, n), bb_body, bb_exit)
+
+    b.position_at_end(bb_body)
+    pointers = [b.gep(data_pointer, [b.mul(i, stride)])
+                    for data_pointer, stride in zip(data_pointers, strides)]
+    calls = call_kernel(b, pointers)
+    b.store(b.add(i, lc.Constant.int(_intp, 1)), counter)
+    b.branch(bb_cond)
+
+    b.position_at_end(bb_exit)
+    b.ret_void()
+
+    for call in calls:
+        lc.inline_function(call)
+    loop.verify()
+    return loop
+
+def build_loop(context, kernel, signature, name):
+    """
+    Build an inner ufunc loop calling the LLVM function `kernel` with
+    the given (scalar) signature for every element.
+    """
+    operand_types = list(signature.args) + [signature.return_type]
+    by_ref = signature.struct_by_reference
+
+    def setup(b, dimensions, steps):
+        def call_kernel(b, pointers):
+            operands = [b.bitcast(pointer,
+                                  lc.Type.pointer(type.to_llvm(context)))
+                            for type, pointer in zip(operand_types, pointers)]
+
+            # Structs and complex numbers may be passed by reference
+            kernel_args = []
+            for type, pointer in zip(signature.args, operands):
+                if by_ref and minitypes.pass_by_ref(type):
+                    kernel_args.append(pointer)
+                else:
+                    kernel_args.append(b.load(pointer))
+
+            out = operands[-1]
+            if by_ref and minitypes.pass_by_ref(signature.return_type):
+                return [b.call(kernel, kernel_args + [out])]
+
+            call = b.call(kernel, kernel_args)
+            b.store(call, out)
+            return [call]
+
+        return call_kernel
+
+    return build_outer_loop(kernel, name, len(operand_types), setup)
+
+def parse_layout(layout):
+    """
+    Parse a gufunc layout such as '(m,n),(n)->(m)' into lists of core
+    dimension names for the inputs and outputs:
+
+        >>> parse_layout('(m,n),(n)->(m)')
+        ([['m', 'n'], ['n']], [['m']])
+    """
+    def parse_args(string):
+        string = string.replace(' ', '')
+        if not (string.startswith('(') and string.endswith(')')):
+            raise error.NumbaError("Invalid gufunc layout: %r" % layout)
+
+        args = []
+        for arg in string[1:-1].split('),('):
+            dims = arg and arg.split(',') or []
+            for dim in dims:
+                if not dim.isalnum() or dim.isdigit():
+                    raise error.NumbaError("Invalid core dimension %r in "
+                                           "gufunc layout %r" % (dim, layout))
+            args.append(dims)
+
+        return args
+
+    if layout.count('->') != 1:
+        raise error.NumbaError("Invalid gufunc layout: %r" % layout)
+
+    inputs, outputs = layout.split('->')
+    return parse_args(inputs), parse_args(outputs)
+
+def strided_signature(signature):
+    "The signature with the contiguous array types replaced by strided ones"
+    args = [minitypes.ArrayType(type.dtype, type.ndim) if type.is_array
+                else type for type in signature.args]
+    return minitypes.FunctionType(return_type=signature.return_type,
+                                  args=args)
+
+def build_gufunc_loop(kernel, signature, core_dims, name,
+                      strided_kernel=None):
+    """
+    Build an inner gufunc loop calling the LLVM function `kernel` for every
+    element of the outer (broadcast) loop. Core dimensions are passed as
+    arrays, which are array structs on the stack describing the core
+    operand of the current element (a 1-element array for operands without
+    core dimensions). Scalar kernel arguments are loaded directly.
+
+    If the signature has contiguous array types, `strided_kernel` is the
+    kernel compiled for strided_signature(signature). It is called instead
+    if the core operands are not contiguous (which doesn't change within
+    the loop).
+    """
+    import numpy
+
+    array_ltype = llvm_types._numpy_struct
+    fields = llvm_types._numpy_array_field_ofs
+    zero = llvm_types.constant_int(0)
+    nargs = len(signature.args)
+
+    # Dimension names index dimensions[1:], in order of first appearance
+    dim_names = []
+    for dims in core_dims:
+        for dim in dims:
+            if dim not in dim_names:
+                dim_names.append(dim)
+
+    def field(b, struct, name):
+        return b.gep(struct, [zero, llvm_types.constant_int(fields[name])])
+
+    def contiguity(b, type, shape, strides, ndim):
+        """
+        Whether a core operand with the given strides is C contiguous, F
+        contiguous and matches the layout of its type (i1 values)
+        """
+        extents = [b.load(b.gep(shape, [llvm_types.constant_int(i)]))
+                       for i in range(ndim)]
+        steps = [b.load(b.gep(strides, [llvm_types.constant_int(i)]))
+                     for i in range(ndim)]
+        one = lc.Constant.int(llvm_types._intp, 1)
+
+        def contiguous(dims):
+            result = lc.Constant.int(lc.Type.int(1), 1)
+            expected = lc.Constant.int(llvm_types._intp,
+                                       type.dtype.itemsize)
+            for i in dims:
+                result = b.and_(result, b.or_(
+                    b.icmp(lc.ICMP_EQ, extents[i], one),
+                    b.icmp(lc.ICMP_EQ, steps[i], expected)))
+                expected = b.mul(expected, extents[i])
+            return result
+
+        c_contig = contiguous(reversed(range(ndim)))
+        f_contig = contiguous(range(ndim))
+        if type.is_c_contig:
+            matches = c_contig
+        elif type.is_f_contig:
+            matches = f_contig
+        elif type.inner_contig:
+            matches = contiguous([ndim - 1])
+        else:
+            matches = lc.Constant.int(lc.Type.int(1), 1)
+
+        return c_contig, f_contig, matches
+
+    def flag(b, condition, value):
+        return b.select(condition, llvm_types.constant_int(value),
+                        llvm_types.constant_int(0))
+
+    def setup(b, dimensions, steps):
+        structs = []
+        step_index = nargs
+        # Whether the layouts of all core operands match the signature
+        layouts_match = lc.Constant.int(lc.Type.int(1), 1)
+        for type, dims in zip(signature.args, core_dims):
+            if not type.is_array:
+                structs.append(None)
+                continue
+
+            # Core shape and strides, loop invariant
+            ndim = max(len(dims), 1)
+            shape = b.alloca_array(llvm_types._intp,
+                                   llvm_types.constant_int(ndim))
+            if dims:
+                for i, dim in enumerate(dims):
+                    index = llvm_types.constant_int(dim_names.index(dim) + 1)
+                    extent = b.load(b.gep(dimensions, [index]))
+                    b.store(extent, b.gep(shape, [llvm_types.constant_int(i)]))
+
+                strides = b.gep(steps, [llvm_types.constant_int(step_index)])
+                step_index += len(dims)
+            else:
+                b.store(lc.Constant.int(llvm_types._intp, 1), shape)
+                strides = b.alloca(llvm_types._intp)
+                b.store(lc.Constant.int(llvm_types._intp, 0), strides)
+
+            # The descriptor of the dtype, and no base
+            dtype = type.dtype.get_dtype()
+            _keepalive.append(dtype)
+            descr = lc.Constant.inttoptr(
+                lc.Constant.int(llvm_types._intp, id(dtype)),
+                llvm_types._void_star)
+
+            c_contig, f_contig, matches = contiguity(b, type, shape,
+                                                     strides, ndim)
+            layouts_match = b.and_(layouts_match, matches)
+            flags = b.or_(
+                flag(b, c_contig, array_expressions.NPY_C_CONTIGUOUS),
+                flag(b, f_contig, array_expressions.NPY_F_CONTIGUOUS))
+
+            struct = b.alloca(array_ltype)
+            b.store(lc.Constant.null(array_ltype), struct)
+            # The struct is never deallocated, reference counting it in the
+            # kernel must not drop its count to zero (like the local views
+            # of ast_translate.build_local_view)
+            head = [zero, llvm_types.constant_int(llvm_types._head_len - 2)]
+            b.store(lc.Constant.int(llvm_types._intp, 1 << 30),
+                    b.gep(struct, head))
+            head[1] = llvm_types.constant_int(llvm_types._head_len - 1)
+            ob_type = b.gep(struct, head)
+            b.store(lc.Constant.inttoptr(
+                        lc.Constant.int(llvm_types._intp, id(numpy.ndarray)),
+                        ob_type.type.pointee), ob_type)
+
+            b.store(llvm_types.constant_int(ndim), field(b, struct, 'ndim'))
+            b.store(shape, field(b, struct, 'shape'))
+            b.store(strides, field(b, struct, 'strides'))
+            b.store(descr, field(b, struct, 'descr'))
+            b.store(flags, field(b, struct, 'flags'))
+            structs.append(struct)
+
+        def call_kernel(b, pointers):
+            kernel_args = []
+            for type, struct, pointer, larg in zip(signature.args, structs,
+                                                   pointers, kernel.args):
+                if struct is None:
+                    pointer = b.bitcast(pointer, lc.Type.pointer(larg.type))
+                    kernel_args.append(b.load(pointer))
+                else:
+                    b.store(pointer, field(b, struct, 'data'))
+                    kernel_args.append(b.bitcast(struct, larg.type))
+
+            if strided_kernel is None:
+                return [b.call(kernel, kernel_args)]
+
+            loop = b.basic_block.function
+            bb_contig = loop.append_basic_block('kernel.contiguous')
+            bb_strided = loop.append_basic_block('kernel.strided')
+            bb_done = loop.append_basic_block('kernel.done')
+            b.cbranch(layouts_match, bb_contig, bb_strided)
+
+            b.position_at_end(bb_contig)
+            calls = [b.call(kernel, kernel_args)]
+            b.branch(bb_done)
+
+            b.position_at_end(bb_strided)
+            strided = kernel.module.get_or_insert_function(
+                        strided_kernel.type.pointee, strided_kernel.name)
+            calls.append(b.call(strided, kernel_args))
+            b.branch(bb_done)
+
+            b.position_at_end(bb_done)
+            return calls
+
+        return call_kernel
+
+    return build_outer_loop(kernel, name, nargs, setup)
+
+
+class UFuncBuilder(object):
+    """
+    Compile a scalar Python function for a number of signatures and build
+    a ufunc from the resulting loops.
+
+        py_func:    the scalar kernel
+        identity:   None, 0 or 1, the identity for reductions of
+                    empty arrays
+        kws:        options for jit(), e.g. opt_level
+    """
+
+    nout = 1
+
+    def __init__(self, py_func, identity=None, **kws):
+        if identity not in _identities:
+            raise error.NumbaError("Identity must be one of None, 0 or 1")
+
+        self.py_func = py_func
+        self.identity = identity
+        self.kws = kws
+        self.nin = py_func.func_code.co_argcount
+        self.signatures = []
+        self.loops = []
+
+    def check_signature(self, signature):
+        if len(signature.args) != self.nin:
+            raise error.NumbaError(
+                "Signature %s does not match the number of arguments of %s" %
+                                        (signature, self.py_func.__name__))
+
+    def compile(self, signature):
+        """
+        Compile the kernel for a signature, returns the signature of the
+        compiled function (the return type may be promoted) and the LLVM
+        function.
+        """
+        from numba import decorators
+
+        self.check_signature(signature)
+
+        func = self.py_func
+        if not hasattr(func, 'live_objects'):
+            func.live_objects = []
+        func._is_numba_func = True
+
+        result = decorators.function_cache.compile_function(
+                func, list(signature.args), restype=signature.return_type,
+                nopython=True, ctypes=False, **self.kws)
+        func_signature, lfunc, wrapper = result
+        return func_signature, lfunc
+
+    def build_loop(self, func_signature, lfunc, name):
+        from numba import decorators
+        return build_loop(decorators.context, lfunc, func_signature, name)
+
+    def add(self, signature):
+        "Compile the kernel and build the inner loop for a signature"
+        from numba import ast_translate
+
+        func_signature, lfunc = self.compile(signature)
+        name = '__numba_ufunc_loop_%s' % lfunc.name
+        loop = self.build_loop(func_signature, lfunc, name)
+
+        llvm_context = ast_translate.LLVMContextManager()
+        llvm_context.optimize(loop, self.kws.get('opt_level'))
+        ee = llvm_context.get_execution_engine()
+
+        self.signatures.append(func_signature)
+        self.loops.append(ee.get_pointer_to_function(loop))
+
+    def operand_types(self, signature):
+        "The element types of the operands of a loop"
+        return list(signature.args) + [signature.return_type]
+
+    def type_codes(self):
+        "The operand type numbers of all loops"
+        codes = []
+        for signature in self.signatures:
+            codes.extend(dtype_num(type)
+                             for type in self.operand_types(signature))
+        return codes
+
+    # PyObject *PyUFunc_FromFuncAndData(PyUFuncGenericFunction *func,
+    #     void **data, char *types, int ntypes, int nin, int nout,
+    #     int identity, char *name, char *doc, int check_return)
+    api_index = _PyUFunc_FromFuncAndData
+    api_argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+                    ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                    ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+
+    def extra_api_args(self):
+        return ()
+
+    def build_ufunc(self):
+        "Create the ufunc from all loops added"
+        ntypes = len(self.loops)
+        nargs = self.nin + self.nout
+        funcs = (ctypes.c_void_p * ntypes)(*self.loops)
+        data = (ctypes.c_void_p * ntypes)()
+        types = (ctypes.c_char * (ntypes * nargs))(
+                                        *map(chr, self.type_codes()))
+        name = ctypes.c_char_p(self.py_func.__name__)
+        doc = ctypes.c_char_p(self.py_func.__doc__ or '')
+        extra_args = self.extra_api_args()
+
+        prototype = ctypes.PYFUNCTYPE(ctypes.py_object, *self.api_argtypes)
+        create_ufunc = prototype(ufunc_api()[self.api_index])
+        ufunc = create_ufunc(ctypes.addressof(funcs), ctypes.addressof(data),
+                             ctypes.addressof(types), ntypes, self.nin,
+                             self.nout, _identities[self.identity],
+                             name, doc, 0, *extra_args)
+
+        _keepalive.append((funcs, data, types, name, doc, extra_args))
+        return ufunc
+
+
+class GUFuncBuilder(UFuncBuilder):
+    """
+    Compile a Python function operating on core dimensions for a number of
+    signatures and build a generalized ufunc from the resulting loops.
+
+        py_func:    the kernel, taking all inputs and outputs as arguments
+        layout:     the gufunc signature, e.g. '(m,n),(n)->(m)'
+
+    Operands with core dimensions are passed to the kernel as arrays,
+    outputs without core dimensions as 1-element arrays.
+    """
+
+    def __init__(self, py_func, layout, identity=None, **kws):
+        super(GUFuncBuilder, self).__init__(py_func, identity, **kws)
+        inputs, outputs = parse_layout(layout)
+        self.layout = layout.replace(' ', '')
+        self.core_dims = inputs + outputs
+        self.nin = len(inputs)
+        self.nout = len(outputs)
+
+        if py_func.func_code.co_argcount != self.nin + self.nout:
+            raise error.NumbaError(
+                "Layout %r does not match the number of arguments of %s" %
+                                        (layout, py_func.__name__))
+
+    def check_signature(self, signature):
+        if len(signature.args) != self.nin + self.nout:
+            raise error.NumbaError(
+                "Signature %s does not match layout %r" % (signature,
+                                                           self.layout))
+        if not signature.return_type.is_void:
+            raise error.NumbaError("gufunc kernels must return void, "
+                                   "results are written to the outputs")
+
+        for i, (type, dims) in enumerate(zip(signature.args, self.core_dims)):
+            if type.is_array:
+                if type.ndim != max(len(dims), 1):
+                    raise error.NumbaError(
+                        "Argument %d of %s does not match core dimensions "
+                        "(%s)" % (i + 1, signature, ",".join(dims)))
+            elif dims or i >= self.nin:
+                raise error.NumbaError(
+                    "Argument %d of %s must be an array" % (i + 1, signature))
+
+    def build_loop(self, func_signature, lfunc, name):
+        strided_lfunc = None
+        strided = strided_signature(func_signature)
+        if strided != func_signature:
+            strided, strided_lfunc = self.compile(strided)
+
+        return build_gufunc_loop(lfunc, func_signature, self.core_dims, name,
+                                 strided_lfunc)
+
+    def operand_types(self, signature):
+        return [type.dtype if type.is_array else type
+                    for type in signature.args]
+
+    # PyUFunc_FromFuncAndDataAndSignature takes an additional
+    # char *signature
+    api_index = _PyUFunc_FromFuncAndDataAndSignature
+    api_argtypes = UFuncBuilder.api_argtypes + [ctypes.c_char_p]
+
+    def extra_api_args(self):
+        return (ctypes.c_char_p(self.layout),)
@@ -2,7 +2,7 @@ import opcode
 
 from .minivect.complex_support import Complex64, Complex128, Complex256
 from .minivect import miniast, minitypes
-from . import _numba_types
+from . import _numba_types, passes
 
 def itercode(code):
     """Return a generator of byte-offset, opcode, and argument
@@ -55,6 +55,38 @@ class NumbaContext(miniast.LLVMContext):
     def is_object(self, type):
         return super(NumbaContext, self).is_object() or type.is_array
 
+    @property
+    def opt_level(self):
+        return passes.get_default_opt_level()
+
+    def llvm_passes(self):
+        "Run the same function passes as numba functions on top of the builder"
+        return passes.llvm_passes(passes.function_passes, self.opt_level)
+
+    def relax_floating_point(self, lfunc):
+        from numba import fastmath
+        fastmath.relax(lfunc)
+
+    def vector_math_function(self, name, vector_type):
+        "The SIMD implementations of numba.vectormath, e.g. for sin or sinf"
+        from numba import vectormath
+
+        element_type = vector_type.element_type
+        if not element_type.is_float:
+            return None
+        bits = element_type.itemsize * 8
+        if bits == 32 and name.endswith('f'):
+            name = name[:-1]
+        if name not in vectormath.functions:
+            return None
+
+        count = vector_type.vector_size
+        if self.llvm_module is not None:
+            # Define it, calls are resolved in the module of the kernel
+            vectormath.get_vector_function(self.llvm_module, name, count,
+                                           bits)
+        return vectormath.vector_function_name(name, count, bits)
+
 def get_minivect_context():
     return NumbaContext()
 
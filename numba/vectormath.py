@@ -0,0 +1,331 @@
+"""
+SIMD implementations of math functions.
+
+At -O3 the loop and basic block vectorizers (see numba.passes) vectorize
+calls to math intrinsics such as llvm.exp.f64 into calls to vector
+intrinsics such as llvm.exp.v2f64, which LLVM lowers into a call to the
+scalar libm function for every element. After optimization,
+replace_vector_intrinsics() replaces the calls to the vector intrinsics of
+exp, log, sin and cos by the SIMD implementations below and inlines them.
+
+The implementations are the polynomial approximations of Cephes (as used by
+sse_mathfun), for vectors of float32 and float64 of any size. If any
+element is outside the domain where they are accurate (NaN, infinities,
+results that overflow or are denormal, sin/cos arguments too large for the
+argument reduction), the scalar libm function computes the whole vector.
+"""
+
+import re
+
+import llvm
+import llvm.core as lc
+
+# Vector intrinsics that have a SIMD implementation
+_intrinsic_name = re.compile(r'^llvm\.(exp|log|sin|cos)\.v(\d+)f(32|64)$')
+
+LOG2E = 1.4426950408889634073599
+SQRTH = 0.70710678118654752440
+FOPI = 1.27323954473516268615
+
+class VectorBuilder(object):
+    "Build code operating on vectors of `count` floats of `bits` bits"
+
+    def __init__(self, builder, count, bits):
+        self.builder = builder
+        self.count = count
+        self.bits = bits
+        if bits == 32:
+            self.element_type = lc.Type.float()
+        else:
+            self.element_type = lc.Type.double()
+
+        self.type = lc.Type.vector(self.element_type, count)
+        # Integers of the size of the elements, for bit manipulation
+        self.bits_type = lc.Type.vector(lc.Type.int(bits), count)
+        self.int_type = lc.Type.vector(lc.Type.int(32), count)
+
+    def const(self, value):
+        return lc.Constant.vector(
+            [lc.Constant.real(self.element_type, value)] * self.count)
+
+    def iconst(self, value, bits=32):
+        return lc.Constant.vector(
+            [lc.Constant.int(lc.Type.int(bits), value)] * self.count)
+
+    def polevl(self, x, coefficients):
+        "Evaluate a polynomial (highest degree first) with Horner's method"
+        b = self.builder
+        result = self.const(coefficients[0])
+        for coefficient in coefficients[1:]:
+            result = b.fadd(b.fmul(result, x), self.const(coefficient))
+        return result
+
+    def floor(self, x):
+        b = self.builder
+        truncated = b.sitofp(b.fptosi(x, self.int_type), self.type)
+        return b.select(b.fcmp(lc.FCMP_OGT, truncated, x),
+                        b.fsub(truncated, self.const(1.0)), truncated)
+
+    def ldexp(self, x, n):
+        "x * 2 ** n for an integer vector n, the result must be normal"
+        b = self.builder
+        if self.bits == 32:
+            exponent = b.shl(b.add(n, self.iconst(127)), self.iconst(23))
+        else:
+            n = b.sext(n, self.bits_type)
+            exponent = b.shl(b.add(n, self.iconst(1023, 64)),
+                             self.iconst(52, 64))
+        return b.fmul(x, b.bitcast(exponent, self.type))
+
+    def in_range(self, x, lower, upper):
+        "lower <= x <= upper (false for NaN)"
+        b = self.builder
+        return b.and_(b.fcmp(lc.FCMP_OGE, x, self.const(lower)),
+                      b.fcmp(lc.FCMP_OLE, x, self.const(upper)))
+
+#
+### Approximations, given the domain where they are valid
+#
+
+def exp_domain(v, x):
+    # Keep the result and 2 ** n normal
+    if v.bits == 32:
+        return v.in_range(x, -87.0, 87.0)
+    return v.in_range(x, -708.0, 708.0)
+
+def exp(v, x):
+    b = v.builder
+    fx = v.floor(b.fadd(b.fmul(x, v.const(LOG2E)), v.const(0.5)))
+    if v.bits == 32:
+        x = b.fsub(x, b.fmul(fx, v.const(0.693359375)))
+        x = b.fsub(x, b.fmul(fx, v.const(-2.12194440e-4)))
+        z = b.fmul(x, x)
+        y = v.polevl(x, [1.9875691500E-4, 1.3981999507E-3, 8.3334519073E-3,
+                         4.1665795894E-2, 1.6666665459E-1, 5.0000001201E-1])
+        y = b.fadd(b.fadd(b.fmul(y, z), x), v.const(1.0))
+    else:
+        x = b.fsub(x, b.fmul(fx, v.const(6.93145751953125E-1)))
+        x = b.fsub(x, b.fmul(fx, v.const(1.42860682030941723212E-6)))
+        xx = b.fmul(x, x)
+        px = b.fmul(x, v.polevl(xx, [1.26177193074810590878E-4,
+                                     3.02994407707441961300E-2,
+                                     9.99999999999999999910E-1]))
+        qx = v.polevl(xx, [3.00198505138664455042E-6,
+                           2.52448340349684104192E-3,
+                           2.27265548208155028766E-1,
+                           2.00000000000000000009E0])
+        y = b.fdiv(px, b.fsub(qx, px))
+        y = b.fadd(v.const(1.0), b.fmul(v.const(2.0), y))
+
+    return v.ldexp(y, b.fptosi(fx, v.int_type))
+
+def log_domain(v, x):
+    # Positive normal numbers
+    if v.bits == 32:
+        return v.in_range(x, 1.17549435e-38, 3.40282347e+38)
+    return v.in_range(x, 2.2250738585072014e-308, 1.7976931348623157e+308)
+
+def log(v, x):
+    b = v.builder
+
+    # x = m * 2 ** e, 0.5 <= m < 1
+    bits = b.bitcast(x, v.bits_type)
+    if v.bits == 32:
+        e = b.sub(b.lshr(bits, v.iconst(23)), v.iconst(126))
+        m = b.or_(b.and_(bits, v.iconst(0x007fffff)), v.iconst(0x3f000000))
+    else:
+        e = b.sub(b.lshr(bits, v.iconst(52, 64)), v.iconst(1022, 64))
+        e = b.trunc(e, v.int_type)
+        m = b.or_(b.and_(bits, v.iconst(0x000fffffffffffff, 64)),
+                  v.iconst(0x3fe0000000000000, 64))
+    e = b.sitofp(e, v.type)
+    m = b.bitcast(m, v.type)
+
+    # if m < sqrt(1/2): e -= 1; x = 2 * m - 1 else: x = m - 1
+    small = b.fcmp(lc.FCMP_OLT, m, v.const(SQRTH))
+    e = b.fsub(e, b.select(small, v.const(1.0), v.const(0.0)))
+    x = b.fadd(b.fsub(m, v.const(1.0)), b.select(small, m, v.const(0.0)))
+
+    z = b.fmul(x, x)
+    if v.bits == 32:
+        y = v.polevl(x, [7.0376836292E-2, -1.1514610310E-1, 1.1676998740E-1,
+                         -1.2420140846E-1, 1.4249322787E-1, -1.6668057665E-1,
+                         2.0000714765E-1, -2.4999993993E-1, 3.3333331174E-1])
+        y = b.fmul(b.fmul(y, x), z)
+    else:
+        p = v.polevl(x, [1.01875663804580931796E-4, 4.97494994976747001425E-1,
+                         4.70579119878881725854E0, 1.44989225341610930846E1,
+                         1.79368678507819816313E1, 7.70838733755885391666E0])
+        q = v.polevl(x, [1.0, 1.12873587189167450590E1,
+                         4.52279145837532221105E1, 8.29875266912776603211E1,
+                         7.11544750618563894466E1, 2.31251620126765340583E1])
+        y = b.fmul(x, b.fdiv(b.fmul(z, p), q))
+
+    # ln(2) = 0.693359375 - c
+    if v.bits == 32:
+        c = 2.12194440e-4
+    else:
+        c = 2.121944400546905827679e-4
+    y = b.fsub(y, b.fmul(e, v.const(c)))
+    y = b.fsub(y, b.fmul(z, v.const(0.5)))
+    x = b.fadd(x, y)
+    return b.fadd(x, b.fmul(e, v.const(0.693359375)))
+
+def sincos_domain(v, x):
+    # The argument reduction loses precision for large arguments
+    if v.bits == 32:
+        return v.in_range(x, -4096.0, 4096.0)
+    return v.in_range(x, -1.073741824e9, 1.073741824e9)
+
+def sincos(v, x, cos):
+    b = v.builder
+    negative = b.fcmp(lc.FCMP_OLT, x, v.const(0.0))
+    x = b.select(negative, b.fsub(v.const(-0.0), x), x)
+
+    # Octant j (even) of x, and y = j * pi/4
+    j = b.fptosi(b.fmul(x, v.const(FOPI)), v.int_type)
+    j = b.and_(b.add(j, v.iconst(1)), v.iconst(-2))
+    y = b.sitofp(j, v.type)
+
+    if cos:
+        j = b.sub(j, v.iconst(2))
+        flip = b.icmp(lc.ICMP_EQ, b.and_(j, v.iconst(4)), v.iconst(0))
+    else:
+        flip = b.xor(negative,
+                     b.icmp(lc.ICMP_NE, b.and_(j, v.iconst(4)), v.iconst(0)))
+    use_sin = b.icmp(lc.ICMP_EQ, b.and_(j, v.iconst(2)), v.iconst(0))
+
+    # x - y in extended precision
+    if v.bits == 32:
+        dp = [0.78515625, 2.4187564849853515625e-4, 3.77489497744594108e-8]
+    else:
+        dp = [7.85398125648498535156E-1, 3.77489470793079817668E-8,
+              2.69515142907905952645E-15]
+    for part in dp:
+        x = b.fsub(x, b.fmul(y, v.const(part)))
+
+    z = b.fmul(x, x)
+    if v.bits == 32:
+        sin_poly = v.polevl(z, [-1.9515295891E-4, 8.3321608736E-3,
+                                -1.6666654611E-1])
+        cos_poly = v.polevl(z, [2.443315711809948E-005,
+                                -1.388731625493765E-003,
+                                4.166664568298827E-002])
+    else:
+        sin_poly = v.polevl(z, [1.58962301576546568060E-10,
+                                -2.50507477628578072866E-8,
+                                2.75573136213857245213E-6,
+                                -1.98412698295895385996E-4,
+                                8.33333333332211858878E-3,
+                                -1.66666666666666307295E-1])
+        cos_poly = v.polevl(z, [-1.13585365213876817300E-11,
+                                2.08757008419747316778E-9,
+                                -2.75573141792967388112E-7,
+                                2.48015872888517045348E-5,
+                                -1.38888888888730564116E-3,
+                                4.16666666666665929218E-2])
+
+    sin_x = b.fadd(x, b.fmul(b.fmul(x, z), sin_poly))
+    cos_x = b.fadd(b.fsub(v.const(1.0), b.fmul(z, v.const(0.5))),
+                   b.fmul(b.fmul(z, z), cos_poly))
+    result = b.select(use_sin, sin_x, cos_x)
+    return b.select(flip, b.fsub(v.const(-0.0), result), result)
+
+def sin(v, x):
+    return sincos(v, x, cos=False)
+
+def cos(v, x):
+    return sincos(v, x, cos=True)
+
+# name -> (domain, approximation)
+functions = {
+    'exp': (exp_domain, exp),
+    'log': (log_domain, log),
+    'sin': (sincos_domain, sin),
+    'cos': (sincos_domain, cos),
+}
+
+#
+### Vector functions
+#
+
+def vector_function_name(name, count, bits):
+    "The name of the SIMD implementation of a math function"
+    return '__numba_vector_%s_v%df%d' % (name, count, bits)
+
+def get_vector_function(module, name, count, bits):
+    """
+    Get the SIMD implementation of math function `name` for vectors of
+    `count` floats of `bits` bits of a module, defining it on first use:
+
+        <count x float|double> __numba_vector_<name>_v<count>f<bits>(x)
+    """
+    func_name = vector_function_name(name, count, bits)
+    try:
+        return module.get_function_named(func_name)
+    except llvm.LLVMException:
+        pass
+
+    vector_type = VectorBuilder(None, count, bits).type
+    lfunc_type = lc.Type.function(vector_type, [vector_type])
+    lfunc = module.add_function(lfunc_type, func_name)
+    lfunc.linkage = lc.LINKAGE_INTERNAL
+    _build_vector_function(module, lfunc, name, count, bits)
+    return lfunc
+
+def _build_vector_function(module, lfunc, name, count, bits):
+    x, = lfunc.args
+    b = lc.Builder.new(lfunc.append_basic_block('entry'))
+    v = VectorBuilder(b, count, bits)
+    domain, approximation = functions[name]
+
+    valid = domain(v, x)
+    result = approximation(v, b.select(valid, x, v.const(1.0)))
+
+    indices = [lc.Constant.int(lc.Type.int(32), i) for i in range(count)]
+    all_valid = b.extract_element(valid, indices[0])
+    for index in indices[1:]:
+        all_valid = b.and_(all_valid, b.extract_element(valid, index))
+
+    bb_approximation = lfunc.append_basic_block('approximation')
+    bb_scalar = lfunc.append_basic_block('scalar')
+    b.cbranch(all_valid, bb_approximation, bb_scalar)
+
+    b.position_at_end(bb_approximation)
+    b.ret(result)
+
+    # Use libm for all elements
+    b.position_at_end(bb_scalar)
+    scalar_name = name
+    if bits == 32:
+        scalar_name += 'f'
+    scalar_func = module.get_or_insert_function(
+        lc.Type.function(v.element_type, [v.element_type]), scalar_name)
+
+    result = lc.Constant.undef(v.type)
+    for index in indices:
+        element = b.call(scalar_func, [b.extract_element(x, index)])
+        result = b.insert_element(result, element, index)
+    b.ret(result)
+
+def replace_vector_intrinsics(lfunc):
+    """
+    Replace the calls to vector intrinsics of math functions in an
+    (optimized) function by calls to their SIMD implementations, and inline
+    those. Returns the number of calls replaced.
+    """
+    calls = []
+    for bb in lfunc.basic_blocks:
+        for instr in bb.instructions:
+            if isinstance(instr, lc.CallOrInvokeInstruction):
+                callee_name = getattr(instr.called_function, 'name', '')
+                match = _intrinsic_name.match(callee_name)
+                if match is not None:
+                    calls.append((instr, match.groups()))
+
+    for call, (name, count, bits) in calls:
+        call.called_function = get_vector_function(lfunc.module, name,
+                                                   int(count), int(bits))
+        lc.inline_function(call)
+
+    return len(calls)